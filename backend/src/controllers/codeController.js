@@ -1,7 +1,8 @@
+const fs = require("fs");
 const path = require("path");
-const { spawn } = require("child_process");
+const { submitAnalysisJob } = require("../utils/analysisJobs");
 
-const uploadCode = (req, res) => {
+const uploadCode = async (req, res) => {
     console.log("📥 Received a ZIP file for code analysis...");
 
     if (!req.file) {
@@ -11,31 +12,30 @@ const uploadCode = (req, res) => {
 
     console.log(`✅ ZIP File uploaded: ${req.file.path}`);
 
-    // Spawn the Python process for code analysis
-    const pythonProcess = spawn("python", [
-        path.resolve(__dirname, "../scripts/gemini_ast.py"),
-        "--file",
-        req.file.path
-    ]);
-
-    let outputData = "";
-    pythonProcess.stdout.on("data", (data) => {
-        outputData += data.toString();
-    });
-
-    pythonProcess.stderr.on("data", (data) => {
-        console.error(`❌ Python Error: ${data.toString()}`);
-    });
-
-    pythonProcess.on("close", (code) => {
-        if (code === 0) {
-            console.log("✅ Analysis complete.");
-            res.json({ success: "File processed successfully!", output: outputData });
-        } else {
-            console.error("❌ Analysis failed.");
-            res.status(500).json({ error: "Failed to process the file." });
-        }
-    });
+    try {
+        // The analysis picks its parser by extension, which multer drops
+        const sourcePath = `${req.file.path}${path.extname(req.file.originalname).toLowerCase()}`;
+        fs.renameSync(req.file.path, sourcePath);
+
+        const outputDir = path.resolve(__dirname, "../extracted/code");
+        fs.mkdirSync(outputDir, { recursive: true });
+
+        // Queue the analysis; the client polls GET /api/jobs/:jobId and then fetches GET /api/jobs/:jobId/result
+        const job = await submitAnalysisJob({
+            kind: "upload",
+            source: sourcePath,
+            output: path.join(outputDir, `${req.file.filename}.json`),
+            priority: "interactive",
+            submitter: req.user.id
+        });
+        fs.unlink(sourcePath, () => {});
+
+        console.log(`✅ Analysis job ${job.id} ${job.coalesced ? "joined" : "queued"}.`);
+        res.status(202).json({ success: "File queued for analysis.", jobId: job.id, job });
+    } catch (error) {
+        console.error("❌ Failed to queue the analysis:", error);
+        res.status(500).json({ error: "Failed to process the file." });
+    }
 };
 
 module.exports = { uploadCode };
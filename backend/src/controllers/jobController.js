@@ -0,0 +1,53 @@
+const { readJobProgress, cancelAnalysisJob } = require("../utils/analysisJobs");
+
+const getJob = async (req, res) => {
+    try {
+        const job = await readJobProgress(req.params.jobId);
+        if (!job) {
+            return res.status(404).json({ error: "Job not found." });
+        }
+        res.json(job);
+    } catch (error) {
+        console.error("❌ Error reading job progress:", error);
+        res.status(500).json({ error: "Failed to read job progress." });
+    }
+};
+
+const cancelJob = async (req, res) => {
+    try {
+        const job = await cancelAnalysisJob(req.params.jobId, req.user.id);
+        if (!job) {
+            return res.status(404).json({ error: "Job not found." });
+        }
+        if (!job.withdrawn && (job.state === "queued" || job.state === "running")) {
+            return res.status(403).json({ error: "You are not waiting for this job." });
+        }
+        res.json(job);
+    } catch (error) {
+        console.error("❌ Error cancelling job:", error);
+        res.status(500).json({ error: "Failed to cancel the job." });
+    }
+};
+
+const getJobResult = async (req, res) => {
+    try {
+        const job = await readJobProgress(req.params.jobId);
+        if (!job) {
+            return res.status(404).json({ error: "Job not found." });
+        }
+        if (job.state !== "done") {
+            return res.status(409).json({ error: `Job is ${job.state}.`, state: job.state });
+        }
+        res.sendFile(job.output, (err) => {
+            if (err && !res.headersSent) {
+                console.error("❌ Error sending job result:", err);
+                res.status(404).json({ error: "Job result is no longer available." });
+            }
+        });
+    } catch (error) {
+        console.error("❌ Error reading job result:", error);
+        res.status(500).json({ error: "Failed to read the job result." });
+    }
+};
+
+module.exports = { getJob, getJobResult, cancelJob };
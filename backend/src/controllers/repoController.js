@@ -4,6 +4,7 @@ const path = require("path");
 const fs = require("fs");
 const { spawn } = require("child_process");
 const mongoose = require("mongoose");
+const { importComparison, getCoverage, getImplementingFunctions } = require("../utils/resultsStore");
 
 // =============================================
 // HELPER FUNCTIONS
@@ -709,7 +710,19 @@ exports.compareRequirementsWithCode = async (req, res) => {
         }
 
         const results = JSON.parse(fs.readFileSync(resultsPath, 'utf8'));
-        
+
+        // Index the comparison for the coverage queries; the response does not depend on it
+        try {
+          await importComparison({
+            comparison: resultsPath,
+            codeAnalysis: sourceCodePath,
+            requirements: requirementsPath,
+            repo: repoId
+          });
+        } catch (err) {
+          console.error("❌ Error importing comparison into the results store:", err);
+        }
+
         // Format the results for the frontend
         return {
           message: "Comparison completed successfully",
@@ -739,6 +752,35 @@ exports.compareRequirementsWithCode = async (req, res) => {
   }
 };
 
+exports.getRepoCoverage = async (req, res) => {
+  try {
+    const { repoId } = req.params;
+    const { commit, run } = req.query;
+
+    const coverage = await getCoverage({ repo: repoId, commit, run });
+    if (!coverage) {
+      return res.status(404).json({ message: "No comparison results for this repository" });
+    }
+    res.status(200).json(coverage);
+  } catch (error) {
+    console.error("❌ Error fetching coverage:", error);
+    res.status(500).json({ message: "Server error", error: error.message });
+  }
+};
+
+exports.getRequirementFunctions = async (req, res) => {
+  try {
+    const { repoId, requirement } = req.params;
+    const { run } = req.query;
+
+    const functions = await getImplementingFunctions(requirement, { repo: repoId, run });
+    res.status(200).json(functions);
+  } catch (error) {
+    console.error("❌ Error fetching implementing functions:", error);
+    res.status(500).json({ message: "Server error", error: error.message });
+  }
+};
+
 exports.getExtractedRequirements = async (req, res) => {
   try {
     const { repoId } = req.params;
@@ -1,10 +1,11 @@
 const express = require("express");
 const multer = require("multer");
 const { uploadCode } = require("../controllers/codeController");
+const authenticateUser = require("../middleware/authMiddleware");
 
 const router = express.Router();
 const upload = multer({ dest: "uploads/" });
 
-router.post("/upload/code", upload.single("file"), uploadCode);
+router.post("/upload/code", authenticateUser, upload.single("file"), uploadCode);
 
 module.exports = router;
\ No newline at end of file
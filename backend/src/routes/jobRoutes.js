@@ -0,0 +1,11 @@
+const express = require("express");
+const { getJob, getJobResult, cancelJob } = require("../controllers/jobController");
+const authenticateUser = require("../middleware/authMiddleware");
+
+const router = express.Router();
+
+router.get("/jobs/:jobId", authenticateUser, getJob);
+router.get("/jobs/:jobId/result", authenticateUser, getJobResult);
+router.delete("/jobs/:jobId", authenticateUser, cancelJob);
+
+module.exports = router;
@@ -11,7 +11,9 @@ const {
   getRepoOwner,
   getRepoRequests,
   getRepoHistory,
-  compareRequirementsWithCode 
+  compareRequirementsWithCode,
+  getRepoCoverage,
+  getRequirementFunctions
 } = require("../controllers/repoController");
 
 const { getUserById } = require("../controllers/usercontroller");
@@ -85,6 +87,12 @@ router.post("/:repoId/upload", authenticateUser, upload.single("file"), uploadFi
 // Compare SRS and Source Code
 router.post("/:repoId/compare", authenticateUser, compareRequirementsWithCode);
 
+// Requirement coverage of the latest comparison (?commit= or ?run= to pick another)
+router.get("/:repoId/coverage", authenticateUser, getRepoCoverage);
+
+// Functions that implement a requirement, by requirement ID or text
+router.get("/:repoId/requirements/:requirement/functions", authenticateUser, getRequirementFunctions);
+
 // =============================================
 // USER MANAGEMENT
 // =============================================
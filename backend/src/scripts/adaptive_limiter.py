@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+THROTTLE_MARKERS = ("Resource has been exhausted", "429", "Too Many Requests", "quota")
+
+
+class LimiterClosed(Exception):
+    """Raised when work is submitted to a limiter that is shutting down"""
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Check whether an API error means we are being rate limited"""
+    message = str(error)
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter driven by observed latency and error rate.
+
+    The limit grows by roughly one slot per window of successful calls and is
+    cut multiplicatively on throttling, on latency well above the observed
+    baseline, or when the recent error rate is too high.
+    """
+
+    def __init__(self, initial_limit: int = 3, min_limit: int = 1, max_limit: int = 32,
+                 backoff: float = 0.5, latency_backoff: float = 0.9, latency_tolerance: float = 2.0,
+                 error_rate_threshold: float = 0.2, window: int = 20):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.error_rate_threshold = error_rate_threshold
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._outcomes = deque(maxlen=window)
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._closed = False
+        self._drained: Optional[asyncio.Event] = None
+        self.successes = 0
+        self.errors = 0
+        self.throttles = 0
+        self.peak_limit = int(self._limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "peak_limit": self.peak_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "successes": self.successes,
+            "errors": self.errors,
+            "throttles": self.throttles,
+            "baseline_latency": round(self._baseline_latency, 4) if self._baseline_latency else None
+        }
+
+    async def acquire(self):
+        if self._closed:
+            raise LimiterClosed("Limiter is shutting down")
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just before cancellation; hand it back
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now and nobody is queued for it"""
+        if self._closed or self._waiters or self._in_flight >= self.limit:
+            return False
+        self._in_flight += 1
+        return True
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._wake_waiters()
+        if self._drained and self._in_flight == 0 and not self._waiters:
+            self._drained.set()
+
+    def _wake_waiters(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def release(self, latency: float, error: Optional[BaseException] = None):
+        """Return a slot and feed the call outcome into the AIMD controller"""
+        self._record(latency, error)
+        self._release_slot()
+
+    def _decrease(self, factor: float, reason: str):
+        now = time.monotonic()
+        # Only react once per baseline round-trip so one burst does not collapse the limit
+        cooldown = self._baseline_latency or 0.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        old = self.limit
+        self._limit = max(self.min_limit, self._limit * factor)
+        if self.limit != old:
+            logging.info(f"Concurrency limit {old} -> {self.limit} ({reason})")
+
+    def _record(self, latency: float, error: Optional[BaseException]):
+        throttled = error is not None and is_throttle_error(error)
+        self._outcomes.append(error is not None and not throttled)
+
+        if throttled:
+            self.throttles += 1
+            self._decrease(self.backoff, "throttled")
+            return
+        if error is not None:
+            self.errors += 1
+            error_rate = sum(self._outcomes) / len(self._outcomes)
+            if len(self._outcomes) >= 5 and error_rate > self.error_rate_threshold:
+                self._decrease(self.backoff, f"error rate {error_rate:.0%}")
+            return
+
+        self.successes += 1
+        if self._baseline_latency is None or latency < self._baseline_latency:
+            self._baseline_latency = latency
+        else:
+            # Let the baseline drift slowly upwards so it tracks the service over time
+            self._baseline_latency += 0.01 * (latency - self._baseline_latency)
+
+        if latency > self._baseline_latency * self.latency_tolerance:
+            self._decrease(self.latency_backoff, f"latency {latency:.2f}s")
+        elif self._in_flight >= self.limit:
+            # Additive increase only while the current limit is actually in use
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self, acquired: bool = False):
+        """Hold one concurrency slot for the duration of a call and record its outcome"""
+        if not acquired:
+            await self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Cancelled calls say nothing about the service; return the slot silently
+            self._release_slot()
+            raise
+        except Exception as e:
+            self.release(time.monotonic() - start, e)
+            raise
+        self.release(time.monotonic() - start)
+
+    async def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting new work and wait for queued and in-flight calls to finish"""
+        self._closed = True
+        if self._in_flight == 0 and not self._waiters:
+            return True
+        self._drained = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logging.warning(f"Limiter shutdown timed out with {self._in_flight} calls in flight")
+            return False
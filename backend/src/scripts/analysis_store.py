@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import subprocess
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from single_flight import content_digest
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "specode", "analyses")
+FORMAT_VERSION = 2  # Bump when the stored record layout changes
+KEEP_COMMITS = 5  # Analysed commits kept per repository
+LATEST_FILE = "latest"
+
+
+class AnalysisStore:
+    """Per-commit analysis results for each repository URL.
+
+    Function records are stored grouped by file path relative to the repository
+    root, so a later checkout in a different directory can reuse them. Files
+    that were extracted without finding functions are stored with no records;
+    files whose extraction failed are listed separately so the next run retries
+    them even when they did not change.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, keep: int = KEEP_COMMITS):
+        self.root = root
+        self.keep = keep
+
+    def _repo_dir(self, repo_url: str) -> str:
+        return os.path.join(self.root, content_digest(repo_url.rstrip('/'))[:24])
+
+    def latest(self, repo_url: str, repo_root: str) -> Optional[Dict]:
+        """Most recent stored analysis for repo_url with file paths rebased onto repo_root"""
+        repo_dir = self._repo_dir(repo_url)
+        try:
+            with open(os.path.join(repo_dir, LATEST_FILE), 'r', encoding='utf-8') as f:
+                commit = f.read().strip()
+            with open(os.path.join(repo_dir, f"{commit}.json"), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get('version') != FORMAT_VERSION:
+            logging.info(f"Ignoring stored analysis of {repo_url} with format {stored.get('version')}")
+            return None
+
+        for relpath, records in stored['files'].items():
+            for func in records:
+                func['filepath'] = os.path.join(repo_root, relpath)
+        return stored
+
+    def snapshot(self, repo_url: str, commit: str, repo_root: str, llm_enabled: bool,
+                 extractor_versions: Optional[Dict[str, int]] = None) -> 'SnapshotWriter':
+        """Writer that stores one analysed commit file by file; see SnapshotWriter"""
+        return SnapshotWriter(self, repo_url, commit, repo_root, llm_enabled, extractor_versions)
+
+    def save(self, repo_url: str, commit: str, repo_root: str, functions: Iterable[Dict], llm_enabled: bool,
+             extractor_versions: Optional[Dict[str, int]] = None, empty_files: Iterable[str] = (),
+             failed_files: Iterable[str] = ()):
+        """Persist the function records of one analysed commit and mark it as the latest.
+
+        empty_files and failed_files are paths of files that yielded no functions
+        and of files whose extraction failed.
+        """
+        files: Dict[str, List[Dict]] = {path: [] for path in empty_files}
+        for func in functions:
+            files.setdefault(func['filepath'], []).append(func)
+        with self.snapshot(repo_url, commit, repo_root, llm_enabled, extractor_versions) as snapshot:
+            for path, records in files.items():
+                snapshot.add(path, records)
+            snapshot.commit(failed_files)
+
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _prune(self, repo_dir: str):
+        snapshots = sorted((os.path.join(repo_dir, name) for name in os.listdir(repo_dir) if name.endswith('.json')),
+                           key=os.path.getmtime, reverse=True)
+        for path in snapshots[self.keep:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SnapshotWriter:
+    """Writes the snapshot of one analysed commit as files finish, so streamed runs need not hold every record.
+
+    Each file is added once with all of its records (none for a file without
+    functions). commit() lists the failed files and makes the snapshot the
+    latest; leaving the context without committing discards it.
+    """
+
+    def __init__(self, store: AnalysisStore, repo_url: str, commit: str, repo_root: str, llm_enabled: bool,
+                 extractor_versions: Optional[Dict[str, int]] = None):
+        self.store = store
+        self.repo_url = repo_url
+        self.commit_sha = commit
+        self.repo_root = repo_root
+        self.repo_dir = store._repo_dir(repo_url)
+        os.makedirs(self.repo_dir, exist_ok=True)
+        self.path = os.path.join(self.repo_dir, f"{commit}.json")
+        self._tmp = f"{self.path}.{os.getpid()}.{id(self)}.tmp"
+        self._file = open(self._tmp, 'w', encoding='utf-8')
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'repo_url': repo_url,
+            'commit': commit,
+            'llm_enabled': llm_enabled,
+            'extractor_versions': extractor_versions,
+            'saved_at': time.time(),
+        })
+        self._file.write(header[:-1] + ', "files": {')
+        self._count = 0
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.repo_root).replace("\\", "/")
+
+    def add(self, path: str, records: Iterable[Dict]):
+        """Store the records of the file at path"""
+        relpath = self._relative(path)
+        separator = ', ' if self._count else ''
+        self._file.write(f"{separator}{json.dumps(relpath)}: "
+                         f"{json.dumps([dict(func, filepath=relpath) for func in records])}")
+        self._count += 1
+
+    def commit(self, failed_files: Iterable[str] = ()):
+        """Finish the snapshot and mark it as the latest"""
+        failed = sorted({self._relative(path) for path in failed_files})
+        self._file.write(f'}}, "failed": {json.dumps(failed)}}}')
+        self._file.close()
+        os.replace(self._tmp, self.path)
+        self.store._write_atomic(os.path.join(self.repo_dir, LATEST_FILE), self.commit_sha)
+        self.store._prune(self.repo_dir)
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.abort()
+
+
+def changed_files(repo_root: str, base_commit: str, commit: str) -> Optional[Tuple[List[str], List[str]]]:
+    """(added or modified, deleted) paths between two commits, or None if git cannot diff them"""
+    try:
+        output = subprocess.run(
+            ['git', '-C', repo_root, 'diff', '--name-status', '--no-renames', '-z', base_commit, commit],
+            check=True, capture_output=True, text=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.info(f"Cannot diff {base_commit[:12]}..{commit[:12]}: {getattr(e, 'stderr', e)}")
+        return None
+
+    fields = output.split('\0')
+    changed, deleted = [], []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        (deleted if status == 'D' else changed).append(path)
+    return changed, deleted
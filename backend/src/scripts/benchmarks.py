@@ -0,0 +1,1053 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+
+VOCAB = [
+    'login', 'logout', 'password', 'reset', 'account', 'profile', 'upload', 'download', 'report',
+    'invoice', 'payment', 'order', 'cart', 'search', 'filter', 'notify', 'email', 'message', 'audit',
+    'export', 'import', 'schedule', 'booking', 'review', 'rating', 'comment', 'admin', 'role',
+    'permission', 'session', 'token', 'cache', 'image', 'video', 'stream', 'sync', 'backup',
+    'restore', 'archive', 'delete', 'update', 'create', 'list', 'validate', 'verify', 'encrypt',
+    'location', 'map', 'route', 'device', 'sensor', 'camera', 'voice', 'speech', 'translate'
+]
+
+
+def _random_phrase(rng, words):
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def bench_offline_match(args):
+    """Time the offline matcher on synthetic requirements x functions"""
+    from offline_matcher import match_requirements
+
+    rng = random.Random(args.seed)
+    requirements = [f"The system shall {_random_phrase(rng, 6)}." for _ in range(args.requirements)]
+    functions = []
+    for i in range(args.functions):
+        words = [rng.choice(VOCAB) for _ in range(3)]
+        name = words[0] + "".join(w.capitalize() for w in words[1:])
+        functions.append({'name': name, 'file': f"module_{i % 500}.py",
+                          'underlying_meaning': _random_phrase(rng, 8)})
+
+    start = time.perf_counter()
+    result = match_requirements(requirements, {'functions': functions})
+    elapsed = time.perf_counter() - start
+    return {
+        'requirements': args.requirements,
+        'functions': args.functions,
+        'pairs': args.requirements * args.functions,
+        'seconds': round(elapsed, 3),
+        'coverage_percentage': result['stats']['coverage_percentage']
+    }
+
+
+class FakeLLMEndpoint:
+    """Local HTTP endpoint that injects latency and throttles above a concurrency capacity"""
+
+    def __init__(self, capacity, base_latency, throttle_rate, seed=0):
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.served = 0
+        self.throttled = 0
+        self.url = None
+        self._runner = None
+
+    async def handle(self, request):
+        from aiohttp import web
+        await request.read()
+        if self.in_flight >= self.capacity or self.rng.random() < self.throttle_rate:
+            self.throttled += 1
+            return web.Response(status=429, text="429 Resource has been exhausted (e.g. check quota).")
+        self.in_flight += 1
+        try:
+            # Latency grows as the endpoint approaches its capacity
+            load = self.in_flight / self.capacity
+            await asyncio.sleep(self.base_latency * (1 + load) * self.rng.uniform(0.8, 1.2))
+            self.served += 1
+            return web.Response(text="Function documentation")
+        finally:
+            self.in_flight -= 1
+
+    async def start(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_post('/generate', self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/generate"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+async def _run_concurrency(args, limiter):
+    import aiohttp
+    import gemini_ast
+    from pipeline_metrics import PipelineMetrics
+
+    gemini_ast.RETRY_BASE_DELAY = args.retry_delay
+    endpoint = FakeLLMEndpoint(args.capacity, args.latency, args.throttle_rate, args.seed)
+    await endpoint.start()
+    metrics = PipelineMetrics()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async def generate(model_name, prompt):
+                async with session.post(endpoint.url, data=prompt) as response:
+                    text = await response.text()
+                    if response.status != 200:
+                        raise Exception(text)
+                    return text
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                gemini_ast.analyze_with_gemini(session, [f"func_{i}"], f"file_{i}.py", limiter, generate, metrics)
+                for i in range(args.files)
+            ])
+            await limiter.shutdown()
+            elapsed = time.perf_counter() - start
+    finally:
+        await endpoint.stop()
+
+    snapshot = metrics.snapshot()
+    return {
+        'seconds': round(elapsed, 3),
+        'files_per_second': round(args.files / elapsed, 2),
+        'failed_files': sum(1 for r in results if 'error' in r),
+        'endpoint_throttled': endpoint.throttled,
+        'limiter': limiter.stats(),
+        'llm_call_latency': snapshot['latency_seconds'].get('llm_call')
+    }
+
+
+def bench_concurrency(args):
+    """Compare the old fixed concurrency of 3 with the adaptive limiter against a fake endpoint"""
+    from adaptive_limiter import AdaptiveLimiter
+
+    fixed = asyncio.run(_run_concurrency(args, AdaptiveLimiter(initial_limit=3, min_limit=3, max_limit=3)))
+    adaptive = asyncio.run(_run_concurrency(args, AdaptiveLimiter(initial_limit=3, max_limit=args.max_limit)))
+    return {'fixed_3': fixed, 'adaptive': adaptive}
+
+
+def _make_local_repo(path, files, commits, rng):
+    """Create a git repository with `commits` commits touching `files` Python modules"""
+    os.makedirs(path)
+    git = lambda *cmd: subprocess.run(['git', '-C', path, *cmd], check=True, capture_output=True)
+    git('init', '-q')
+    git('config', 'user.email', 'bench@example.com')
+    git('config', 'user.name', 'bench')
+    for c in range(commits):
+        for i in rng.sample(range(files), max(1, files // 10)) if c else range(files):
+            with open(os.path.join(path, f"module_{i}.py"), 'w') as f:
+                f.write(f"def {_random_phrase(rng, 2).replace(' ', '_')}_{c}(x):\n    return x * {c}\n" * 20)
+        git('add', '-A')
+        git('commit', '-q', '-m', f"commit {c}")
+    return 'file://' + os.path.abspath(path)
+
+
+def bench_mirror_cache(args):
+    """First clone vs cached fetch, concurrent checkouts and eviction on local file:// repositories"""
+    from github_analysis import Config, analyze_repository
+    from repo_cache import MirrorCache
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_mirror_')
+    try:
+        urls = [_make_local_repo(os.path.join(work, f"repo{r}"), args.files, args.commits, rng)
+                for r in range(args.repos)]
+        Config.LLM_ENABLED = False
+        Config.MIRROR_CACHE_DIR = os.path.join(work, 'mirrors')
+
+        def run(url, mirror=True):
+            Config.MIRROR_CACHE_ENABLED = mirror
+            start = time.time()
+            result = analyze_repository(url, os.path.join(work, f"out_{time.time_ns()}.json"))
+            assert result['status'] == 'success', result.get('error')
+            return time.time() - start, result.get('commit')
+
+        direct, _ = run(urls[0], mirror=False)
+        cold, commit = run(urls[0])
+        warm, warm_commit = run(urls[0])
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            concurrent = list(executor.map(lambda _: run(urls[0]), range(args.concurrency)))
+
+        cache = MirrorCache(Config.MIRROR_CACHE_DIR, max_bytes=0)
+        for url in urls[1:]:
+            run(url)
+        with cache.worktree(urls[-1], os.path.join(work, 'pinned')):
+            evicted = cache.evict()
+            survivors = [os.path.basename(m) for m in cache._mirrors()]
+
+        return {
+            'direct_clone_seconds': round(direct, 3),
+            'mirror_first_seconds': round(cold, 3),
+            'mirror_cached_seconds': round(warm, 3),
+            'same_commit': commit == warm_commit and all(c == commit for _, c in concurrent),
+            'concurrent_runs': len(concurrent),
+            'concurrent_max_seconds': round(max(t for t, _ in concurrent), 3),
+            'evicted': len(evicted),
+            'kept_with_live_worktree': survivors,
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_incremental(args):
+    """Full re-analysis vs diff-based incremental analysis after a small commit"""
+    from github_analysis import Config, analyze_repository
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_incremental_')
+    try:
+        url = _make_local_repo(os.path.join(work, 'repo'), args.files, 1, rng)
+        Config.LLM_ENABLED = False
+        Config.MIRROR_CACHE_DIR = os.path.join(work, 'mirrors')
+        Config.ANALYSIS_STORE_DIR = os.path.join(work, 'analyses')
+
+        def run(incremental):
+            Config.INCREMENTAL_ENABLED = incremental
+            start = time.time()
+            result = analyze_repository(url, os.path.join(work, 'out.json'))
+            assert result['status'] == 'success', result.get('error')
+            return time.time() - start, result
+
+        run(True)
+        repo = url[len('file://'):]
+        for i in rng.sample(range(args.files), args.changed):
+            with open(os.path.join(repo, f"module_{i}.py"), 'a') as f:
+                f.write(f"def changed_{i}(y):\n    return y\n")
+        subprocess.run(['git', '-C', repo, 'commit', '-qam', 'change'], check=True)
+
+        full_seconds, full = run(False)
+        incremental_seconds, incremental = run(True)
+        names = lambda result: sorted((f['file'], f['name'], f['start_line']) for f in result['functions'])
+        return {
+            'files': args.files,
+            'changed': args.changed,
+            'full_seconds': round(full_seconds, 3),
+            'incremental_seconds': round(incremental_seconds, 3),
+            'incremental': incremental.get('incremental'),
+            'same_functions': names(full) == names(incremental),
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_extraction_cache(args):
+    """Cold vs warm extraction, and a fork with identical files, through the extraction cache"""
+    from github_analysis import Config, analyze_repository
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_extraction_')
+    try:
+        url = _make_local_repo(os.path.join(work, 'repo'), args.files, 1, rng)
+        fork = os.path.join(work, 'fork')
+        subprocess.run(['git', 'clone', '-q', url, fork], check=True)
+        Config.LLM_ENABLED = False
+        Config.INCREMENTAL_ENABLED = False
+        Config.MIRROR_CACHE_DIR = os.path.join(work, 'mirrors')
+        Config.EXTRACTION_CACHE_PATH = os.path.join(work, 'extraction.sqlite3')
+
+        def run(repo_url, cached=True):
+            Config.EXTRACTION_CACHE_ENABLED = cached
+            start = time.time()
+            result = analyze_repository(repo_url, os.path.join(work, 'out.json'))
+            assert result['status'] == 'success', result.get('error')
+            return {'seconds': round(time.time() - start, 3), 'cache': result.get('extraction_cache')}
+
+        return {
+            'files': args.files,
+            'uncached': run(url, cached=False),
+            'cold': run(url),
+            'warm': run(url),
+            'fork': run('file://' + fork),
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _write_source_files(directory, count, rng):
+    """Synthetic Python, Java and JavaScript modules with a few dozen functions each"""
+    paths = []
+    for i in range(count):
+        names = [_random_phrase(rng, 2).replace(' ', '_') + f"_{j}" for j in range(30)]
+        kind = i % 3
+        if kind == 0:
+            path = os.path.join(directory, f"module_{i}.py")
+            body = "".join(f"def {n}(x, y):\n    if x > y:\n        return [v * 2 for v in range(x)]\n"
+                           f"    return {{k: y for k in range(y)}}\n\n" for n in names)
+        elif kind == 1:
+            path = os.path.join(directory, f"Module{i}.java")
+            methods = "".join(f"    public int {n}(int x, int y) {{\n        if (x > y) {{ return x * 2; }}\n"
+                              f"        return y;\n    }}\n" for n in names)
+            body = f"public class Module{i} {{\n{methods}}}\n"
+        else:
+            path = os.path.join(directory, f"module_{i}.js")
+            body = "".join(f"function {n}(x, y) {{\n  if (x > y) {{ return x * 2; }}\n  return y;\n}}\n"
+                           f"const {n}Arrow = (a) => {{ return a + 1; }};\n" for n in names)
+        with open(path, 'w') as f:
+            f.write(body)
+        paths.append(path)
+    return paths
+
+
+def bench_parse_scaling(args):
+    """Files/sec of repository parsing for thread and process executors against worker count"""
+    from github_analysis import Config, extract_files
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_parse_')
+    try:
+        paths = _write_source_files(work, args.files, rng)
+        cores = args.max_workers or os.cpu_count() or 1
+        Config.EXTRACTION_CACHE_ENABLED = False
+        logging.getLogger().setLevel(logging.WARNING)
+        report = {'files': len(paths), 'cpu_count': os.cpu_count(), 'files_per_second': {}}
+        for mode in ('thread', 'process'):
+            Config.EXECUTOR = mode
+            for workers in sorted({1, 2, cores} | set(range(2, cores + 1, 2))):
+                Config.MAX_WORKERS = workers
+                start = time.time()
+                functions = sum(len(f or []) for _, f in extract_files(paths, {}))
+                elapsed = time.time() - start
+                report['files_per_second'][f"{mode}_{workers}"] = round(len(paths) / elapsed, 1)
+                report.setdefault('functions', functions)
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _js_module(rng, index, minified):
+    names = [_random_phrase(rng, 2).replace(' ', '_') + f"_{index}_{j}" for j in range(6)]
+    parts = [
+        f"/* module {index}: function fake_{index}() {{ */",
+        f"export function {names[0]}(a, b) {{ if (a > b) {{ return a / b; }} return `sum ${{a + b}} {{`; }}",
+        f"const {names[1]} = (items) => items.filter(x => /[{{}}]\\d+/.test(x)).map(x => x * 2);",
+        f"class Widget{index} extends Base {{ constructor(p) {{ super(p); this.s = '}}'; }}"
+        f" {names[2]}(x) {{ for (let i = 0; i < x; i++) {{ this.s += i; }} return this.s; }}"
+        f" static {names[3]}() {{ return new Widget{index}({{ a: 1 }}); }} }}",
+        f"const {names[4]} = {{ {names[5]}(y) {{ return y ? 1 : 2; }} }};",
+    ]
+    if minified:
+        return ";".join(p for p in parts if not p.startswith("/*"))
+    return "\n".join(f"  {p}" if i else p for i, p in enumerate(parts)) + "\n"
+
+
+def bench_js_extract(args):
+    """Lexer-based JS extraction throughput on unminified and minified bundles of growing size"""
+    from js_lexer import find_js_functions
+
+    rng = random.Random(args.seed)
+    report = {}
+    for minified in (False, True):
+        for scale in (1, 2, 4):
+            modules = args.modules * scale
+            bundle = ("\n" if not minified else ";").join(_js_module(rng, i, minified) for i in range(modules))
+            start = time.time()
+            found = find_js_functions(bundle)
+            elapsed = time.time() - start
+            report[f"{'minified' if minified else 'unminified'}_x{scale}"] = {
+                'megabytes': round(len(bundle) / 1024 ** 2, 2),
+                'functions': len(found),
+                'expected': modules * 6,
+                'seconds': round(elapsed, 3),
+                'mb_per_second': round(len(bundle) / 1024 ** 2 / elapsed, 2),
+            }
+    return report
+
+
+def bench_large_files(args):
+    """Extraction plus per-function source lookup on single files with growing function counts"""
+    from github_analysis import extract_java_functions, extract_python_functions, get_llm_source
+
+    work = tempfile.mkdtemp(prefix='bench_large_')
+    try:
+        report = {}
+        for scale in (1, 2, 4):
+            count = args.functions * scale
+            py_path = os.path.join(work, f"big_{scale}.py")
+            with open(py_path, 'w') as f:
+                f.write("".join(f"def f{i}(x):\n    y = x + {i}\n    return y * 2\n\n" for i in range(count)))
+            java_path = os.path.join(work, f"Big{scale}.java")
+            with open(java_path, 'w') as f:
+                methods = "".join(f"    int m{i}(int x) {{\n        return x + {i};\n    }}\n" for i in range(count))
+                f.write(f"class Big{scale} {{\n{methods}}}\n")
+
+            start = time.time()
+            sources = sum(len(get_llm_source(func)) > 0 for func in extract_python_functions(py_path))
+            python_seconds = time.time() - start
+            start = time.time()
+            bodies = sum(bool(func['body']) for func in extract_java_functions(java_path))
+            java_seconds = time.time() - start
+            report[f"x{scale}"] = {
+                'functions': count,
+                'python_seconds': round(python_seconds, 3),
+                'python_sources': sources,
+                'java_seconds': round(java_seconds, 3),
+                'java_bodies': bodies,
+            }
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_java_extract(args):
+    """javalang with token spans vs the lexer-only Java scanner on files of growing size"""
+    from java_scanner import find_java_members, javalang_members
+    from source_file import SourceFile
+
+    report = {}
+    for scale in (1, 2, 4):
+        count = args.methods * scale
+        methods = "".join(
+            f"    @Override\n    public List<String> m{i}(final Map<String, Integer> a, int... b) throws IOException {{\n"
+            f"        String s = \"}} {i}\"; // {{\n        if (a.isEmpty()) {{ return null; }}\n"
+            f"        return new ArrayList<>();\n    }}\n" for i in range(count))
+        text = f"class Big {{\n{methods}    enum Kind {{ A, B; int k() {{ return 1; }} }}\n}}\n"
+        source = SourceFile(text)
+
+        start = time.time()
+        lexer = find_java_members(text)
+        lexer_seconds = time.time() - start
+        start = time.time()
+        parsed = javalang_members(text, source.line_starts, time.monotonic() + 600)
+        javalang_seconds = time.time() - start
+        report[f"x{scale}"] = {
+            'methods': count + 1,
+            'kilobytes': len(text) // 1024,
+            'lexer_seconds': round(lexer_seconds, 3),
+            'javalang_seconds': round(javalang_seconds, 3),
+            'lexer_found': len(lexer),
+            'same_spans': [(m['name'], m['start'], m['end']) for m in lexer] ==
+                          [(m['name'], m['start'], m['end']) for m in parsed],
+        }
+    return report
+
+
+def _flutter_widget(rng, index):
+    names = [_random_phrase(rng, 2).replace(' ', '_') + f"_{index}_{j}" for j in range(3)]
+    return (
+        f"import 'package:flutter/material.dart';\n\n"
+        f"/* widget {index} /* nested: void fake_{index}() {{ */ still a comment */\n"
+        f"class Screen{index} extends StatefulWidget {{\n"
+        f"  const Screen{index}({{super.key}});\n\n"
+        f"  @override\n  State<Screen{index}> createState() => _Screen{index}State();\n}}\n\n"
+        f"class _Screen{index}State extends State<Screen{index}> {{\n"
+        f"  int _count = 0;\n  String get label => 'tapped ${{_count}} times {{';\n\n"
+        f"  void {names[0]}() {{\n    setState(() {{ _count++; }});\n  }}\n\n"
+        f"  Future<void> {names[1]}(String id) async {{\n"
+        f"    final data = jsonDecode(await load('${{id}}/\\${{raw}}'));\n"
+        f"    print(\"loaded ${{data['items'].map((e) {{ return '}}'; }})}}\");\n  }}\n\n"
+        f"  @override\n  Widget build(BuildContext context) {{\n"
+        f"    return GestureDetector(\n      onTap: () {{ setState(() {{ _count += 1; }}); }},\n"
+        f"      child: Text(r'raw ${{not_interpolated}} {{', style: const TextStyle()),\n    );\n  }}\n}}\n\n"
+        f"String {names[2]}(int n) => n.isEven ? '{{even}}' : \"odd ${{n}}\";\n\n"
+        f"class Point{index} {{\n  final int _x, _y;\n"
+        f"  Point{index}(int x, int y) : _x = x, _y = y {{ validate(); }}\n"
+        f"  void validate() {{ assert(_x >= 0 && _y >= 0); }}\n"
+        f"  double dist() => (_x * _x + _y * _y) * 1.0;\n}}\n"
+    )
+
+
+def bench_dart_extract(args):
+    """Dart extraction throughput on a synthetic Flutter codebase of growing size"""
+    from github_analysis import extract_dart_functions
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_dart_')
+    try:
+        report = {}
+        for scale in (1, 2, 4):
+            directory = os.path.join(work, f"x{scale}")
+            os.makedirs(directory)
+            files, size = [], 0
+            for i in range(args.files * scale):
+                path = os.path.join(directory, f"screen_{i}.dart")
+                with open(path, 'w') as f:
+                    size += f.write(_flutter_widget(rng, i))
+                files.append(path)
+
+            start = time.time()
+            functions = [func for path in files for func in extract_dart_functions(path)]
+            elapsed = time.time() - start
+            report[f"x{scale}"] = {
+                'files': len(files),
+                'megabytes': round(size / 1024 ** 2, 2),
+                'functions': len(functions),
+                'expected': len(files) * 9,
+                'seconds': round(elapsed, 3),
+                'files_per_second': round(len(files) / elapsed, 1),
+                'mb_per_second': round(size / 1024 ** 2 / elapsed, 2),
+            }
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _cpp_header_chunk(index):
+    return (
+        f"#ifndef GUARD_{index}\n#define GUARD_{index}\n#define CALL_{index}(x) \\\n    do {{ f(x); }} while (0)\n"
+        f"/* section {index} {{ */\nnamespace ns{index} {{\n"
+        f"template <typename T>\nstatic inline T clamp_{index}(T v, T lo, T hi) noexcept {{\n"
+        f"    const char* s = \"}}\"; return v < lo ? lo : (v > hi ? hi : v);\n}}\n"
+        f"class Buffer{index} : public Base<Buffer{index}> {{\npublic:\n"
+        f"    Buffer{index}() : size_{{0}} {{}}\n    ~Buffer{index}() override {{ release(); }}\n"
+        f"    bool operator==(const Buffer{index}& o) const {{ return size_ == o.size_; }}\n"
+        f"    std::size_t size() const;\nprivate:\n    std::size_t size_;\n}};\n"
+        f"std::size_t Buffer{index}::size() const {{\n#if defined(FAST)\n    return size_;\n#else\n"
+        f"    return size_ + 0;\n#endif\n}}\n}}\n#endif\n"
+    )
+
+
+def bench_cpp_extract(args):
+    """C/C++ extraction throughput on single generated headers of growing size"""
+    from cpp_scanner import find_cpp_functions
+
+    report = {}
+    for scale in (1, 2, 4):
+        chunks = args.chunks * scale
+        text = "".join(_cpp_header_chunk(i) for i in range(chunks))
+        start = time.time()
+        found = find_cpp_functions(text)
+        elapsed = time.time() - start
+        report[f"x{scale}"] = {
+            'megabytes': round(len(text) / 1024 ** 2, 2),
+            'functions': len(found),
+            'expected': chunks * 5,
+            'seconds': round(elapsed, 3),
+            'mb_per_second': round(len(text) / 1024 ** 2 / elapsed, 2),
+        }
+    return report
+
+
+def bench_record_memory(args):
+    """Memory held by extracted function records as dicts vs the columnar FunctionStore"""
+    import gc
+    import tracemalloc
+    import source_file
+    from function_store import FunctionStore
+    from github_analysis import process_file
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_records_')
+    try:
+        paths = []
+        for i in range(args.files):
+            directory = os.path.join(work, 'src', f"module_{i % 20}")
+            os.makedirs(directory, exist_ok=True)
+            if i % 2:
+                path = os.path.join(directory, f"service_{i}.js")
+                text = "\n".join(_js_module(rng, i * 1000 + j, False) for j in range(args.functions_per_file // 6))
+            else:
+                path = os.path.join(directory, f"handlers_{i}.py")
+                text = "".join(f"def {_random_phrase(rng, 2).replace(' ', '_')}_{j}(x, y):\n"
+                               f"    \"\"\"Handle {_random_phrase(rng, 3)}.\"\"\"\n    return x + y * {j}\n\n"
+                               for j in range(args.functions_per_file))
+            with open(path, 'w') as f:
+                f.write(text)
+            paths.append(path)
+
+        def held(build):
+            source_file.clear_cache()
+            gc.collect()
+            tracemalloc.start()
+            start = time.time()
+            kept = build()
+            elapsed = time.time() - start
+            source_file.clear_cache()
+            gc.collect()
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return kept, current, elapsed
+
+        records, dict_bytes, _ = held(lambda: [func for path in paths for func in process_file(path)])
+        report = {'files': len(paths), 'functions': len(records), 'dicts_mb': round(dict_bytes / 1024 ** 2, 2)}
+        # Rebuilt from JSON so the store does not share string objects with the dicts above
+        serialized = json.dumps(records)
+        for source_bodies in (False, True):
+            def build():
+                return FunctionStore(json.loads(serialized), source_bodies=source_bodies)
+            store, store_bytes, elapsed = held(build)
+            label = 'store_source_bodies' if source_bodies else 'store_inline_bodies'
+            report[f"{label}_mb"] = round(store_bytes / 1024 ** 2, 2)
+            report[f"{label}_build_seconds"] = round(elapsed, 3)
+            start = time.time()
+            report[f"{label}_round_trip"] = list(store) == records
+            report[f"{label}_materialize_seconds"] = round(time.time() - start, 3)
+            del store
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_discovery(args):
+    """File discovery on a monorepo with a large node_modules: full walk vs pruned walk vs git index"""
+    from file_discovery import FileDiscovery
+    from github_analysis import CODE_EXTENSIONS, NON_CODE_DIRS, is_code_file
+
+    work = tempfile.mkdtemp(prefix='bench_discovery_')
+    try:
+        for i in range(args.source_files):
+            directory = os.path.join(work, 'packages', f"pkg_{i % 50}", 'src')
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"module_{i}.py"), 'w') as f:
+                f.write(f"def handler_{i}(x):\n    return x\n")
+        for i in range(args.dependency_files):
+            directory = os.path.join(work, 'node_modules', f"dep_{i % 400}", 'lib', f"part_{i % 7}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"index_{i}.js"), 'w') as f:
+                f.write("module.exports = {};\n")
+        with open(os.path.join(work, '.gitignore'), 'w') as f:
+            f.write("node_modules/\n")
+        subprocess.run(['git', 'init', '-q', work], check=True)
+        subprocess.run(['git', '-C', work, 'add', '.'], check=True)
+        subprocess.run(['git', '-C', work, '-c', 'user.name=bench', '-c', 'user.email=bench@example.com',
+                        'commit', '-q', '-m', 'tree'], check=True)
+
+        def full_walk():
+            return [os.path.join(root, name) for root, _, names in os.walk(work)
+                    for name in names if is_code_file(os.path.join(root, name))]
+
+        report = {'source_files': args.source_files, 'dependency_files': args.dependency_files}
+        for label, discover in (('full_walk', full_walk),
+                                ('pruned_walk', lambda: FileDiscovery(work, CODE_EXTENSIONS, NON_CODE_DIRS,
+                                                                      use_git=False).files()),
+                                ('git_index', lambda: FileDiscovery(work, CODE_EXTENSIONS, NON_CODE_DIRS).files())):
+            start = time.time()
+            found = discover()
+            report[label] = {'seconds': round(time.time() - start, 4), 'files': len(found)}
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_zip_ingest(args):
+    """Upload ingestion: extractall to a temp dir vs in-memory streaming of selected members, plus a zip bomb"""
+    import zipfile
+    from upload_sources import UploadLimitError, ZipSources
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_zip_ingest_')
+    try:
+        upload = os.path.join(work, 'upload.zip')
+        with zipfile.ZipFile(upload, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for i in range(args.files):
+                archive.writestr(f"app/src/module_{i}.py", f"def handler_{i}(x):\n    return x\n" * 20)
+            for i in range(args.assets):
+                archive.writestr(f"app/assets/image_{i}.png", rng.randbytes(args.asset_kb * 1024))
+            for i in range(args.files):
+                archive.writestr(f"app/node_modules/dep_{i % 50}/index_{i}.js", "module.exports = {};\n" * 50)
+
+        def extract_all():
+            target = os.path.join(work, 'extracted')
+            with zipfile.ZipFile(upload) as archive:
+                archive.extractall(target)
+            total = 0
+            for root, _, names in os.walk(target):
+                for name in names:
+                    if name.endswith('.py'):
+                        with open(os.path.join(root, name), 'rb') as f:
+                            total += len(f.read())
+            shutil.rmtree(target)
+            return total
+
+        def stream():
+            with ZipSources(upload, {'.py', '.js'}, {'assets', 'node_modules'}) as sources:
+                return sum(len(data) for _, data in sources)
+
+        report = {'files': args.files, 'assets': args.assets, 'zip_bytes': os.path.getsize(upload)}
+        for label, ingest in (('extractall', extract_all), ('streaming', stream)):
+            start = time.time()
+            source_bytes = ingest()
+            report[label] = {'seconds': round(time.time() - start, 4), 'source_bytes': source_bytes}
+
+        bomb = os.path.join(work, 'bomb.zip')
+        with zipfile.ZipFile(bomb, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for i in range(args.bomb_members):
+                archive.writestr(f"src/bomb_{i}.py", b"#\n" * (3 * 1024 ** 2))
+        start = time.time()
+        try:
+            with ZipSources(bomb, {'.py'}) as sources:
+                for _ in sources:
+                    pass
+            rejected = None
+        except UploadLimitError as e:
+            rejected = str(e)
+        report['bomb'] = {'zip_bytes': os.path.getsize(bomb), 'seconds': round(time.time() - start, 4),
+                          'rejected': rejected}
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_job_isolation(args):
+    """Concurrent gemini_ast jobs in one runner: output isolation and the shared LLM budget"""
+    import zipfile
+    from extraction_cache import ExtractionCache
+    from job_runner import AnalysisJobRunner
+
+    work = tempfile.mkdtemp(prefix='bench_job_isolation_')
+    in_flight = {'now': 0, 'peak': 0}
+
+    async def fake_generate(model_name, prompt):
+        in_flight['now'] += 1
+        in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+        try:
+            await asyncio.sleep(args.llm_latency)
+            return f"analysis by {model_name}"
+        finally:
+            in_flight['now'] -= 1
+
+    # Every job uploads the same member names with job-specific functions, so any mixing shows up
+    jobs = []
+    for job in range(args.jobs):
+        upload = os.path.join(work, f"upload_{job}.zip")
+        with zipfile.ZipFile(upload, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for i in range(args.files):
+                archive.writestr(f"src/module_{i}.py", f"def job_{job}_handler_{i}(x):\n    return x\n")
+        jobs.append((upload, os.path.join(work, f"result_{job}.json")))
+
+    async def run(max_jobs):
+        in_flight['peak'] = 0
+        cache = ExtractionCache(os.path.join(work, f"cache_{max_jobs}.sqlite3"))
+        try:
+            async with AnalysisJobRunner(max_jobs=max_jobs, parse_workers=args.parse_workers,
+                                         llm_concurrency=args.llm_concurrency, extraction_cache=cache,
+                                         generate=fake_generate) as runner:
+                start = time.time()
+                outcomes = await runner.run_all(jobs)
+                return outcomes, time.time() - start
+        finally:
+            cache.close()
+
+    def check_isolation():
+        mixed = 0
+        for job, (_, output) in enumerate(jobs):
+            with open(output) as f:
+                results = json.load(f)['results']
+            names = [name for result in results for name in result['functions']]
+            mixed += sum(1 for name in names if not name.startswith(f"job_{job}_"))
+            if len(results) != args.files:
+                mixed += 1
+        return mixed
+
+    try:
+        report = {'jobs': args.jobs, 'files_per_job': args.files, 'llm_concurrency': args.llm_concurrency}
+        for label, max_jobs in (('sequential', 1), ('concurrent', args.jobs)):
+            outcomes, seconds = asyncio.run(run(max_jobs))
+            report[label] = {'seconds': round(seconds, 3), 'succeeded': sum(outcomes),
+                             'peak_llm_calls': in_flight['peak'], 'foreign_results': check_isolation()}
+            for _, output in jobs:
+                os.remove(output)
+        report['isolated'] = report['concurrent']['foreign_results'] == 0 \
+            and report['concurrent']['succeeded'] == args.jobs \
+            and report['concurrent']['peak_llm_calls'] <= args.llm_concurrency
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_job_queue(args):
+    """Job scheduler: identical repository submissions coalesced vs one analysis process each"""
+    from job_scheduler import JobQueue, JobScheduler
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_job_queue_')
+    try:
+        urls = [_make_local_repo(os.path.join(work, f"repo{r}"), args.files, 1, rng) for r in range(args.repos)]
+        # Each repository is submitted by several users, interleaved like concurrent requests
+        submissions = [(url, user) for user in range(args.users) for url in urls]
+
+        def run_queue(label, coalesce):
+            queue = JobQueue(os.path.join(work, f"jobs_{label}"))
+            try:
+                start = time.time()
+                job_ids = set()
+                for url, user in submissions:
+                    # A per-user option gives every submission its own dedup key
+                    options = {'no-mirror-cache': True}
+                    if not coalesce:
+                        options['max-workers'] = 4 + user
+                    output = os.path.join(work, f"{label}_{user}_{len(job_ids)}.json")
+                    job_ids.add(queue.submit('repository', url, output, options,
+                                             'interactive' if user == 0 else 'batch')['id'])
+                submitted = time.time() - start
+                processed = JobScheduler(queue, args.workers).run(until_idle=True)
+                states = [queue.status(job_id)['state'] for job_id in job_ids]
+                return {'seconds': round(time.time() - start, 3), 'submit_seconds': round(submitted, 3),
+                        'submissions': len(submissions), 'jobs_run': processed,
+                        'done': states.count('done')}
+            finally:
+                queue.close()
+
+        return {'repos': args.repos, 'users': args.users, 'workers': args.workers,
+                'without_dedup': run_queue('distinct', False), 'coalesced': run_queue('coalesced', True)}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_results_store(args):
+    """Indexed results store vs reloading the output files for requirement and coverage questions"""
+    import csv
+    from offline_matcher import match_requirements
+    from results_store import ResultsStore
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_results_store_')
+    try:
+        functions = []
+        for i in range(args.functions):
+            name = f"{_random_phrase(rng, 2).replace(' ', '_')}_{i}"
+            functions.append({'name': name, 'file': f"module_{i % args.files}.py",
+                              'filepath': f"/repo/src/module_{i % args.files}.py", 'language': 'python',
+                              'kind': 'function', 'start_line': i, 'end_line': i + 10, 'line_count': 10,
+                              'body': f"def {name}(x):\n    return x\n", 'complexity': 1.0,
+                              'docstring': _random_phrase(rng, 8)})
+        analysis = {'repo_url': 'https://github.com/example/bench', 'commit': 'f' * 40,
+                    'files_analyzed': args.files, 'functions_found': len(functions), 'functions': functions}
+        requirements = [f"The system shall {_random_phrase(rng, 6)}" for _ in range(args.requirements)]
+        paths = {name: os.path.join(work, name) for name in ('analysis.json', 'requirements.csv', 'comparison.json')}
+        with open(paths['analysis.json'], 'w') as f:
+            json.dump(analysis, f)
+        with open(paths['requirements.csv'], 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Requirement ID', 'Requirement Text'])
+            writer.writerows((f"REQ-{i}", text) for i, text in enumerate(requirements))
+        with open(paths['comparison.json'], 'w') as f:
+            json.dump(match_requirements(requirements, analysis), f)
+
+        store = ResultsStore(os.path.join(work, 'results.sqlite3'))
+        try:
+            start = time.time()
+            code_run = store.import_analysis(paths['analysis.json'])
+            requirements_run = store.import_requirements(paths['requirements.csv'])
+            store.import_comparison(paths['comparison.json'], code_run, requirements_run)
+            import_seconds = time.time() - start
+
+            probes = [f"REQ-{rng.randrange(args.requirements)}" for _ in range(args.queries)]
+            start = time.time()
+            for probe in probes:
+                store.functions_for_requirement(probe)
+            indexed_lookup = (time.time() - start) / args.queries
+            start = time.time()
+            coverage = store.coverage(analysis['repo_url'], analysis['commit'])
+            indexed_coverage = time.time() - start
+        finally:
+            store.close()
+
+        def scan_lookup(probe):
+            # What the backend does today: reload the CSV and the comparison and walk them
+            with open(paths['requirements.csv'], newline='') as f:
+                text = next(row['Requirement Text'] for row in csv.DictReader(f) if row['Requirement ID'] == probe)
+            with open(paths['comparison.json']) as f:
+                comparison = json.load(f)
+            with open(paths['analysis.json']) as f:
+                by_location = {f"{func['file']}:{func['name']}": func for func in json.load(f)['functions']}
+            return [by_location.get(location) for match in comparison['matches'] if match['requirement'] == text
+                    for location in match['locations']]
+
+        scan_probes = probes[:max(1, args.queries // 20)]
+        start = time.time()
+        for probe in scan_probes:
+            scan_lookup(probe)
+        scan_seconds = (time.time() - start) / len(scan_probes)
+
+        return {'functions': args.functions, 'requirements': args.requirements,
+                'import_seconds': round(import_seconds, 3),
+                'requirement_lookup_ms': {'indexed': round(indexed_lookup * 1000, 3),
+                                          'file_scan': round(scan_seconds * 1000, 1)},
+                'coverage_ms': round(indexed_coverage * 1000, 3), 'coverage': coverage}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_traceability(args):
+    """Full offline rematch vs incremental traceability index updates after a small commit and an SRS edit"""
+    from offline_matcher import match_requirements
+    from traceability_index import TraceabilityIndex
+
+    rng = random.Random(args.seed)
+    work = tempfile.mkdtemp(prefix='bench_traceability_')
+    try:
+        functions = [{'location': f"module_{i % 1000}.py:fn_{i}", 'text': _random_phrase(rng, 12)}
+                     for i in range(args.functions)]
+        requirements = [f"The system shall {_random_phrase(rng, 6)}" for _ in range(args.requirements)]
+
+        index = TraceabilityIndex(os.path.join(work, 'trace.sqlite3'))
+        try:
+            start = time.time()
+            built = index.update(requirements, functions=functions)
+            build_seconds = time.time() - start
+            same_as_full = built == match_requirements(requirements, {}, functions=functions)
+
+            # A small commit: a few functions edited and a few added
+            for i in rng.sample(range(len(functions)), args.changed_functions):
+                functions[i] = dict(functions[i], text=_random_phrase(rng, 12))
+            functions += [{'location': f"new_module.py:fn_{i}", 'text': _random_phrase(rng, 12)}
+                          for i in range(args.changed_functions)]
+            start = time.time()
+            match_requirements(requirements, {}, functions=functions)
+            full_seconds = time.time() - start
+            start = time.time()
+            index.update(requirements, functions=functions)
+            commit_seconds = time.time() - start
+            commit_update = index.last_update
+
+            # An SRS edit: a few requirements reworded
+            for i in rng.sample(range(len(requirements)), args.changed_requirements):
+                requirements[i] = f"The system shall {_random_phrase(rng, 6)}"
+            start = time.time()
+            index.update(requirements, functions=functions)
+            srs_seconds = time.time() - start
+            srs_update = index.last_update
+        finally:
+            index.close()
+
+        return {'functions': len(functions), 'requirements': len(requirements),
+                'fresh_index_matches_full_rematch': same_as_full,
+                'seconds': {'index_build': round(build_seconds, 3), 'full_rematch': round(full_seconds, 3),
+                            'after_commit': round(commit_seconds, 3), 'after_srs_edit': round(srs_seconds, 3)},
+                'after_commit': commit_update, 'after_srs_edit': srs_update}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the analysis scripts")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    offline = subparsers.add_parser('offline-match', help='Offline requirement-to-code matching')
+    offline.add_argument('--requirements', type=int, default=10000)
+    offline.add_argument('--functions', type=int, default=100000)
+    offline.add_argument('--seed', type=int, default=0)
+    offline.set_defaults(func=bench_offline_match)
+
+    concurrency = subparsers.add_parser('concurrency', help='Adaptive LLM concurrency vs a fixed semaphore')
+    concurrency.add_argument('--files', type=int, default=300)
+    concurrency.add_argument('--capacity', type=int, default=12, help='Concurrent calls before the endpoint throttles')
+    concurrency.add_argument('--latency', type=float, default=0.2, help='Base endpoint latency in seconds')
+    concurrency.add_argument('--throttle-rate', type=float, default=0.01, help='Random throttling probability')
+    concurrency.add_argument('--retry-delay', type=float, default=0.05, help='Base retry delay in seconds')
+    concurrency.add_argument('--max-limit', type=int, default=32)
+    concurrency.add_argument('--seed', type=int, default=0)
+    concurrency.set_defaults(func=bench_concurrency)
+
+    mirror = subparsers.add_parser('mirror-cache', help='Repository mirror cache against local file:// repositories')
+    mirror.add_argument('--repos', type=int, default=3)
+    mirror.add_argument('--files', type=int, default=200)
+    mirror.add_argument('--commits', type=int, default=20)
+    mirror.add_argument('--concurrency', type=int, default=4)
+    mirror.add_argument('--seed', type=int, default=0)
+    mirror.set_defaults(func=bench_mirror_cache)
+
+    incremental = subparsers.add_parser('incremental', help='Diff-based re-analysis after a small commit')
+    incremental.add_argument('--files', type=int, default=1000)
+    incremental.add_argument('--changed', type=int, default=10)
+    incremental.add_argument('--seed', type=int, default=0)
+    incremental.set_defaults(func=bench_incremental)
+
+    extraction = subparsers.add_parser('extraction-cache', help='Per-file extraction cache across runs and forks')
+    extraction.add_argument('--files', type=int, default=1000)
+    extraction.add_argument('--seed', type=int, default=0)
+    extraction.set_defaults(func=bench_extraction_cache)
+
+    scaling = subparsers.add_parser('parse-scaling', help='Parsing throughput of thread vs process executors')
+    scaling.add_argument('--files', type=int, default=600)
+    scaling.add_argument('--max-workers', type=int, default=0, help='Highest worker count (default: all cores)')
+    scaling.add_argument('--seed', type=int, default=0)
+    scaling.set_defaults(func=bench_parse_scaling)
+
+    js_extract = subparsers.add_parser('js-extract', help='JS/TS lexer extraction on large bundles')
+    js_extract.add_argument('--modules', type=int, default=5000, help='Modules in the smallest bundle')
+    js_extract.add_argument('--seed', type=int, default=0)
+    js_extract.set_defaults(func=bench_js_extract)
+
+    large = subparsers.add_parser('large-files', help='Single large files with many functions')
+    large.add_argument('--functions', type=int, default=2000, help='Functions in the smallest file')
+    large.set_defaults(func=bench_large_files)
+
+    java_extract = subparsers.add_parser('java-extract', help='javalang vs lexer-only Java extraction')
+    java_extract.add_argument('--methods', type=int, default=1000, help='Methods in the smallest file')
+    java_extract.set_defaults(func=bench_java_extract)
+
+    dart_extract = subparsers.add_parser('dart-extract', help='Dart extraction on a synthetic Flutter codebase')
+    dart_extract.add_argument('--files', type=int, default=500, help='Widget files at the smallest scale')
+    dart_extract.add_argument('--seed', type=int, default=7)
+    dart_extract.set_defaults(func=bench_dart_extract)
+
+    cpp_extract = subparsers.add_parser('cpp-extract', help='C/C++ extraction on multi-megabyte headers')
+    cpp_extract.add_argument('--chunks', type=int, default=2000, help='Generated header sections at the smallest scale')
+    cpp_extract.set_defaults(func=bench_cpp_extract)
+
+    record_memory = subparsers.add_parser('record-memory', help='Memory of function records as dicts vs FunctionStore')
+    record_memory.add_argument('--files', type=int, default=500)
+    record_memory.add_argument('--functions-per-file', type=int, default=120)
+    record_memory.add_argument('--seed', type=int, default=7)
+    record_memory.set_defaults(func=bench_record_memory)
+
+    discovery = subparsers.add_parser('discovery', help='Pruned and git-index file discovery vs a full walk')
+    discovery.add_argument('--source-files', type=int, default=2000)
+    discovery.add_argument('--dependency-files', type=int, default=40000)
+    discovery.set_defaults(func=bench_discovery)
+
+    zip_ingest = subparsers.add_parser('zip-ingest', help='Streaming ZIP ingestion vs extractall, and zip bomb limits')
+    zip_ingest.add_argument('--files', type=int, default=2000)
+    zip_ingest.add_argument('--assets', type=int, default=200)
+    zip_ingest.add_argument('--asset-kb', type=int, default=256)
+    zip_ingest.add_argument('--bomb-members', type=int, default=4)
+    zip_ingest.add_argument('--seed', type=int, default=7)
+    zip_ingest.set_defaults(func=bench_zip_ingest)
+
+    isolation = subparsers.add_parser('job-isolation', help='Concurrent analyses sharing CPU and LLM budgets')
+    isolation.add_argument('--jobs', type=int, default=8)
+    isolation.add_argument('--files', type=int, default=20)
+    isolation.add_argument('--parse-workers', type=int, default=4)
+    isolation.add_argument('--llm-concurrency', type=int, default=6)
+    isolation.add_argument('--llm-latency', type=float, default=0.05)
+    isolation.set_defaults(func=bench_job_isolation)
+
+    job_queue = subparsers.add_parser('job-queue', help='Persistent job queue with coalesced identical submissions')
+    job_queue.add_argument('--repos', type=int, default=3)
+    job_queue.add_argument('--users', type=int, default=4)
+    job_queue.add_argument('--files', type=int, default=30)
+    job_queue.add_argument('--workers', type=int, default=2)
+    job_queue.add_argument('--seed', type=int, default=7)
+    job_queue.set_defaults(func=bench_job_queue)
+
+    results = subparsers.add_parser('results-store', help='Indexed results store queries vs rescanning output files')
+    results.add_argument('--functions', type=int, default=100000)
+    results.add_argument('--files', type=int, default=2000)
+    results.add_argument('--requirements', type=int, default=2000)
+    results.add_argument('--queries', type=int, default=200)
+    results.add_argument('--seed', type=int, default=7)
+    results.set_defaults(func=bench_results_store)
+
+    trace = subparsers.add_parser('traceability', help='Incremental traceability index vs a full offline rematch')
+    trace.add_argument('--functions', type=int, default=100000)
+    trace.add_argument('--requirements', type=int, default=2000)
+    trace.add_argument('--changed-functions', type=int, default=20)
+    trace.add_argument('--changed-requirements', type=int, default=5)
+    trace.add_argument('--seed', type=int, default=7)
+    trace.set_defaults(func=bench_traceability)
+
+    args = parser.parse_args()
+    print(json.dumps(args.func(args), indent=2))
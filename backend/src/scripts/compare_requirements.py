@@ -7,6 +7,9 @@ import google.generativeai as genai
 from pathlib import Path
 from tenacity import retry, stop_after_attempt, wait_exponential
 import time
+from offline_matcher import match_requirements
+from prompt_budget import compact_json, fit_json, log_usage
+from traceability_index import TraceabilityIndex
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +31,12 @@ MODELS = [
 LAST_API_CALL_TIME = 0
 MIN_CALL_INTERVAL = 5  # Minimum seconds between API calls
 
+# Prompt budget for the embedded source code analysis (estimated tokens)
+SOURCE_CODE_TOKEN_BUDGET = 60000
+
+# Traceability index kept next to the output, so reruns only re-evaluate what changed
+TRACE_INDEX_SUFFIX = ".trace.sqlite3"
+
 def rate_limit():
     """Enforce rate limiting between API calls"""
     global LAST_API_CALL_TIME
@@ -43,6 +52,7 @@ def generate_with_model(model_name, prompt):
     try:
         model = genai.GenerativeModel(model_name)
         response = model.generate_content(prompt)
+        log_usage(model_name, prompt, response.text, getattr(response, 'usage_metadata', None))
         return response.text
     except Exception as e:
         logging.error(f"Error with {model_name}: {str(e)}")
@@ -83,9 +93,8 @@ def analyze_with_models(prompt):
         logging.error(f"All models failed. Last error: {str(last_error)}")
     return None
 
-def compare_requirements_with_code(requirements_path, source_code_path, output_path):
-    """Main comparison function"""
-    # Load requirements
+def load_requirements(requirements_path):
+    """Load requirement texts from the extracted requirements CSV"""
     try:
         requirements = []
         with open(requirements_path, 'r', encoding='utf-8') as csvfile:
@@ -97,27 +106,77 @@ def compare_requirements_with_code(requirements_path, source_code_path, output_p
                 if 'Requirement Text' in row and row['Requirement Text'].strip():
                     requirements.append(row['Requirement Text'])
         logging.info(f"Loaded {len(requirements)} requirements")
+        return requirements
     except Exception as e:
         logging.error(f"Error reading requirements: {str(e)}")
         return None
 
-    # Load source code
+def load_source_code(source_code_path):
+    """Load the source code analysis JSON"""
     try:
         with open(source_code_path, 'r', encoding='utf-8') as jsonfile:
             source_code = json.load(jsonfile)
         logging.info("Successfully loaded source code analysis")
+        return source_code
     except Exception as e:
         logging.error(f"Error reading source code: {str(e)}")
         return None
-    
+
+def save_analysis(analysis, output_path):
+    with open(output_path, 'w', encoding='utf-8') as outfile:
+        json.dump(analysis, outfile, indent=2)
+
+def offline_compare(requirements, source_code, output_path, trace_index=True):
+    """Offline comparison, updated incrementally through the traceability index next to the output"""
+    if not trace_index:
+        return match_requirements(requirements, source_code)
+    index = TraceabilityIndex(output_path + TRACE_INDEX_SUFFIX)
+    try:
+        return index.update(requirements, source_code)
+    finally:
+        index.close()
+
+def offline_fallback(offline_analysis, reason, output_path):
+    """The offline results of an auto comparison whose Gemini pass failed, saved with the reason"""
+    if not offline_analysis:
+        return None
+    logging.warning(f"{reason}; the output holds the offline comparison only")
+    offline_analysis["fallback_reason"] = reason
+    save_analysis(offline_analysis, output_path)
+    return offline_analysis
+
+def compare_requirements_with_code(requirements_path, source_code_path, output_path, backend="auto",
+                                   trace_index=True):
+    """Main comparison function (backend: "llm", "offline", or "auto" = offline first pass refined by Gemini)"""
+    requirements = load_requirements(requirements_path)
+    if requirements is None:
+        return None
+
+    source_code = load_source_code(source_code_path)
+    if source_code is None:
+        return None
+
+    offline_analysis = None
+    if backend in ("offline", "auto"):
+        try:
+            start = time.time()
+            offline_analysis = dict(offline_compare(requirements, source_code, output_path, trace_index),
+                                    backend="offline")
+            save_analysis(offline_analysis, output_path)
+            logging.info(f"Offline comparison finished in {time.time() - start:.2f}s")
+        except Exception as e:
+            logging.error(f"Offline comparison failed: {str(e)}")
+        if backend == "offline":
+            return offline_analysis
+
     # Prepare precise prompt
     prompt = f"""Analyze these software requirements against the provided source code with 100% accuracy:
 
     Requirements:
-    {json.dumps(requirements, indent=2)}
+    {compact_json(requirements)}
 
     Source Code Structure:
-    {json.dumps(source_code, indent=2)}
+    {fit_json(source_code, SOURCE_CODE_TOKEN_BUDGET)}
 
     Return a detailed JSON analysis with EXACTLY this structure:
     {{
@@ -161,16 +220,17 @@ def compare_requirements_with_code(requirements_path, source_code_path, output_p
         analysis = analyze_with_models(prompt)
         if not analysis:
             logging.error("Analysis failed with all models")
-            return None
-            
+            return offline_fallback(offline_analysis, "Gemini analysis failed with all models", output_path)
+
         # Save results
-        with open(output_path, 'w', encoding='utf-8') as outfile:
-            json.dump(analysis, outfile, indent=2)
+        analysis["backend"] = "llm"
+        save_analysis(analysis, output_path)
         return analysis
-        
+
     except Exception as e:
         logging.error(f"Error during analysis: {str(e)}")
-        return None
+        return offline_fallback(offline_analysis, f"Gemini analysis failed: {e}", output_path)
+
 
 if __name__ == "__main__":
     import argparse
@@ -179,7 +239,12 @@ if __name__ == "__main__":
     parser.add_argument('--requirements', required=True)
     parser.add_argument('--sourcecode', required=True)
     parser.add_argument('--output', required=True)
+    parser.add_argument('--backend', choices=['llm', 'offline', 'auto'], default='auto',
+                        help='llm: Gemini only, offline: vector matching only, auto: offline first pass then Gemini')
+    parser.add_argument('--no-trace-index', action='store_true',
+                        help='Match from scratch instead of updating the traceability index next to the output')
     args = parser.parse_args()
     
-    result = compare_requirements_with_code(args.requirements, args.sourcecode, args.output)
+    result = compare_requirements_with_code(args.requirements, args.sourcecode, args.output, args.backend,
+                                            not args.no_trace_index)
     sys.exit(0 if result else 1)
\ No newline at end of file
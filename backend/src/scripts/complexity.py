@@ -0,0 +1,148 @@
+import ast
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+BRANCH_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try, ast.With, ast.AsyncWith,
+                ast.IfExp, ast.BoolOp, ast.comprehension, ast.ExceptHandler)
+if hasattr(ast, 'Match'):
+    BRANCH_NODES += (ast.Match,)
+NESTING_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try, ast.With, ast.AsyncWith,
+                 ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+_BRANCH_TOKEN_RE = re.compile(r"\b(?:if|for|while|case|catch|switch|foreach|elif|except)\b|&&|\|\||\?\?|\?(?=[^.?])")
+_CALL_RE = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+_WORD_RE = re.compile(r"[A-Za-z_]\w*")
+_STATEMENT_RE = re.compile(r";|\n\s*\S")
+_NON_CALLS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'function', 'sizeof', 'typeof', 'new'}
+_ACCESSOR_NAME_RE = re.compile(r"^(?:get|set|is|has)[A-Z_]|^(?:get|set)_|^__\w+__$")
+_GENERATED_MARKERS_RE = re.compile(r"@generated|DO NOT EDIT|auto-?generated|Generated by|GENERATED CODE", re.IGNORECASE)
+GENERATED_PATH_PATTERNS = ('.g.dart', '.freezed.dart', '.pb.dart', '_pb2.py', '_pb2_grpc.py', '.min.js',
+                           '.bundle.js', '/generated/', '/gen/', '.designer.')
+
+
+def _nesting_depth(node: ast.AST, depth: int = 0) -> int:
+    deepest = depth
+    for child in ast.iter_child_nodes(node):
+        deepest = max(deepest, _nesting_depth(child, depth + isinstance(child, NESTING_NODES)))
+    return deepest
+
+
+def _is_python_accessor(node: ast.AST) -> bool:
+    """A body that only returns or assigns a single attribute, e.g. `return self._x`"""
+    body = [stmt for stmt in node.body if not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant))]
+    if len(body) != 1:
+        return False
+    stmt = body[0]
+    if isinstance(stmt, ast.Return):
+        return stmt.value is None or isinstance(stmt.value, (ast.Attribute, ast.Name, ast.Constant))
+    if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+        return isinstance(stmt.targets[0], ast.Attribute) and isinstance(stmt.value, (ast.Name, ast.Constant))
+    return isinstance(stmt, ast.Pass)
+
+
+def score_python_function(node: ast.AST) -> float:
+    """Complexity from the AST: branching, calls, nesting depth and statement count"""
+    if _is_python_accessor(node):
+        return 0.0
+    branches = calls = statements = 0
+    for child in ast.walk(node):
+        if isinstance(child, BRANCH_NODES):
+            branches += 1
+        elif isinstance(child, ast.Call):
+            calls += 1
+        if isinstance(child, ast.stmt):
+            statements += 1
+    return round(1 + 2 * branches + 0.5 * calls + 1.5 * _nesting_depth(node) + 0.2 * statements, 2)
+
+
+def _brace_depth(body: str) -> int:
+    depth = deepest = 0
+    for ch in body:
+        if ch == '{':
+            depth += 1
+            deepest = max(deepest, depth)
+        elif ch == '}':
+            depth -= 1
+    return deepest
+
+
+def score_tokens(body: str, name: str = "") -> float:
+    """Token-based complexity approximation for languages without an AST here"""
+    if not body:
+        return 0.0
+    statements = len(_STATEMENT_RE.findall(body))
+    if statements <= 2 and _ACCESSOR_NAME_RE.match(name or ""):
+        return 0.0
+    branches = len(_BRANCH_TOKEN_RE.findall(body))
+    calls = sum(1 for m in _CALL_RE.finditer(body) if m.group(1) not in _NON_CALLS)
+    # The outer function body accounts for one level of braces
+    depth = max(_brace_depth(body) - 1, 0)
+    return round(1 + 2 * branches + 0.5 * calls + 1.5 * depth + 0.2 * statements, 2)
+
+
+def has_good_docstring(docstring: Optional[str]) -> bool:
+    """A docstring that already explains the function (a sentence of six or more words)"""
+    return bool(docstring) and len(docstring.split()) >= 6
+
+
+def is_generated_file(filepath: str, head: str = "") -> bool:
+    """Detect generated code from the file name or a marker near the top of the file"""
+    normalized = filepath.replace("\\", "/").lower()
+    if any(pattern in normalized for pattern in GENERATED_PATH_PATTERNS):
+        return True
+    return bool(head) and bool(_GENERATED_MARKERS_RE.search(head))
+
+
+def skip_reason(func: Dict) -> Optional[str]:
+    if func.get('generated'):
+        return "generated"
+    if has_good_docstring(func.get('docstring')):
+        return "documented"
+    if func.get('complexity', 0) <= 0:
+        return "trivial"
+    return None
+
+
+def novelty_scores(functions: List[Dict]) -> List[float]:
+    """Mean inverse document frequency of each function's identifiers across the repo (0-1)"""
+    vocabularies = [set(_WORD_RE.findall(f"{f.get('name', '')} {f.get('body') or ''}")) for f in functions]
+    df = Counter(word for vocab in vocabularies for word in vocab)
+    max_idf = math.log(len(functions) + 1) or 1.0
+    scores = []
+    for vocab in vocabularies:
+        if not vocab:
+            scores.append(0.0)
+            continue
+        idf = sum(math.log((len(functions) + 1) / df[word]) for word in vocab) / len(vocab)
+        scores.append(min(idf / max_idf, 1.0))
+    return scores
+
+
+def select_for_llm(functions: List[Dict], policy: str = "budget", top_n: int = 100, budget: int = 200,
+                   min_score: float = 0.0, is_cached: Callable[[Dict], bool] = lambda func: False) -> List[Dict]:
+    """Choose which functions get LLM analysis.
+
+    Candidates are ranked by complexity weighted by novelty. "top_n" keeps the N best;
+    "budget" spends at most `budget` uncached calls in rank order (cached results are free);
+    "all" keeps every candidate that passes the skip rules.
+    """
+    candidates = [f for f in functions if skip_reason(f) is None and f.get('complexity', 0) >= min_score]
+    if policy == "all":
+        return candidates
+
+    novelty = novelty_scores(candidates)
+    ranked = [f for _, f in sorted(zip(novelty, candidates),
+                                   key=lambda pair: pair[1]['complexity'] * (0.5 + pair[0]), reverse=True)]
+    if policy == "top_n":
+        return ranked[:top_n]
+
+    selected, spent = [], 0
+    for func in ranked:
+        if is_cached(func):
+            selected.append(func)
+        elif spent < budget:
+            selected.append(func)
+            spent += 1
+    return selected
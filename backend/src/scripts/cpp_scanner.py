@@ -0,0 +1,318 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from js_lexer import IDENT, NUMBER, PUNCT, STRING, Token, match_brackets
+
+CLASS_KEYWORDS = {'class', 'struct', 'union'}
+# Identifiers that take a parenthesised argument inside a declaration head
+HEAD_SPECIFIERS = {'__attribute__', '__declspec', 'alignas', 'decltype', '__pragma', '_Alignas'}
+# Allowed between a parameter list and the function body
+FUNCTION_QUALIFIERS = {
+    'const', 'volatile', 'noexcept', 'override', 'final', 'throw', 'mutable', 'constexpr', 'try', 'requires',
+    '__attribute__', '__declspec'
+}
+NOT_FUNCTION_NAMES = {
+    'if', 'for', 'while', 'switch', 'return', 'sizeof', 'alignof', 'catch', 'static_assert', 'typeid',
+    'new', 'delete', 'throw', 'noexcept', 'defined', 'void', 'int', 'char', 'short', 'long', 'float', 'double',
+    'bool', 'signed', 'unsigned', 'auto', 'wchar_t'
+} | HEAD_SPECIFIERS
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<line_comment>//(?:[^\n\\]|\\[\s\S])*)
+  | (?P<block_comment>/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/\*[\s\S]*)
+  | (?P<directive>\#(?:[^\n\\/]|\\[\s\S]|/(?![/*]))*)
+  | (?P<raw_string>(?:u8|[uUL])?R"(?P<delimiter>[^()\\\s"]{0,16})\()
+  | (?P<string>(?:u8|[uUL])?"(?:[^"\\\n]|\\[\s\S])*"?)
+  | (?P<char>(?:u8|[uUL])?'(?:[^'\\\n]|\\[\s\S])*'?)
+  | (?P<ident>[A-Za-z_\u0080-\uffff][\w\u0080-\uffff]*)
+  | (?P<number>\d(?:[\w.]|'(?=\w))*|\.\d\w*)
+  | (?P<punct>::|->|\.\.\.|[^\s\w])
+""", re.VERBOSE)
+# Rest of a directive line after a block comment inside it
+_DIRECTIVE_REST_RE = re.compile(r"(?:[^\n\\/]|\\[\s\S]|/(?![/*]))*")
+_BLOCK_COMMENT_RE = re.compile(r"/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/\*[\s\S]*")
+_DIRECTIVE_NAME_RE = re.compile(r"#\s*(\w*)\s*(.*)", re.DOTALL)
+_CONDITIONAL_RE = re.compile(r"^[ \t]*#[ \t]*(if|ifdef|ifndef|elif|else|endif)\b", re.MULTILINE)
+
+
+def _skip_branch(source: str, pos: int) -> Tuple[int, str]:
+    """Skip a conditional branch; returns the position after the #elif, #else or #endif ending it"""
+    depth = 0
+    for match in _CONDITIONAL_RE.finditer(source, pos):
+        keyword = match.group(1)
+        if keyword.startswith('if'):
+            depth += 1
+        elif depth and keyword == 'endif':
+            depth -= 1
+        elif not depth:
+            line_end = source.find('\n', match.end())
+            return (len(source) if line_end < 0 else line_end), keyword
+    return len(source), 'endif'
+
+
+def tokenize_cpp(source: str) -> List[Token]:
+    """Single pass over C/C++ source; comments and preprocessor lines are dropped.
+
+    Only the first branch of each #if/#elif/#else chain is kept (the #else branch
+    for `#if 0`), so duplicated declarations under different conditions do not
+    unbalance the braces. Strings, raw strings and character literals are opaque.
+    """
+    tokens: List[Token] = []
+    pos, length = 0, len(source)
+    line_start = True
+    while pos < length:
+        match = _TOKEN_RE.match(source, pos)
+        kind = match.lastgroup
+        end = match.end()
+
+        if kind == 'ws':
+            line_start = line_start or '\n' in match.group()
+        elif kind == 'line_comment':
+            pass
+        elif kind == 'block_comment':
+            # A comment does not end the line, so a directive may still follow it
+            pass
+        elif kind == 'directive' and line_start:
+            while source.startswith('/*', end):
+                end = _BLOCK_COMMENT_RE.match(source, end).end()
+                end = _DIRECTIVE_REST_RE.match(source, end).end()
+            name, condition = _DIRECTIVE_NAME_RE.match(source, pos, end).groups()
+            if name in ('elif', 'else'):
+                # A previous branch was taken: drop everything up to the #endif
+                keyword = name
+                while keyword != 'endif':
+                    end, keyword = _skip_branch(source, end)
+            elif name == 'if' and condition.strip() == '0':
+                end, _ = _skip_branch(source, end)
+        elif kind == 'raw_string':
+            closing = source.find(f"){match.group('delimiter')}\"", end)
+            end = length if closing < 0 else closing + len(match.group('delimiter')) + 2
+            tokens.append((STRING, source[pos:end], pos, end))
+            line_start = False
+        else:
+            token_kind = {'ident': IDENT, 'number': NUMBER, 'string': STRING, 'char': STRING}.get(kind, PUNCT)
+            text = match.group(kind)
+            if kind == 'directive':
+                # '#' in the middle of a line, e.g. after a stray backslash continuation
+                text, end = '#', pos + 1
+            tokens.append((token_kind, text, pos, end))
+            line_start = False
+        pos = end
+    return tokens
+
+
+def _statement_end(tokens: List[Token], matches: List[int], i: int, end: int) -> int:
+    """Index of the ';' ending the statement at i (or end), skipping nested brackets"""
+    while i < end and tokens[i][1] != ';':
+        text = tokens[i][1]
+        i = matches[i] + 1 if text in ('(', '[', '{') and matches[i] > i else i + 1
+    return i
+
+
+def _angle_start(tokens: List[Token], i: int, floor: int) -> int:
+    """Index of the '<' matching the '>' at i, or floor - 1 when there is none"""
+    depth = 0
+    while i >= floor:
+        text = tokens[i][1]
+        if text == '>':
+            depth += 1
+        elif text == '<':
+            depth -= 1
+            if depth == 0:
+                return i
+        elif text in (';', '{', '}'):
+            break
+        i -= 1
+    return floor - 1
+
+
+def _class_name(tokens: List[Token], keyword: int, brace: int) -> str:
+    """Name of a class, struct or union whose head runs from keyword to its body brace"""
+    name, angle = "", 0
+    for k in range(keyword + 1, brace):
+        kind, text = tokens[k][0], tokens[k][1]
+        if text == '<':
+            angle += 1
+        elif text == '>':
+            angle -= 1
+        elif text == ':' and not angle:
+            break
+        elif kind == IDENT and not angle and text != 'final':
+            name = text
+    return name
+
+
+def find_cpp_functions(source: str) -> List[Dict]:
+    """Function, method, constructor and destructor definitions in C/C++ source, in linear time.
+
+    Declarations without a body are skipped; bodies are not searched, so lambdas
+    and local classes belong to their enclosing function.
+    """
+    tokens = tokenize_cpp(source)
+    matches = match_brackets(tokens)
+    functions: List[Dict] = []
+
+    def definition_end(k: int, end: int) -> Tuple[Optional[int], Optional[int]]:
+        """(last token of the body, None) after a parameter list, (None, restart index) for a
+        preceding macro invocation, or (None, None) for a declaration"""
+        in_init = trailing = False
+        while k < end:
+            kind, text = tokens[k][0], tokens[k][1]
+            if text == '{':
+                if in_init and (tokens[k - 1][0] == IDENT or tokens[k - 1][1] == '>') and matches[k] > k:
+                    # Brace member initializer: a{x}
+                    k = matches[k] + 1
+                    continue
+                if matches[k] < k:
+                    return None, None
+                last = matches[k]
+                # Handlers of a function-try-block
+                while last + 2 < end and tokens[last + 1][1] == 'catch' and matches[last + 2] > last + 2:
+                    brace = matches[last + 2] + 1
+                    if brace >= end or tokens[brace][1] != '{' or matches[brace] < brace:
+                        break
+                    last = matches[brace]
+                return last, None
+            if text in ('(', '[') and matches[k] > k:
+                k = matches[k] + 1
+                continue
+            if kind == IDENT and not (in_init or trailing) and text not in FUNCTION_QUALIFIERS \
+                    and '\n' in source[tokens[k - 1][3]:tokens[k][2]]:
+                # `MACRO(args)` without a semicolon, followed by the next declaration
+                return None, k
+            if text == ':':
+                in_init = True
+            elif text in ('->', 'requires'):
+                trailing = True
+            elif text in (';', '=', ')', '}') or text == ',' and not in_init:
+                return None, None
+            k += 1
+        return None, None
+
+    def parse_scope(i: int, end: int, owner: str):
+        while i < end:
+            start = i
+            kind, text = tokens[i][0], tokens[i][1]
+            if text == ';':
+                i += 1
+                continue
+            # Access specifiers and labels: `public:`, `signals:`, `public slots:`
+            if kind == IDENT and i + 1 < end and tokens[i + 1][1] == ':':
+                i += 2
+                continue
+            if kind == IDENT and i + 2 < end and tokens[i + 1][0] == IDENT and tokens[i + 2][1] == ':' \
+                    and text in ('public', 'protected', 'private'):
+                i += 3
+                continue
+            if text in ('typedef', 'using'):
+                i = _statement_end(tokens, matches, i, end) + 1
+                continue
+
+            # Scan the declaration head up to its parameters, body or initializer
+            j, angle, keyword, operator = i, 0, None, None
+            while j < end:
+                kind, text = tokens[j][0], tokens[j][1]
+                if text == '<':
+                    angle += 1
+                elif text == '>' and angle:
+                    angle -= 1
+                elif text in ('{', ';'):
+                    break
+                elif text in ('(', '[') and matches[j] > j and (angle or text == '['
+                                                                 or j > i and tokens[j - 1][1] in HEAD_SPECIFIERS):
+                    j = matches[j]
+                elif angle:
+                    pass
+                elif text in ('(', '='):
+                    break
+                elif text == 'operator':
+                    # Operator symbols such as == or () come before the parameters
+                    operator = j
+                    j += 1
+                    if j + 1 < end and tokens[j][1] == '(' and tokens[j + 1][1] == ')':
+                        j += 2
+                    while j < end and tokens[j][1] not in ('(', ';', '{'):
+                        j += 1
+                    break
+                elif kind == IDENT and keyword is None and (text in CLASS_KEYWORDS or text in ('enum', 'namespace')):
+                    keyword = j
+                j += 1
+            if j >= end:
+                break
+            head = tokens[j][1]
+
+            if head == '{':
+                if matches[j] < j:
+                    i = j + 1
+                    continue
+                keyword_text = tokens[keyword][1] if keyword is not None else None
+                if keyword_text in CLASS_KEYWORDS:
+                    name = _class_name(tokens, keyword, j)
+                    parse_scope(j + 1, matches[j], f"{owner}::{name}" if owner and name else name or owner)
+                    i = _statement_end(tokens, matches, j, end) + 1
+                elif keyword_text == 'namespace' or tokens[i][1] == 'extern':
+                    parse_scope(j + 1, matches[j], owner)
+                    i = matches[j] + 1
+                else:
+                    # Enums and brace-initialized variables
+                    i = _statement_end(tokens, matches, j, end) + 1
+                continue
+
+            if head != '(' or matches[j] < j:
+                i = _statement_end(tokens, matches, j, end) + 1
+                continue
+
+            name_index = None
+            if operator is not None:
+                name_index = operator
+                name = "operator" + "".join((" " if tokens[k][0] == IDENT else "") + tokens[k][1]
+                                            for k in range(operator + 1, j))
+            elif j - 1 >= i and tokens[j - 1][0] == IDENT and tokens[j - 1][1] not in NOT_FUNCTION_NAMES:
+                name_index = j - 1
+            elif j - 1 > i and tokens[j - 1][1] == '>':
+                # Explicit specialization: name<T>(...)
+                opener = _angle_start(tokens, j - 1, i)
+                if opener > i and tokens[opener - 1][0] == IDENT:
+                    name_index = opener - 1
+            if name_index is None:
+                i = _statement_end(tokens, matches, j, end) + 1
+                continue
+            if operator is None:
+                name = tokens[name_index][1]
+
+            last, restart = definition_end(matches[j] + 1, end)
+            if restart is not None:
+                i = restart
+                continue
+            if last is None:
+                i = _statement_end(tokens, matches, j, end) + 1
+                continue
+
+            # Qualified names: ns::Class::name, Class<T>::~Class
+            q, destructor = name_index, False
+            if q - 1 >= i and tokens[q - 1][1] == '~':
+                name, destructor, q = f"~{name}", True, q - 1
+            qualifiers: List[str] = []
+            while q - 2 >= i and tokens[q - 1][1] == '::':
+                p = q - 2
+                if tokens[p][1] == '>':
+                    p = _angle_start(tokens, p, i) - 1
+                if p < i or tokens[p][0] != IDENT:
+                    break
+                qualifiers.insert(0, tokens[p][1])
+                q = p
+            owner_name = "::".join(filter(None, [owner, *qualifiers]))
+
+            if destructor:
+                func_kind = 'destructor'
+            elif owner_name and name == owner_name.split('::')[-1]:
+                func_kind = 'constructor'
+            else:
+                func_kind = 'method' if owner_name else 'function'
+            functions.append({'name': name, 'kind': func_kind, 'class': owner_name or None,
+                              'start': tokens[start][2], 'end': tokens[last][3]})
+            i = last + 1
+
+    parse_scope(0, len(tokens), "")
+    return functions
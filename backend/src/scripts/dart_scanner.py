@@ -0,0 +1,260 @@
+import re
+from typing import Dict, List, Optional
+
+from js_lexer import IDENT, PUNCT, STRING, Token, match_brackets
+
+TYPE_KEYWORDS = {'class', 'mixin', 'extension', 'enum'}
+DIRECTIVES = {'import', 'export', 'part', 'library', 'typedef'}
+MEMBER_MODIFIERS = {
+    'static', 'final', 'const', 'late', 'external', 'factory', 'abstract', 'covariant', 'sealed', 'base',
+    'interface', 'mixin', 'augment'
+}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<raw_string>r(?:'''[\s\S]*?(?:'''|\Z)|\"\"\"[\s\S]*?(?:\"\"\"|\Z)|'[^'\n]*'?|"[^"\n]*"?))
+  | (?P<string>'''|\"\"\"|'|")
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*|\.\d\w*)
+  | (?P<punct>=>|\?\.|\?\?|\.\.\.?|[^\s\w])
+""", re.VERBOSE)
+_COMMENT_DELIMITER_RE = re.compile(r"/\*|\*/")
+# String bodies up to the closing quote or the start of a ${...} interpolation
+_STRING_CHUNK_RE = {
+    "'": re.compile(r"(?:[^'\\$\n]|\\[\s\S]|\$(?!\{))*(?:'|\$\{)?"),
+    '"': re.compile(r'(?:[^"\\$\n]|\\[\s\S]|\$(?!\{))*(?:"|\$\{)?'),
+    "'''": re.compile(r"(?:[^'\\$]|\\[\s\S]|\$(?!\{)|'(?!''))*(?:'''|\$\{)?"),
+    '"""': re.compile(r'(?:[^"\\$]|\\[\s\S]|\$(?!\{)|"(?!""))*(?:"""|\$\{)?'),
+}
+
+
+def _block_comment_end(source: str, pos: int) -> int:
+    """End of a block comment starting at pos; Dart block comments nest"""
+    depth = 0
+    for match in _COMMENT_DELIMITER_RE.finditer(source, pos):
+        depth += 1 if match.group() == '/*' else -1
+        if depth == 0:
+            return match.end()
+    return len(source)
+
+
+def tokenize_dart(source: str) -> List[Token]:
+    """Single pass over Dart source; strings, including ${...} interpolations, are opaque tokens"""
+    tokens: List[Token] = []
+    # One entry per open '{': None for code braces, the quote for a string interpolation
+    braces: List[Optional[str]] = []
+    pos, length = 0, len(source)
+
+    def scan_string(quote: str, start: int, token_start: int) -> int:
+        match = _STRING_CHUNK_RE[quote].match(source, start)
+        end = match.end()
+        tokens.append((STRING, source[token_start:end], token_start, end))
+        if source.endswith("${", 0, end) and end > start:
+            braces.append(quote)
+        return end
+
+    while pos < length:
+        match = _TOKEN_RE.match(source, pos)
+        kind = match.lastgroup
+        text = match.group(kind)
+        end = match.end()
+
+        if kind in ('ws', 'line_comment'):
+            pos = end
+        elif kind == 'block_comment':
+            pos = _block_comment_end(source, pos)
+        elif kind == 'string':
+            pos = scan_string(text, end, pos)
+        elif kind == 'raw_string':
+            tokens.append((STRING, text, pos, end))
+            pos = end
+        else:
+            if text == '{':
+                braces.append(None)
+            elif text == '}' and braces:
+                quote = braces.pop()
+                if quote is not None:
+                    # End of an interpolation: back inside the string
+                    pos = scan_string(quote, end, pos)
+                    continue
+            tokens.append((IDENT if kind == 'ident' else PUNCT if kind == 'punct' else kind, text, pos, end))
+            pos = end
+    return tokens
+
+
+def _skip_annotation(tokens: List[Token], matches: List[int], i: int) -> int:
+    i += 2
+    while i + 1 < len(tokens) and tokens[i][1] == '.' and tokens[i + 1][0] == IDENT:
+        i += 2
+    if i < len(tokens) and tokens[i][1] == '(' and matches[i] > i:
+        i = matches[i] + 1
+    return i
+
+
+def _statement_end(tokens: List[Token], matches: List[int], i: int, end: int) -> int:
+    """Index of the ';' ending the statement at i (or end), skipping nested brackets"""
+    while i < end and tokens[i][1] != ';':
+        text = tokens[i][1]
+        i = matches[i] + 1 if text in ('(', '[', '{') and matches[i] > i else i + 1
+    return i
+
+
+def _body_end(tokens: List[Token], matches: List[int], i: int, end: int) -> Optional[int]:
+    """Last token index of a body starting after the parameters at i ('{...}' or '=> expr;')"""
+    # async / async* / sync* and constructor initializer lists
+    initializers = False
+    while i < end and tokens[i][1] not in ('{', '=>', ';'):
+        text = tokens[i][1]
+        if text in ('(', '[') and matches[i] > i:
+            i = matches[i]
+        elif text == ':':
+            # `: _x = x, super(x)` assigns fields before the body
+            initializers = True
+        elif text == '}' or (text == '=' and not initializers):
+            return None
+        i += 1
+    if i >= end or tokens[i][1] == ';':
+        return None
+    if tokens[i][1] == '{':
+        return matches[i] if matches[i] > i else None
+    last = _statement_end(tokens, matches, i + 1, end)
+    # An expression body cut off by the end of the scope has no ';'
+    return last if last < end else None
+
+
+def find_dart_functions(source: str) -> List[Dict]:
+    """Top-level functions and class, mixin, extension and enum members with exact spans.
+
+    Local functions and closures inside bodies are part of their enclosing function.
+    """
+    tokens = tokenize_dart(source)
+    matches = match_brackets(tokens)
+    functions: List[Dict] = []
+
+    def add(name: str, kind: str, owner: str, start: int, last: int):
+        functions.append({'name': name, 'kind': kind, 'class': owner or None,
+                          'start': tokens[start][2], 'end': tokens[last][3]})
+
+    def parse_body(i: int, end: int, owner: str, owner_kind: str):
+        if owner_kind == 'enum':
+            # Values come first, up to the first top-level ';'
+            i = _statement_end(tokens, matches, i, end) + 1
+
+        while i < end:
+            start = i
+            while i + 1 < end and tokens[i][1] == '@' and tokens[i + 1][0] == IDENT:
+                i = _skip_annotation(tokens, matches, i)
+            if i >= end:
+                break
+            kind, text = tokens[i][0], tokens[i][1]
+
+            if text == ';':
+                i += 1
+                continue
+            if kind == IDENT and text in DIRECTIVES:
+                i = _statement_end(tokens, matches, i, end) + 1
+                continue
+
+            # Type declarations, possibly after class modifiers such as `abstract` or `sealed`
+            j = i
+            while j < end and tokens[j][0] == IDENT and tokens[j][1] in MEMBER_MODIFIERS \
+                    and not (tokens[j][1] == 'mixin' and (j + 1 >= end or tokens[j + 1][1] not in TYPE_KEYWORDS)):
+                j += 1
+            if j < end and tokens[j][0] == IDENT and tokens[j][1] in TYPE_KEYWORDS \
+                    and owner_kind == 'file':
+                type_kind = tokens[j][1]
+                name = tokens[j + 1][1] if j + 1 < end and tokens[j + 1][0] == IDENT and tokens[j + 1][1] != 'on' \
+                    else ""
+                brace = j + 1
+                while brace < end and tokens[brace][1] not in ('{', ';'):
+                    brace = matches[brace] + 1 if tokens[brace][1] in ('(', '[') and matches[brace] > brace \
+                        else brace + 1
+                if brace < end and tokens[brace][1] == '{' and matches[brace] > brace:
+                    parse_body(brace + 1, matches[brace], name, type_kind)
+                    i = matches[brace] + 1
+                else:
+                    i = brace + 1
+                continue
+
+            # Scan the declaration head up to its parameters, body or initializer
+            j, operator = i, None
+            while j < end and tokens[j][1] not in ('(', '{', '=>', '=', ';'):
+                if tokens[j][1] == 'operator' and j + 1 < end and tokens[j + 1][0] == PUNCT:
+                    # Operator symbols such as == or [] come before the parameters
+                    operator = j
+                    j += 1
+                    while j < end and tokens[j][1] != '(':
+                        j += 1
+                    break
+                j += 1
+            if j >= end:
+                break
+            head = tokens[j][1]
+
+            if head == '(' and (operator is not None or tokens[j - 1][0] == IDENT):
+                if operator is not None:
+                    name_index = operator
+                    name = "operator " + "".join(tokens[k][1] for k in range(operator + 1, j))
+                else:
+                    name_index = j - 1
+                    name = tokens[name_index][1]
+                    # Named constructors: Class.name(...)
+                    if name_index - 2 >= i and tokens[name_index - 1][1] == '.' and tokens[name_index - 2][1] == owner:
+                        name = f"{owner}.{name}"
+                        name_index -= 2
+                close = matches[j]
+                last = _body_end(tokens, matches, close + 1, end) if close > j else None
+                if last is None:
+                    i = _statement_end(tokens, matches, j, end) + 1 if close > j else j + 1
+                    continue
+                if tokens[name_index][1] == owner:
+                    func_kind = 'constructor'
+                elif name_index > i and tokens[name_index - 1][1] == 'set':
+                    func_kind = 'setter'
+                else:
+                    func_kind = 'method' if owner_kind != 'file' else 'function'
+                add(name, func_kind, owner, start, last)
+                i = last + 1
+                continue
+
+            if head in ('{', '=>') and j - 2 >= i and tokens[j - 2][1] == 'get' and tokens[j - 1][0] == IDENT:
+                last = matches[j] if head == '{' else _statement_end(tokens, matches, j + 1, end)
+                if last < j or last >= end:
+                    break
+                add(tokens[j - 1][1], 'getter', owner, start, last)
+                i = last + 1
+                continue
+
+            # Fields, variables and anything unrecognised
+            i = _statement_end(tokens, matches, j, end) + 1
+
+    parse_body(0, len(tokens), "", 'file')
+    return functions
+
+
+# One pass per body; the group order is the order phrases appear in a summary
+DART_SUMMARY_PATTERNS = [
+    ('http', r'http\.(?:get|post|put|delete)\s*\(', 'makes HTTP requests to'),
+    ('json', r'jsonDecode\s*\(', 'parses JSON data'),
+    ('functional', r'\b(?:Either|Option|Result)\b', 'uses functional programming patterns'),
+    ('future', r'Future<', 'handles asynchronous operations'),
+    ('stream', r'Stream<', 'handles data streams'),
+    ('provider', r'Provider\.', 'uses state management'),
+    ('bloc', r'Bloc\.', 'implements BLoC pattern'),
+    ('state', r'setState\s*\(', 'manages local state'),
+    ('logging', r'\b(?:print|log)\s*\(', 'logs output'),
+]
+_SUMMARY_RE = re.compile("|".join(f"(?P<{key}>{pattern})" for key, pattern, _ in DART_SUMMARY_PATTERNS))
+
+
+def summarize_dart_body(body: str) -> str:
+    """Heuristic summary from a single combined-pattern scan of a function body"""
+    found = set()
+    for match in _SUMMARY_RE.finditer(body):
+        found.add(match.lastgroup)
+        if len(found) == len(DART_SUMMARY_PATTERNS):
+            break
+    parts = [description for key, _, description in DART_SUMMARY_PATTERNS if key in found]
+    return ", ".join(parts) if parts else "performs business logic operations"
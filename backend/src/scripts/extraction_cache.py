@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "specode", "extraction_cache.sqlite3")
+DEFAULT_MAX_BYTES = 1024 ** 3  # Compressed payload bytes kept before least recently used entries are evicted
+TOUCH_BATCH = 256  # Cache hits whose last_used updates are written together in one transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    blob TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (blob, extractor, version)
+)
+"""
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Object id git assigns to a blob with this content, so clones and uploads share keys"""
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+def file_blob_sha(filepath: str) -> str:
+    with open(filepath, 'rb') as f:
+        return git_blob_sha(f.read())
+
+
+def git_blob_ids(repo_root: str) -> Dict[str, str]:
+    """Blob ids of every tracked file from the index, keyed by normalised absolute path"""
+    try:
+        output = subprocess.run(['git', '-C', repo_root, 'ls-files', '-s', '-z'],
+                                check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.warning(f"Could not list blob ids in {repo_root}: {e}")
+        return {}
+    ids = {}
+    for entry in filter(None, output.split('\0')):
+        meta, path = entry.split('\t', 1)
+        ids[os.path.normpath(os.path.join(repo_root, path))] = meta.split()[1]
+    return ids
+
+
+class ExtractionCache:
+    """Persistent SQLite store of extracted function records.
+
+    Entries are keyed by (blob id, extractor name, extractor version): bumping an
+    extractor's version makes its old entries unreachable, and they age out through
+    least-recently-used eviction. Records are stored without path fields so
+    byte-identical files in different repositories share one entry.
+
+    Hits only note their last_used time in memory; the times are written every
+    TOUCH_BATCH hits and by flush(), evict() and close(), so a warm run does not
+    make one write transaction per file.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[Tuple[str, str, int], float] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, blob: str, extractor: str, version: int) -> Optional[List[Dict]]:
+        key = (blob, extractor, version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM extractions WHERE blob = ? AND extractor = ? AND version = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touched()
+        return json.loads(zlib.decompress(row[0]))
+
+    def _write_touched(self):
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE extractions SET last_used = ? WHERE blob = ? AND extractor = ? AND version = ?",
+            [(last_used,) + key for key, last_used in self._touched.items()]
+        )
+        self._conn.commit()
+        self._touched.clear()
+
+    def flush(self):
+        """Write the last_used times of recent hits"""
+        with self._lock:
+            self._write_touched()
+
+    def put(self, blob: str, extractor: str, version: int, records: List[Dict]):
+        payload = zlib.compress(json.dumps(records, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?, ?)",
+                (blob, extractor, version, payload, len(payload), time.time())
+            )
+            self._conn.commit()
+
+    def get_or_extract(self, blob: str, extractor: str, version: int,
+                       extract: Callable[[], Optional[List[Dict]]]) -> Optional[List[Dict]]:
+        """Cached records, or extract and store them; a None from extract means it failed and is not stored"""
+        records = self.get(blob, extractor, version)
+        if records is None:
+            records = extract()
+            if records is not None:
+                self.put(blob, extractor, version, records)
+        return records
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the stored payloads fit in max_bytes"""
+        with self._lock:
+            self._write_touched()
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            cutoff, freed = None, 0
+            for last_used, size in self._conn.execute("SELECT last_used, size FROM extractions ORDER BY last_used"):
+                freed += size
+                cutoff = last_used
+                if total - freed <= self.max_bytes:
+                    break
+            deleted = self._conn.execute("DELETE FROM extractions WHERE last_used <= ?", (cutoff,)).rowcount
+            self._conn.commit()
+        logging.info(f"Evicted {deleted} extraction cache entries ({freed} bytes)")
+        return deleted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'entries': entries,
+            'bytes': size
+        }
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._conn.close()
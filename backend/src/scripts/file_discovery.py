@@ -0,0 +1,259 @@
+import logging
+import os
+import re
+import subprocess
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from complexity import is_generated_file
+
+PROJECT_IGNORE_FILE = ".specodeignore"  # gitignore syntax, read from the project root only
+GITIGNORE_FILE = ".gitignore"
+ALWAYS_EXCLUDED_DIRS = {'.git', '.hg', '.svn'}
+VENDORED_DIRS = {'vendor', 'vendors', 'third_party', 'third-party', 'thirdparty', 'external', 'node_modules',
+                 'bower_components', 'jspm_packages', 'pods', '.yarn'}
+VENDORED_SUFFIXES = ('.min.js', '-min.js', '.bundle.js', '.min.mjs')
+SNIFF_BYTES = 2048  # Head of each candidate file read to detect binary, minified and generated files
+
+
+def _translate(pattern: str) -> str:
+    """Regex body for a gitignore glob: '*' and '?' stop at '/', '**' crosses directories"""
+    parts, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            close = pattern.find(']', i + 2)
+            if close < 0:
+                parts.append(re.escape('['))
+                i += 1
+                continue
+            body = pattern[i + 1:close]
+            if body[0] in '!^':
+                body = '^' + body[1:]
+            parts.append('[' + body.replace('\\', '\\\\') + ']')
+            i = close + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts)
+
+
+class IgnoreFile:
+    """Patterns of one gitignore-syntax file, matched against paths relative to its directory"""
+
+    def __init__(self, text: str):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, directories only)
+        for line in text.splitlines():
+            line = re.sub(r'(?<!\\)\s+$', '', line)
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            prefix = '' if anchored else '(?:.*/)?'
+            try:
+                self.rules.append((re.compile(f"^{prefix}{_translate(line)}$"), negated, dir_only))
+            except re.error:
+                logging.debug(f"Ignoring invalid ignore pattern {line!r}")
+        # Without negations, one combined regex per kind decides a path in a single match
+        self._combined = not any(negated for _, negated, _ in self.rules)
+        if self._combined:
+            self._any_path = self._combine(rule for rule, _, dir_only in self.rules if not dir_only)
+            self._any_dir = self._combine(rule for rule, _, _ in self.rules)
+
+    @staticmethod
+    def _combine(rules: Iterable[re.Pattern]) -> Optional[re.Pattern]:
+        patterns = [rule.pattern for rule in rules]
+        return re.compile('|'.join(f"(?:{p})" for p in patterns)) if patterns else None
+
+    def match(self, relpath: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no pattern applies"""
+        if self._combined:
+            combined = self._any_dir if is_dir else self._any_path
+            return True if combined is not None and combined.match(relpath) else None
+        for regex, negated, dir_only in reversed(self.rules):
+            if (is_dir or not dir_only) and regex.match(relpath):
+                return not negated
+        return None
+
+
+class FileDiscovery:
+    """Candidate source files of a project tree, pruned and filtered as cheaply as possible.
+
+    Files come from the git index when the root is a checkout (tracked files, no
+    directory walk), otherwise from a walk that never descends into excluded or
+    ignored directories. Excluded directory names are matched per path component
+    below the root. .gitignore files apply as in git (walk and listing modes; git
+    already applies them to the index), and PROJECT_IGNORE_FILE at the root applies
+    in every mode. Remaining candidates have their first SNIFF_BYTES sniffed to
+    drop binary, minified/vendored and, if asked, generated files.
+    """
+
+    def __init__(self, root: str, extensions: Iterable[str], excluded_dirs: Iterable[str] = (),
+                 use_git: bool = True, skip_vendored: bool = True, skip_generated: bool = False,
+                 read_text: Optional[Callable[[str], Optional[str]]] = None):
+        self.root = root
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.excluded_dirs = {name.lower() for name in excluded_dirs} | ALWAYS_EXCLUDED_DIRS
+        self.use_git = use_git
+        self.skip_vendored = skip_vendored
+        self.skip_generated = skip_generated
+        self._read_text = read_text or self._read_file_text
+        self._ignore_files: Dict[str, IgnoreFile] = {}
+        self._dir_cache: Dict[str, bool] = {}
+        self.stats: Dict = {'method': None, 'files': 0, 'seconds': 0.0,
+                            'skipped': {'ignored': 0, 'binary': 0, 'vendored': 0, 'generated': 0}}
+        project_ignore = self._read_text(PROJECT_IGNORE_FILE)
+        self._project_ignore = IgnoreFile(project_ignore) if project_ignore else None
+
+    def _read_file_text(self, relpath: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, relpath), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _load_gitignore(self, reldir: str):
+        text = self._read_text(f"{reldir}/{GITIGNORE_FILE}" if reldir else GITIGNORE_FILE)
+        if text:
+            self._ignore_files[reldir] = IgnoreFile(text)
+
+    def _ignored(self, relpath: str, is_dir: bool) -> bool:
+        """gitignore semantics: the deepest ignore file with a matching pattern decides"""
+        ignored = False
+        parent = relpath.rpartition('/')[0]
+        if self._ignore_files:
+            bases = [''] + [relpath[:i] for i, char in enumerate(parent) if char == '/'] + ([parent] if parent else [])
+            for base in bases:
+                ignore_file = self._ignore_files.get(base)
+                if ignore_file is not None:
+                    verdict = ignore_file.match(relpath[len(base) + 1:] if base else relpath, is_dir)
+                    if verdict is not None:
+                        ignored = verdict
+        if self._project_ignore is not None:
+            verdict = self._project_ignore.match(relpath, is_dir)
+            if verdict is not None:
+                ignored = verdict
+        return ignored
+
+    def _dir_excluded(self, reldir: str) -> bool:
+        name = reldir.rpartition('/')[2].lower()
+        return name in self.excluded_dirs or (self.skip_vendored and name in VENDORED_DIRS) \
+            or self._ignored(reldir, True)
+
+    def _under_excluded_dir(self, relpath: str) -> bool:
+        """Whether any directory on the path is excluded (cached per directory, for path listings)"""
+        parent = relpath.rpartition('/')[0]
+        if not parent:
+            return False
+        cached = self._dir_cache.get(parent)
+        if cached is None:
+            cached = self._dir_cache[parent] = self._under_excluded_dir(parent) or self._dir_excluded(parent)
+        return cached
+
+    def _sniff(self, relpath: str, head: bytes) -> Optional[str]:
+        """Reason to skip a file from its head, or None to keep it"""
+        if b'\0' in head and not head.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return 'binary'
+        if self.skip_vendored and (relpath.lower().endswith(VENDORED_SUFFIXES)
+                                   or len(head) == SNIFF_BYTES and b'\n' not in head):
+            # Minified bundles: a single line longer than the whole sniffed head
+            return 'vendored'
+        if self.skip_generated and is_generated_file('/' + relpath, head.decode('utf-8', errors='ignore')):
+            return 'generated'
+        return None
+
+    def _accept_file(self, relpath: str, head_reader: Callable[[str], bytes]) -> bool:
+        if not relpath.lower().endswith(self.extensions):
+            return False
+        if self._ignored(relpath, False):
+            self.stats['skipped']['ignored'] += 1
+            return False
+        reason = self._sniff(relpath, head_reader(relpath))
+        if reason:
+            self.stats['skipped'][reason] += 1
+            return False
+        return True
+
+    def _read_head(self, relpath: str) -> bytes:
+        try:
+            with open(os.path.join(self.root, relpath), 'rb') as f:
+                return f.read(SNIFF_BYTES)
+        except OSError:
+            return b''
+
+    def _git_files(self) -> Optional[List[str]]:
+        if not os.path.exists(os.path.join(self.root, '.git')):
+            return None
+        try:
+            output = subprocess.run(['git', '-C', self.root, 'ls-files', '-z', '--cached'],
+                                    check=True, capture_output=True, text=True).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            logging.info(f"Could not list tracked files in {self.root}, walking instead: {getattr(e, 'stderr', e)}")
+            return None
+        return [path for path in output.split('\0') if path]
+
+    def _walk(self) -> List[str]:
+        relpaths = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            reldir = os.path.relpath(dirpath, self.root).replace('\\', '/')
+            reldir = '' if reldir == '.' else reldir
+            if GITIGNORE_FILE in filenames:
+                self._load_gitignore(reldir)
+            # Pruning in place stops os.walk from descending at all
+            dirnames[:] = [name for name in dirnames
+                           if not self._dir_excluded(f"{reldir}/{name}" if reldir else name)]
+            relpaths.extend(f"{reldir}/{name}" if reldir else name for name in filenames)
+        return relpaths
+
+    def select(self, relpaths: Iterable[str], head_reader: Optional[Callable[[str], bytes]] = None,
+               tracked: bool = False) -> List[str]:
+        """Accepted paths out of a listing of '/'-separated paths relative to the root.
+
+        .gitignore files that appear in the listing are read through read_text
+        first, unless the paths are tracked by git and so never ignored.
+        """
+        relpaths = [path.replace('\\', '/') for path in relpaths]
+        for path in relpaths if not tracked else ():
+            if path == GITIGNORE_FILE or path.endswith('/' + GITIGNORE_FILE):
+                self._load_gitignore(path[:-len(GITIGNORE_FILE)].rstrip('/'))
+        head_reader = head_reader or self._read_head
+        return [path for path in relpaths
+                if not self._under_excluded_dir(path) and self._accept_file(path, head_reader)]
+
+    def files(self) -> List[str]:
+        """Absolute paths of the accepted files under root"""
+        start = time.time()
+        tracked = self._git_files() if self.use_git else None
+        if tracked is not None:
+            # Tracked files are never subject to .gitignore
+            self.stats['method'] = 'git'
+            selected = self.select(tracked, tracked=True)
+        else:
+            self.stats['method'] = 'walk'
+            selected = [path for path in self._walk() if self._accept_file(path, self._read_head)]
+        self.stats['files'] = len(selected)
+        self.stats['seconds'] = round(time.time() - start, 4)
+        logging.info(f"Discovered {len(selected)} files in {self.root} via {self.stats['method']} "
+                     f"in {self.stats['seconds']}s, skipped {self.stats['skipped']}")
+        return [os.path.join(self.root, *path.split('/')) for path in selected]
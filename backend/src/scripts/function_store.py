@@ -0,0 +1,168 @@
+import logging
+import os
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from source_file import load_source
+
+INTERN_MAX_CHARS = 64  # Shorter string values (languages, kinds, class names) are shared between records
+BODY_SEARCH_SLACK = 256  # Characters past the start line searched for the start of a body
+
+
+class FunctionStore:
+    """Function records held as columns instead of one dict per function.
+
+    File paths are stored once in a path table. Line numbers are typed arrays.
+    The remaining keys of each record go in a tuple whose key order (its
+    "shape") is shared by every record with the same keys. With source_bodies
+    set, a body that appears verbatim in its file is kept as an offset and a
+    length, and read back through load_source when the record is materialised.
+    This only works while the checkout is still on disk and unchanged.
+
+    Iterating yields plain dicts with the same keys, in the same order, as the
+    records that were added.
+    """
+
+    def __init__(self, functions: Iterable[Dict] = (), source_bodies: bool = False):
+        self.source_bodies = source_bodies
+        self._paths: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        # Per-path (mtime_ns, size) when bodies were located, to detect files changed since
+        self._signatures: List[Optional[Tuple[int, int]]] = []
+        self._shapes: List[Tuple[Tuple[str, ...], frozenset]] = []
+        self._shape_ids: Dict[Tuple[Tuple[str, ...], frozenset], int] = {}
+
+        self._path = array('i')
+        self._shape = array('I')
+        self._start_line = array('i')
+        self._end_line = array('i')
+        self._body_start = array('q')
+        self._body_length = array('q')
+        self._values: List[tuple] = []
+        self._stale_paths = set()
+        self.extend(functions)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self._values)):
+            yield self.record(index)
+
+    def _path_id(self, filepath: str) -> int:
+        path_id = self._path_ids.get(filepath)
+        if path_id is None:
+            path_id = self._path_ids[filepath] = len(self._paths)
+            self._paths.append(filepath)
+            self._signatures.append(None)
+        return path_id
+
+    def _locate_body(self, path_id: int, body: str, start_line: int) -> int:
+        """Offset of body in its source file, or -1 if it is not there verbatim"""
+        filepath = self._paths[path_id]
+        try:
+            source = load_source(filepath)
+            stat = os.stat(filepath)
+        except OSError:
+            return -1
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._signatures[path_id] not in (None, signature):
+            return -1
+        self._signatures[path_id] = signature
+
+        line_start = source.offset_of(start_line)
+        offset = source.text.find(body[:BODY_SEARCH_SLACK], line_start,
+                                  source.offset_of(start_line + 1) + BODY_SEARCH_SLACK)
+        return offset if offset >= 0 and source.text.startswith(body, offset) else -1
+
+    def add(self, func: Dict):
+        filepath = func.get('filepath')
+        start_line, end_line = func.get('start_line'), func.get('end_line')
+        compact = set()
+        path_id = -1
+        if isinstance(filepath, str):
+            path_id = self._path_id(filepath)
+            compact.add('filepath')
+            if func.get('file') == os.path.basename(filepath):
+                compact.add('file')
+        if type(start_line) is int and type(end_line) is int:
+            compact.update(('start_line', 'end_line'))
+            if func.get('line_count') == end_line - start_line:
+                compact.add('line_count')
+
+        body_start, body = -1, func.get('body')
+        if self.source_bodies and path_id >= 0 and 'start_line' in compact and isinstance(body, str) and body:
+            body_start = self._locate_body(path_id, body, start_line)
+            if body_start >= 0:
+                compact.add('body')
+
+        keys = tuple(func)
+        shape = (keys, frozenset(compact))
+        shape_id = self._shape_ids.get(shape)
+        if shape_id is None:
+            shape_id = self._shape_ids[shape] = len(self._shapes)
+            self._shapes.append(shape)
+
+        self._path.append(path_id)
+        self._shape.append(shape_id)
+        self._start_line.append(start_line if 'start_line' in compact else 0)
+        self._end_line.append(end_line if 'end_line' in compact else 0)
+        self._body_start.append(body_start)
+        self._body_length.append(len(body) if body_start >= 0 else 0)
+        self._values.append(tuple(
+            sys.intern(value) if type(value) is str and len(value) <= INTERN_MAX_CHARS else value
+            for key, value in func.items() if key not in compact
+        ))
+
+    def extend(self, functions: Iterable[Dict]):
+        for func in functions:
+            self.add(func)
+
+    def _body(self, index: int) -> str:
+        path_id = self._path[index]
+        filepath = self._paths[path_id]
+        try:
+            stat = os.stat(filepath)
+            if (stat.st_mtime_ns, stat.st_size) != self._signatures[path_id]:
+                raise OSError("changed since extraction")
+            start = self._body_start[index]
+            return load_source(filepath).text[start:start + self._body_length[index]]
+        except OSError as e:
+            if filepath not in self._stale_paths:
+                self._stale_paths.add(filepath)
+                logging.warning(f"Function bodies of {filepath} are unavailable: {e}")
+            return ""
+
+    def record(self, index: int) -> Dict:
+        """The function record at index as a new dict"""
+        keys, compact = self._shapes[self._shape[index]]
+        values = iter(self._values[index])
+        record = {}
+        for key in keys:
+            if key not in compact:
+                record[key] = next(values)
+            elif key == 'filepath':
+                record[key] = self._paths[self._path[index]]
+            elif key == 'file':
+                record[key] = os.path.basename(self._paths[self._path[index]])
+            elif key == 'start_line':
+                record[key] = self._start_line[index]
+            elif key == 'end_line':
+                record[key] = self._end_line[index]
+            elif key == 'line_count':
+                record[key] = self._end_line[index] - self._start_line[index]
+            else:
+                record[key] = self._body(index)
+        return record
+
+    def records(self, start: int = 0) -> List[Dict]:
+        return [self.record(index) for index in range(start, len(self))]
+
+    def replace(self, start: int, functions: Iterable[Dict]):
+        """Drop the records from index start on and append functions in their place"""
+        functions = list(functions)
+        for column in (self._path, self._shape, self._start_line, self._end_line, self._body_start,
+                       self._body_length, self._values):
+            del column[start:]
+        self.extend(functions)
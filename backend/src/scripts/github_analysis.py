@@ -11,17 +11,56 @@ import javalang
 import logging
 from typing import List, Dict, Optional
 import concurrent.futures
+import contextlib
 import time
 import google.generativeai as genai
+from prompt_budget import fit_text, log_usage
+from single_flight import SingleFlight, content_digest
+from complexity import score_python_function, score_tokens, is_generated_file, select_for_llm
+from repo_cache import MirrorCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from analysis_store import AnalysisStore, changed_files, DEFAULT_STORE_DIR
+from js_lexer import find_js_functions
+from source_file import SourceFile, load_source
+from dart_scanner import find_dart_functions, summarize_dart_body
+from cpp_scanner import find_cpp_functions
+from java_scanner import JavaParseTimeout, find_java_members, javalang_members
+from extraction_cache import ExtractionCache, file_blob_sha, git_blob_ids, DEFAULT_CACHE_PATH
+from ndjson_output import NdjsonWriter, output_record, write_json
+from function_store import FunctionStore
+from file_discovery import FileDiscovery
 
 # Configuration
 class Config:
     LLM_ENABLED = False  # Set to True to enable LLM analysis
     LLM_MODEL = "gemini-pro"  # Gemini model to use
-    LLM_MAX_TOKENS = 1000  # Max function size to send to LLM
-    LLM_MIN_COMPLEXITY = 3  # Only analyze functions with at least this many lines
+    LLM_MAX_TOKENS = 1000  # Max function size (estimated tokens) to send to LLM
+    LLM_MIN_COMPLEXITY = 3  # Only analyze functions with at least this complexity score
+    LLM_SELECTION = "budget"  # "top_n", "budget" (max uncached calls per repo) or "all"
+    LLM_TOP_N = 100  # Functions analyzed per repo with the "top_n" policy
+    LLM_CALL_BUDGET = 200  # Uncached LLM calls per repo with the "budget" policy
     MAX_WORKERS = 4  # For parallel processing
+    EXECUTOR = "auto"  # "thread", "process" or "auto" (processes when several cores and enough files)
+    PROCESS_BATCH_SIZE = 32  # Files per task sent to a worker process
+    PROCESS_MIN_FILES = 64  # Below this, "auto" uses threads to avoid process startup cost
     CACHE_FILE = "function_cache.json"  # Cache for LLM results
+    MIRROR_CACHE_ENABLED = True  # Reuse local bare mirrors instead of cloning every time
+    MIRROR_CACHE_DIR = DEFAULT_CACHE_DIR
+    MIRROR_CACHE_MAX_BYTES = DEFAULT_MAX_BYTES
+    CLONE_DEPTH = 1  # Shallow clones; 0 for full history
+    CLONE_FILTER = None  # Optional partial-clone filter, e.g. "blob:limit=1m"
+    INCREMENTAL_ENABLED = True  # Re-extract only files changed since the last analysed commit
+    ANALYSIS_STORE_DIR = DEFAULT_STORE_DIR
+    EXTRACTION_CACHE_ENABLED = True  # Never parse the same file content twice across runs
+    EXTRACTION_CACHE_PATH = DEFAULT_CACHE_PATH
+    EXTRACTION_CACHE_MAX_MB = 1024
+    # Bump an extractor's version whenever its output changes, to invalidate cached records
+    EXTRACTOR_VERSIONS = {'python': 2, 'javascript': 3, 'java': 3, 'dart': 4, 'cpp': 1}
+    JAVA_PARSE_TIME_BUDGET = 2.0  # Seconds javalang may spend on one file before the lexer takes over
+    JAVA_PARSE_MAX_BYTES = 512 * 1024  # Larger Java files go straight to the lexer
+    DISCOVERY_USE_GIT = True  # List tracked files from the git index instead of walking the checkout
+    OUTPUT_FORMAT = "json"  # "json" (one document at the end) or "ndjson" (records streamed as files finish)
+    OUTPUT_GZIP = None  # Compress the output; None compresses when the output path ends in .gz
+    OUTPUT_BODIES = True  # False drops function bodies; records keep their path and line range
     SAFETY_SETTINGS = [
         {
             "category": "HARM_CATEGORY_HARASSMENT",
@@ -45,27 +84,25 @@ class Config:
         "max_output_tokens": 200,
     }
 
+CODE_EXTENSIONS = ['.py', '.java', '.js', '.jsx', '.ts', '.tsx', '.cpp', '.c', '.h', '.hpp', '.dart']
+NON_CODE_DIRS = [
+    'migrations', 'venv', 'node_modules', '__pycache__', '.git', '.github',
+    'build', '.dart_tool', '.idea', 'android', 'ios', 'web', 'test', 'coverage',
+    'dist', 'docs', 'examples', 'vendor', 'bin', 'obj'
+]
+
 def is_code_file(filepath: str) -> bool:
     """Check if file is a code file we want to analyze"""
-    code_extensions = ['.py', '.java', '.js', '.jsx', '.ts', '.tsx', '.cpp', '.c', '.h', '.hpp', '.dart']
-    non_code_dirs = [
-        'migrations', 'venv', 'node_modules', '__pycache__', '.git', '.github',
-        'build', '.dart_tool', '.idea', 'android', 'ios', 'web', 'test', 'coverage',
-        'dist', 'docs', 'examples', 'vendor', 'bin', 'obj'
-    ]
-    
-    if not any(filepath.endswith(ext) for ext in code_extensions):
+    if not any(filepath.endswith(ext) for ext in CODE_EXTENSIONS):
         return False
     
     normalized_path = filepath.replace("\\", "/").lower()
-    return not any(f"/{dir}/" in normalized_path for dir in non_code_dirs)
+    return not any(f"/{dir}/" in normalized_path for dir in NON_CODE_DIRS)
 
 def get_function_source(filepath: str, start_line: int, end_line: int) -> str:
     """Extract the source code of a function"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        return ''.join(lines[start_line-1:end_line])
+        return load_source(filepath).lines(start_line, end_line)
     except Exception as e:
         logging.error(f"Error reading function source from {filepath}: {e}")
         return ""
@@ -74,11 +111,7 @@ def is_complex_function(func: Dict) -> bool:
     """Determine if a function is complex enough to warrant LLM analysis"""
     if not Config.LLM_ENABLED:
         return False
-    if 'line_count' in func and func['line_count'] >= Config.LLM_MIN_COMPLEXITY:
-        return True
-    if 'body' in func and len(func['body'].split('\n')) >= Config.LLM_MIN_COMPLEXITY:
-        return True
-    return False
+    return func.get('complexity', 0) >= Config.LLM_MIN_COMPLEXITY
 
 class FunctionCache:
     """Simple cache for LLM function analysis results"""
@@ -122,13 +155,40 @@ def initialize_gemini(api_key: str):
         logging.error(f"Failed to initialize Gemini: {e}")
         return None
 
-def analyze_with_llm(function_code: str) -> Optional[str]:
-    """Call Gemini API to analyze function code and extract underlying meaning."""
+def _summarize_with_llm(function_code: str) -> Optional[str]:
+    """Make the Gemini call for one function body (errors propagate to all coalesced callers)"""
+    # Initialize Gemini model
+    model = genai.GenerativeModel(Config.LLM_MODEL)
+    
+    # Prepare the prompt to extract underlying meaning
+    prompt = f"""Analyze the following function and describe its underlying purpose and core functionality in one concise sentence.
+    Focus on what the function fundamentally achieves, not just its implementation details.
+    
+    Function code:
+    {fit_text(function_code, Config.LLM_MAX_TOKENS)}
+    
+    Underlying purpose: This function"""
+    
+    # Call the API
+    response = model.generate_content(prompt)
+    log_usage(Config.LLM_MODEL, prompt, response.text, getattr(response, 'usage_metadata', None))
+    
+    # Process the response
+    if response.text:
+        return "This function " + response.text.strip()
+    logging.warning("Empty response from Gemini")
+    return None
+
+def analyze_with_llm(function_code: str, flight: Optional[SingleFlight] = None) -> Optional[str]:
+    """Call Gemini API to analyze function code and extract underlying meaning.
+
+    Calls with the same flight (one per analysis run) coalesce identical bodies.
+    """
     if not Config.LLM_ENABLED:
         return None
     
-    # Create a hash of the function code for caching
-    func_hash = str(hash(function_code))
+    # Content digest keys both the persistent cache and in-run request coalescing
+    func_hash = content_digest(function_code)
     
     # Check cache first
     cached_result = function_cache.get(func_hash)
@@ -136,124 +196,57 @@ def analyze_with_llm(function_code: str) -> Optional[str]:
         return cached_result
     
     try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel(Config.LLM_MODEL)
-        
-        # Prepare the prompt to extract underlying meaning
-        prompt = f"""Analyze the following function and describe its underlying purpose and core functionality in one concise sentence.
-        Focus on what the function fundamentally achieves, not just its implementation details.
-        
-        Function code:
-        {function_code}
-        
-        Underlying purpose: This function"""
-        
-        # Call the API
-        response = model.generate_content(prompt)
-        
-        # Process the response
-        if response.text:
-            summary = "This function " + response.text.strip()
-            # Cache the result
-            function_cache.set(func_hash, summary)
-            return summary
+        # Identical bodies (vendored or copy-pasted code) share one in-flight call
+        if flight is not None:
+            summary = flight.do(func_hash, _summarize_with_llm, function_code)
         else:
-            logging.warning("Empty response from Gemini")
-            return None
-            
+            summary = _summarize_with_llm(function_code)
+        if summary:
+            function_cache.set(func_hash, summary)
+        return summary
     except Exception as e:
         logging.error(f"Error calling Gemini API: {e}")
         return None
 
 def summarize_dart_function(func_code: str) -> str:
     """Enhanced heuristic to summarize Dart functions"""
-    summary_parts = []
-    
-    patterns = [
-        (r'http\.(get|post|put|delete)\s*\(', 'makes HTTP requests to'),
-        (r'jsonDecode\s*\(', 'parses JSON data'),
-        (r'(Either|Option|Result)\b', 'uses functional programming patterns'),
-        (r'Future<.*?>', 'handles asynchronous operations'),
-        (r'Stream<.*?>', 'handles data streams'),
-        (r'Provider\.', 'uses state management'),
-        (r'Bloc\.', 'implements BLoC pattern'),
-        (r'setState\s*\(', 'manages local state'),
-        (r'print\s*\(|log\s*\(', 'logs output')
-    ]
-    
-    for pattern, desc in patterns:
-        if re.search(pattern, func_code):
-            summary_parts.append(desc)
-    
-    if not summary_parts:
-        return "performs business logic operations"
-    return ", ".join(summary_parts)
+    return summarize_dart_body(func_code)
 
-def extract_dart_functions(filepath: str) -> List[Dict]:
-    """Improved Dart function extraction that excludes control flow statements"""
+def extract_dart_functions(filepath: str, source: Optional[SourceFile] = None) -> Optional[List[Dict]]:
+    """Dart functions, methods, constructors and accessors from a brace- and string-aware scan"""
     functions = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Updated pattern to exclude control flow statements
-        pattern = r'''(?x)
-            (?:^|\s)                         # Start of line or whitespace
-            (?:async\s+)?                    # Optional async
-            (?:[\w<>]+\s+)?                  # Return type
-            ([a-zA-Z_]\w*)\s*                # Function name (must start with letter/underscore)
-            \(([^)]*)\)\s*                  # Parameters
-            (?:=>|{)                        # Start of body
-        '''
-
-        matches = list(re.finditer(pattern, content))
-        
-        control_flow_keywords = {'if', 'else', 'for', 'while', 'switch', 'try', 'catch'}
-        
-        for i, match in enumerate(matches):
-            func_name = match.group(1)
-            
-            # Skip control flow statements
-            if func_name in control_flow_keywords:
-                continue
-                
-            start_pos = match.end()
-            end_pos = matches[i + 1].start() if i + 1 < len(matches) else len(content)
-            func_body = content[start_pos:end_pos].strip()
-            
-            # Calculate line numbers
-            start_line = content[:match.start()].count('\n') + 1
-            end_line = content[:end_pos].count('\n') + 1
-            
-            summary = summarize_dart_function(func_body)
-            func_data = {
-                'name': func_name,
+        source = source or load_source(filepath)
+        for found in find_dart_functions(source.text):
+            func_body = source.slice(found['start'], found['end'])
+            start_line = source.line_of(found['start'])
+            end_line = source.end_line_of(found['end'], found['start'])
+
+            functions.append({
+                'name': found['name'],
                 'file': os.path.basename(filepath),
                 'filepath': filepath,
                 'language': 'dart',
-                'summary': summary,
+                'kind': found['kind'],
+                'class': found['class'],
+                'summary': summarize_dart_function(func_body),
                 'start_line': start_line,
                 'end_line': end_line,
                 'line_count': end_line - start_line,
-                'body': func_body
-            }
-            
-            if is_complex_function(func_data):
-                llm_summary = analyze_with_llm(func_body)
-                if llm_summary:
-                    func_data['llm_summary'] = llm_summary
-            
-            functions.append(func_data)
+                'body': func_body,
+                'complexity': score_tokens(func_body, found['name'])
+            })
     except Exception as e:
         logging.error(f"Error parsing Dart file {filepath}: {str(e)}")
+        return None
     return functions
 
-def extract_python_functions(filepath: str) -> List[Dict]:
+def extract_python_functions(filepath: str, source: Optional[SourceFile] = None) -> Optional[List[Dict]]:
     """Extract Python functions with enhanced meaning extraction."""
     functions = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            tree = ast.parse(f.read(), filename=filepath)
+        source = source or load_source(filepath)
+        tree = ast.parse(source.text, filename=filepath)
         
         for node in ast.walk(tree):
             if isinstance(node, ast.FunctionDef):
@@ -274,189 +267,116 @@ def extract_python_functions(filepath: str) -> List[Dict]:
                     'language': 'python',
                     'docstring': docstring,
                     'params': [arg.arg for arg in node.args.args],
-                    'returns': ast.unparse(node.returns) if node.returns else None
+                    'returns': ast.unparse(node.returns) if node.returns else None,
+                    'complexity': score_python_function(node)
                 }
                 
-                # Use docstring as the primary source of meaning
+                # Use docstring as the primary source of meaning; the LLM pass may replace the heuristic
                 if docstring:
                     func_data['underlying_meaning'] = docstring.split('.')[0]
-                elif is_complex_function(func_data):
-                    func_body = get_function_source(filepath, start_line, end_line)
-                    if func_body:
-                        llm_summary = analyze_with_llm(func_body)
-                        if llm_summary:
-                            func_data['underlying_meaning'] = llm_summary
                 else:
-                    # Fall back to simple heuristic
                     func_data['underlying_meaning'] = f"performs operations related to {node.name}"
                 
                 functions.append(func_data)
     except Exception as e:
         logging.error(f"Error parsing {filepath}: {str(e)}")
+        return None
     return functions
 
-def extract_js_functions(filepath: str) -> List[Dict]:
-    """Improved JavaScript/TypeScript function extraction"""
+def extract_js_functions(filepath: str, source: Optional[SourceFile] = None) -> Optional[List[Dict]]:
+    """JavaScript/TypeScript function extraction from a single lexer pass"""
     functions = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Patterns for different JS function styles
-        patterns = [
-            r'function\s+([^\s(]+)\s*\([^)]*\)\s*{',  # function declaration
-            r'const\s+([^\s=]+)\s*=\s*\([^)]*\)\s*=>\s*{',  # arrow function
-            r'let\s+([^\s=]+)\s*=\s*\([^)]*\)\s*=>\s*{',  # arrow function
-            r'export\s+default\s+function\s+([^\s(]+)\s*\([^)]*\)\s*{',  # exported function
-            r'export\s+const\s+([^\s=]+)\s*=\s*\([^)]*\)\s*=>\s*{',  # exported arrow
-            r'class\s+([^\s{]+)\s*{[\s\S]*?constructor\s*\([^)]*\)\s*{',  # class constructor
-            r'([^\s(]+)\s*\([^)]*\)\s*{',  # method shorthand
-        ]
-
-        for pattern in patterns:
-            for match in re.finditer(pattern, content):
-                func_name = match.group(1)
-                if func_name:
-                    # Estimate line numbers
-                    start_pos = match.start()
-                    start_line = content[:start_pos].count('\n') + 1
-                    
-                    # Find end of function (simplistic approach)
-                    brace_count = 1
-                    end_pos = start_pos + len(match.group(0))
-                    while end_pos < len(content) and brace_count > 0:
-                        if content[end_pos] == '{':
-                            brace_count += 1
-                        elif content[end_pos] == '}':
-                            brace_count -= 1
-                        end_pos += 1
-                    
-                    end_line = content[:end_pos].count('\n') + 1
-                    func_body = content[start_pos:end_pos].strip()
-                    
-                    func_data = {
-                        'name': func_name,
-                        'file': os.path.basename(filepath),
-                        'filepath': filepath,
-                        'language': 'javascript',
-                        'start_line': start_line,
-                        'end_line': end_line,
-                        'line_count': end_line - start_line,
-                        'body': func_body
-                    }
-                    
-                    if is_complex_function(func_data):
-                        llm_summary = analyze_with_llm(func_body)
-                        if llm_summary:
-                            func_data['llm_summary'] = llm_summary
-                    
-                    functions.append(func_data)
+        source = source or load_source(filepath)
+        for found in find_js_functions(source.text):
+            start_line = source.line_of(found['start'])
+            end_line = source.end_line_of(found['end'], found['start'])
+            func_body = source.slice(found['start'], found['end'])
+
+            functions.append({
+                'name': found['name'],
+                'file': os.path.basename(filepath),
+                'filepath': filepath,
+                'language': 'javascript',
+                'kind': found['kind'],
+                'start_line': start_line,
+                'end_line': end_line,
+                'line_count': end_line - start_line,
+                'body': func_body,
+                'complexity': score_tokens(func_body, found['name'])
+            })
     except Exception as e:
         logging.error(f"Error parsing {filepath}: {e}")
+        return None
     return functions
 
-def extract_java_functions(filepath: str) -> List[Dict]:
-    """Enhanced Java method extraction with more details"""
+def extract_java_functions(filepath: str, source: Optional[SourceFile] = None) -> Optional[List[Dict]]:
+    """Java methods and constructors of classes, interfaces, enums and records with exact spans"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            file_content = f.read()
-        
-        tree = javalang.parse.parse(file_content)
-        methods = []
-
-        def process_class(class_node, class_name=None):
-            class_name = class_name or class_node.name
-            
-            for constructor in class_node.constructors:
-                method_body = get_java_method_body(file_content, constructor.position.line if constructor.position else None)
-                
-                method_data = {
-                    "name": class_name,
-                    "type": "constructor",
-                    "parameters": [param.name for param in constructor.parameters],
-                    "parameter_types": [str(param.type) for param in constructor.parameters],
-                    "file": os.path.basename(filepath),
-                    "filepath": filepath,
-                    "language": "java",
-                    "modifiers": constructor.modifiers,
-                    "body": method_body
-                }
-                
-                if is_complex_function(method_data):
-                    llm_summary = analyze_with_llm(method_body) if method_body else None
-                    if llm_summary:
-                        method_data['llm_summary'] = llm_summary
-                
-                methods.append(method_data)
-
-            for method in class_node.methods:
-                method_body = get_java_method_body(file_content, method.position.line if method.position else None)
-                
-                method_data = {
-                    "name": method.name,
-                    "type": "method",
-                    "parameters": [param.name for param in method.parameters],
-                    "parameter_types": [str(param.type) for param in method.parameters],
-                    "return_type": str(method.return_type) if method.return_type else "void",
-                    "file": os.path.basename(filepath),
-                    "filepath": filepath,
-                    "language": "java",
-                    "modifiers": method.modifiers,
-                    "body": method_body
-                }
-                
-                if is_complex_function(method_data):
-                    llm_summary = analyze_with_llm(method_body) if method_body else None
-                    if llm_summary:
-                        method_data['llm_summary'] = llm_summary
-                
-                methods.append(method_data)
-
-            for nested_class in class_node.body:
-                if isinstance(nested_class, javalang.tree.ClassDeclaration):
-                    process_class(nested_class, f"{class_name}.{nested_class.name}")
-
-        for class_type in tree.types:
-            if isinstance(class_type, javalang.tree.ClassDeclaration):
-                process_class(class_type)
+        source = source or load_source(filepath)
+        members, parser = None, 'lexer'
+        if len(source.text) <= Config.JAVA_PARSE_MAX_BYTES:
+            try:
+                members = javalang_members(source.text, source.line_starts,
+                                           time.monotonic() + Config.JAVA_PARSE_TIME_BUDGET)
+                parser = 'javalang'
+            except JavaParseTimeout:
+                logging.warning(f"javalang exceeded {Config.JAVA_PARSE_TIME_BUDGET}s on {filepath}, using the lexer")
+            except (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError) as e:
+                logging.info(f"javalang could not parse {filepath} ({e.__class__.__name__}), using the lexer")
+        if members is None:
+            members = find_java_members(source.text)
 
+        methods = []
+        for member in members:
+            start, end = member.pop('start'), member.pop('end')
+            body = source.slice(start, end)
+            start_line, end_line = source.line_of(start), source.end_line_of(end, start)
+            member.update({
+                "file": os.path.basename(filepath),
+                "filepath": filepath,
+                "language": "java",
+                "parser": parser,
+                "start_line": start_line,
+                "end_line": end_line,
+                "line_count": end_line - start_line,
+                "body": body,
+                "complexity": score_tokens(body, member['name'])
+            })
+            methods.append(member)
         return methods
 
-    except javalang.parser.JavaSyntaxError as e:
-        logging.error(f"Java syntax error in {filepath}: {e}")
-        return []
     except Exception as e:
         logging.error(f"Java parsing error in {filepath}: {e}")
-        return []
-
-def get_java_method_body(file_content: str, start_line: int) -> Optional[str]:
-    """Extract method body from Java file based on starting line"""
-    if not start_line:
         return None
-    
-    lines = file_content.split('\n')
-    if start_line > len(lines):
+
+def extract_cpp_functions(filepath: str, source: Optional[SourceFile] = None) -> Optional[List[Dict]]:
+    """C/C++ function, method, constructor and destructor definitions from a preprocessor-aware scan"""
+    functions = []
+    try:
+        source = source or load_source(filepath)
+        for found in find_cpp_functions(source.text):
+            start_line = source.line_of(found['start'])
+            end_line = source.end_line_of(found['end'], found['start'])
+            func_body = source.slice(found['start'], found['end'])
+
+            functions.append({
+                'name': found['name'],
+                'file': os.path.basename(filepath),
+                'filepath': filepath,
+                'language': 'c' if filepath.endswith('.c') else 'cpp',
+                'kind': found['kind'],
+                'class': found['class'],
+                'start_line': start_line,
+                'end_line': end_line,
+                'line_count': end_line - start_line,
+                'body': func_body,
+                'complexity': score_tokens(func_body, found['name'])
+            })
+    except Exception as e:
+        logging.error(f"Error parsing C/C++ file {filepath}: {e}")
         return None
-    
-    # Find the opening brace after the method signature
-    current_line = start_line - 1
-    brace_count = 0
-    start_pos = -1
-    
-    while current_line < len(lines):
-        line = lines[current_line]
-        if '{' in line and start_pos == -1:
-            start_pos = current_line
-            brace_count = 1
-        elif '{' in line and start_pos != -1:
-            brace_count += 1
-        elif '}' in line and start_pos != -1:
-            brace_count -= 1
-            if brace_count == 0:
-                return '\n'.join(lines[start_pos:current_line+1])
-        current_line += 1
-    
-    return None
+    return functions
 
 def generate_functional_requirements(functions: List[Dict]) -> List[Dict]:
     """Generate functional requirements with priority to underlying meaning"""
@@ -495,100 +415,369 @@ def generate_functional_requirements(functions: List[Dict]) -> List[Dict]:
     
     return requirements
 
-def process_file(filepath: str) -> Optional[List[Dict]]:
-    """Process a single file and return its functions"""
-    if not is_code_file(filepath):
+def get_extractor(filepath: str):
+    """(name, extract function) for a code file, or None if the language is not supported"""
+    if filepath.endswith('.py'):
+        return 'python', extract_python_functions
+    elif filepath.endswith(('.js', '.jsx', '.ts', '.tsx')):
+        return 'javascript', extract_js_functions
+    elif filepath.endswith('.java'):
+        return 'java', extract_java_functions
+    elif filepath.endswith('.dart'):
+        return 'dart', extract_dart_functions
+    elif filepath.endswith(('.c', '.h', '.cpp', '.hpp')):
+        return 'cpp', extract_cpp_functions
+    return None
+
+def extract_cached(filepath: str, cache: ExtractionCache, blob_sha: Optional[str] = None) -> Optional[List[Dict]]:
+    """Extract a file through the cache; records are stored without their path fields"""
+    extractor = get_extractor(filepath)
+    if extractor is None:
         return None
+    name, extract = extractor
+    blob_sha = blob_sha or file_blob_sha(filepath)
+
+    def extract_portable():
+        functions = extract(filepath)
+        return None if functions is None else [dict(func, file=None, filepath=None) for func in functions]
+
+    records = cache.get_or_extract(blob_sha, name, Config.EXTRACTOR_VERSIONS[name], extract_portable)
+    if records is None:
+        return None
+    return [dict(func, file=os.path.basename(filepath), filepath=filepath) for func in records]
+
+def process_file(filepath: str, blob_sha: Optional[str] = None, cache: Optional[ExtractionCache] = None) -> Optional[List[Dict]]:
+    """Process a single file and return its functions, or None if extraction failed"""
+    if not is_code_file(filepath):
+        return []
     
     try:
-        if filepath.endswith('.py'):
-            return extract_python_functions(filepath)
-        elif filepath.endswith(('.js', '.jsx', '.ts', '.tsx')):
-            return extract_js_functions(filepath)
-        elif filepath.endswith('.java'):
-            return extract_java_functions(filepath)
-        elif filepath.endswith('.dart'):
-            return extract_dart_functions(filepath)
+        if cache is not None:
+            functions = extract_cached(filepath, cache, blob_sha)
+        else:
+            extractor = get_extractor(filepath)
+            functions = extractor[1](filepath) if extractor else None
+
+        if functions:
+            head = load_source(filepath).text[:2048]
+            if is_generated_file(filepath, head):
+                for func in functions:
+                    func['generated'] = True
+        return functions
     except Exception as e:
         logging.error(f"Error processing {filepath}: {e}")
     return None
 
+_worker_cache: Optional[ExtractionCache] = None
+
+def _init_worker(settings: Dict):
+    """Process pool initializer: apply the parent's Config and open this worker's cache once"""
+    global _worker_cache
+    for key, value in settings.items():
+        setattr(Config, key, value)
+    if Config.EXTRACTION_CACHE_ENABLED:
+        _worker_cache = ExtractionCache(Config.EXTRACTION_CACHE_PATH, Config.EXTRACTION_CACHE_MAX_MB * 1024 ** 2)
+
+def process_batch(batch: List[tuple]) -> Dict:
+    """Process (filepath, blob_sha) pairs in a worker; records travel back without path fields"""
+    hits, misses = (_worker_cache.hits, _worker_cache.misses) if _worker_cache else (0, 0)
+    files = []
+    for filepath, blob_sha in batch:
+        functions = process_file(filepath, blob_sha, _worker_cache)
+        # None marks a failed extraction, which the incremental store retries on the next run
+        files.append((filepath, None if functions is None else
+                      [dict(func, file=None, filepath=None) for func in functions]))
+    if _worker_cache:
+        # Workers are never closed, so each batch writes its hits' last_used times
+        _worker_cache.flush()
+    return {
+        'files': files,
+        'cache_hits': _worker_cache.hits - hits if _worker_cache else 0,
+        'cache_misses': _worker_cache.misses - misses if _worker_cache else 0
+    }
+
+def use_process_pool(file_count: int) -> bool:
+    if Config.EXECUTOR == "auto":
+        return (os.cpu_count() or 1) > 1 and file_count >= Config.PROCESS_MIN_FILES
+    return Config.EXECUTOR == "process"
+
+def extract_files(filepaths: List[str], blob_ids: Dict[str, str], cache: Optional[ExtractionCache] = None):
+    """Yield (filepath, functions) for each file as extraction completes; functions is None if it failed.
+
+    Parsing is CPU-bound, so in process mode files go to a process pool in batches
+    to amortise IPC; thread mode avoids the startup cost for small inputs.
+    """
+    jobs = [(filepath, blob_ids.get(os.path.normpath(filepath))) for filepath in filepaths]
+
+    if not use_process_pool(len(jobs)):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS) as executor:
+            future_to_file = {executor.submit(process_file, filepath, blob_sha, cache): filepath
+                              for filepath, blob_sha in jobs}
+            for future in concurrent.futures.as_completed(future_to_file):
+                filepath = future_to_file[future]
+                try:
+                    functions = future.result()
+                except Exception as e:
+                    logging.error(f"Error processing {filepath}: {e}")
+                    functions = None
+                yield filepath, functions
+        return
+
+    settings = {key: value for key, value in vars(Config).items() if key.isupper()}
+    batches = [jobs[i:i + Config.PROCESS_BATCH_SIZE] for i in range(0, len(jobs), Config.PROCESS_BATCH_SIZE)]
+    logging.info(f"Parsing {len(jobs)} files in {len(batches)} batches on {Config.MAX_WORKERS} processes")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=Config.MAX_WORKERS, initializer=_init_worker,
+                                                initargs=(settings,)) as executor:
+        future_to_batch = {executor.submit(process_batch, batch): batch for batch in batches}
+        for future in concurrent.futures.as_completed(future_to_batch):
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Error processing batch starting at {future_to_batch[future][0][0]}: {e}")
+                for filepath, _ in future_to_batch[future]:
+                    yield filepath, None
+                continue
+            if cache is not None:
+                cache.hits += result['cache_hits']
+                cache.misses += result['cache_misses']
+            for filepath, records in result['files']:
+                yield filepath, None if records is None else \
+                    [dict(func, file=os.path.basename(filepath), filepath=filepath) for func in records]
+
+def apply_llm_summaries(functions: List[Dict], flight: Optional[SingleFlight] = None) -> int:
+    """Send the selected functions to the LLM and attach their summaries; returns how many were sent"""
+    candidates = [func for func in functions if is_complex_function(func)]
+    selected = select_for_llm(
+        candidates,
+        policy=Config.LLM_SELECTION,
+        top_n=Config.LLM_TOP_N,
+        budget=Config.LLM_CALL_BUDGET,
+        is_cached=lambda func: function_cache.get(content_digest(get_llm_source(func))) is not None
+    )
+    logging.info(f"LLM analysis: {len(selected)} of {len(functions)} functions selected "
+                 f"({len(candidates)} above complexity {Config.LLM_MIN_COMPLEXITY})")
+
+    def summarize(func):
+        source = get_llm_source(func)
+        summary = analyze_with_llm(source, flight) if source else None
+        if summary:
+            # Python records carry their meaning in 'underlying_meaning'; others use 'llm_summary'
+            func['underlying_meaning' if func['language'] == 'python' else 'llm_summary'] = summary
+
+    # LLM calls are I/O-bound, so threads are enough here
+    with concurrent.futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS) as executor:
+        list(executor.map(summarize, selected))
+    return len(selected)
+
+def get_llm_source(func: Dict) -> str:
+    """Source text sent to the LLM for a function record"""
+    if func.get('body'):
+        return func['body']
+    if func.get('start_line') and func.get('end_line'):
+        return get_function_source(func['filepath'], func['start_line'], func['end_line'])
+    return ""
+
+def checkout_repository(repo_url: str, target_dir: str, stack: contextlib.ExitStack, keep: bool) -> Optional[str]:
+    """Check out repo_url into target_dir, via the mirror cache when enabled; returns the commit SHA"""
+    if Config.MIRROR_CACHE_ENABLED:
+        try:
+            cache = MirrorCache(Config.MIRROR_CACHE_DIR, Config.MIRROR_CACHE_MAX_BYTES,
+                                depth=Config.CLONE_DEPTH, clone_filter=Config.CLONE_FILTER)
+            logging.info(f"Checking out {repo_url} to {target_dir} from mirror cache")
+            return stack.enter_context(cache.worktree(repo_url, target_dir, keep=keep))
+        except Exception as e:
+            logging.warning(f"Mirror cache failed for {repo_url} ({e}), cloning directly")
+            shutil.rmtree(target_dir, ignore_errors=True)
+
+    logging.info(f"Cloning {repo_url} to {target_dir}")
+    options = {'depth': Config.CLONE_DEPTH} if Config.CLONE_DEPTH else {}
+    if Config.CLONE_FILTER:
+        options['filter'] = Config.CLONE_FILTER
+    repo = Repo.clone_from(repo_url, target_dir, **options)
+    return repo.head.commit.hexsha
+
+def summary_fields(analysis_result: Dict) -> Dict:
+    """Run statistics for the NDJSON footer: the result without its record lists"""
+    return {key: value for key, value in analysis_result.items()
+            if key not in ('functions', 'functional_requirements')}
+
 def analyze_repository(repo_url: str, output_path: str, clone_dir: Optional[str] = None, gemini_api_key: Optional[str] = None) -> Dict:
     """Enhanced repository analysis with parallel processing"""
     analysis_result = {
         'repo_url': repo_url,
         'files_analyzed': 0,
         'functions_found': 0,
-        'functions': [],
+        # Columnar records; bodies are read back from the checkout only when it outlives the run
+        'functions': FunctionStore(source_bodies=bool(clone_dir)),
         'functional_requirements': [],
         'start_time': time.time(),
         'status': 'success'
     }
 
+    checkouts = contextlib.ExitStack()
+    writer = None
+    # Coalesces identical function bodies within this analysis only
+    llm_flight = SingleFlight()
     try:
         # Initialize Gemini if enabled
         if Config.LLM_ENABLED and gemini_api_key:
             initialize_gemini(gemini_api_key)
 
-        # Clone repository
+        # Check out repository
         if clone_dir:
             target_dir = clone_dir
             if os.path.exists(target_dir):
                 shutil.rmtree(target_dir)
-            os.makedirs(target_dir, exist_ok=True)
         else:
-            target_dir = tempfile.mkdtemp(prefix='github_analysis_')
-
-        logging.info(f"Cloning {repo_url} to {target_dir}")
-        Repo.clone_from(repo_url, target_dir)
-
-        # Collect all files to process
-        files_to_process = []
-        for root, _, files in os.walk(target_dir):
-            for file in files:
-                filepath = os.path.join(root, file)
-                if is_code_file(filepath):
-                    files_to_process.append(filepath)
+            target_dir = os.path.join(tempfile.mkdtemp(prefix='github_analysis_'), 'repo')
+
+        analysis_result['commit'] = checkout_repository(repo_url, target_dir, checkouts, keep=bool(clone_dir))
+
+        # Streamed output: records are written as files finish and only kept in memory when needed later
+        if Config.OUTPUT_FORMAT == 'ndjson':
+            writer = checkouts.enter_context(
+                NdjsonWriter(output_path, Config.OUTPUT_GZIP, Config.OUTPUT_BODIES, target_dir))
+            writer.header(repo_url=repo_url, commit=analysis_result['commit'])
+        store_enabled = Config.INCREMENTAL_ENABLED and bool(analysis_result['commit'])
+        stream_now = writer is not None and not Config.LLM_ENABLED
+        snapshot = None
+
+        def emit(filepath: str, functions: List[Dict]):
+            if stream_now:
+                writer.functions(functions)
+                writer.requirements(generate_functional_requirements(functions))
+                if snapshot is not None:
+                    snapshot.add(filepath, functions)
+            else:
+                analysis_result['functions'].extend(functions)
+
+        # Diff against the last analysed commit so only changed files are re-extracted
+        store = AnalysisStore(Config.ANALYSIS_STORE_DIR)
+        previous = None
+        if store_enabled:
+            previous = store.latest(repo_url, target_dir)
+            if previous and previous.get('extractor_versions') != Config.EXTRACTOR_VERSIONS:
+                logging.info("Extractors changed since the last analysis, re-extracting every file")
+                previous = None
+        diff = changed_files(target_dir, previous['commit'], analysis_result['commit']) if previous else None
+        if store_enabled and stream_now:
+            # Streamed runs write the snapshot file by file too, so no records are held for it
+            snapshot = checkouts.enter_context(store.snapshot(repo_url, analysis_result['commit'], target_dir,
+                                                              Config.LLM_ENABLED, Config.EXTRACTOR_VERSIONS))
+
+        # Pruned, ignore-aware discovery; binary and minified/vendored files are dropped by sniffing
+        discovery = FileDiscovery(target_dir, CODE_EXTENSIONS, NON_CODE_DIRS, use_git=Config.DISCOVERY_USE_GIT)
+        reused_files = {}
+        if diff is not None:
+            changed, deleted = diff
+            # Files whose extraction failed last time are retried even when unchanged
+            retried = [path for path in previous['failed'] if path not in set(changed) | set(deleted)]
+            stale = set(changed) | set(deleted) | set(retried)
+            reused_files = {path: records for path, records in previous['files'].items() if path not in stale}
+            files_to_process = [os.path.join(target_dir, path)
+                                for path in discovery.select(changed + retried, tracked=True)]
+            analysis_result['incremental'] = {
+                'base_commit': previous['commit'],
+                'files_changed': len(changed),
+                'files_deleted': len(deleted),
+                'files_retried': len(retried),
+                'files_reused': len(reused_files)
+            }
+            logging.info(f"Incremental analysis from {previous['commit'][:12]}: {len(changed)} changed, "
+                         f"{len(deleted)} deleted, {len(retried)} retried, {len(reused_files)} files reused")
+        else:
+            files_to_process = discovery.files()
+            analysis_result['discovery'] = discovery.stats
 
-        # Process files in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS) as executor:
-            future_to_file = {executor.submit(process_file, filepath): filepath for filepath in files_to_process}
-            
-            for future in concurrent.futures.as_completed(future_to_file):
-                filepath = future_to_file[future]
-                try:
-                    functions = future.result()
-                    if functions:
-                        analysis_result['files_analyzed'] += 1
-                        analysis_result['functions_found'] += len(functions)
-                        analysis_result['functions'].extend(functions)
-                except Exception as e:
-                    logging.error(f"Error processing {filepath}: {e}")
+        empty_files = [os.path.join(target_dir, path) for path, records in reused_files.items() if not records]
+        failed_files = []
+        for path, records in reused_files.items():
+            if not records:
+                continue
+            analysis_result['files_analyzed'] += 1
+            analysis_result['functions_found'] += len(records)
+            emit(os.path.join(target_dir, path), records)
+        reused_count = len(analysis_result['functions'])
+
+        # Process files in parallel, skipping contents that were already extracted in any run
+        if Config.EXTRACTION_CACHE_ENABLED:
+            extraction_cache = ExtractionCache(Config.EXTRACTION_CACHE_PATH, Config.EXTRACTION_CACHE_MAX_MB * 1024 ** 2)
+            checkouts.callback(extraction_cache.close)
+            blob_ids = git_blob_ids(target_dir) if files_to_process else {}
+        else:
+            extraction_cache, blob_ids = None, {}
+        for filepath, functions in extract_files(files_to_process, blob_ids, extraction_cache):
+            if functions is None:
+                failed_files.append(filepath)
+            elif not functions:
+                empty_files.append(filepath)
+            else:
+                analysis_result['files_analyzed'] += 1
+                analysis_result['functions_found'] += len(functions)
+                emit(filepath, functions)
+        if extraction_cache is not None:
+            extraction_cache.evict()
+            analysis_result['extraction_cache'] = extraction_cache.stats()
+            logging.info(f"Extraction cache: {analysis_result['extraction_cache']}")
+
+        # LLM analysis for the most complex/novel functions only; reused records keep their summaries
+        if Config.LLM_ENABLED:
+            llm_done = diff is not None and previous.get('llm_enabled')
+            first = reused_count if llm_done else 0
+            # Summaries are attached to materialised copies, which then replace the stored records
+            records = analysis_result['functions'].records(first)
+            analysis_result['llm_functions_selected'] = apply_llm_summaries(records, llm_flight)
+            analysis_result['functions'].replace(first, records)
+            del records
 
-        # Generate requirements
-        analysis_result['functional_requirements'] = generate_functional_requirements(analysis_result['functions'])
-        analysis_result['processing_time'] = time.time() - analysis_result['start_time']
+        analysis_result['llm_calls'] = llm_flight.executed
+        analysis_result['llm_calls_saved'] = llm_flight.saved
 
         # Save results
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(analysis_result, f, indent=2)
+        if writer is not None:
+            if not stream_now:
+                # Records were held back for their LLM summaries
+                writer.functions(analysis_result['functions'])
+                writer.requirements(generate_functional_requirements(analysis_result['functions']))
+            analysis_result['processing_time'] = time.time() - analysis_result['start_time']
+            writer.footer(**summary_fields(analysis_result))
+        else:
+            # Generate requirements
+            analysis_result['functional_requirements'] = generate_functional_requirements(analysis_result['functions'])
+            analysis_result['processing_time'] = time.time() - analysis_result['start_time']
+            write_json(analysis_result, output_path, Config.OUTPUT_GZIP,
+                       (output_record(func, Config.OUTPUT_BODIES, target_dir)
+                        for func in analysis_result['functions']))
+
+        if snapshot is not None:
+            for filepath in empty_files:
+                snapshot.add(filepath, [])
+            snapshot.commit(failed_files)
+        elif store_enabled:
+            store.save(repo_url, analysis_result['commit'], target_dir, analysis_result['functions'],
+                       Config.LLM_ENABLED, Config.EXTRACTOR_VERSIONS, empty_files, failed_files)
 
     except Exception as e:
         analysis_result['status'] = 'error'
         analysis_result['error'] = str(e)
         logging.error(f"Error during analysis: {str(e)}")
+        if writer is not None and not writer.finished:
+            writer.footer(**summary_fields(analysis_result))
     finally:
         # Save cache before exiting
         if Config.LLM_ENABLED:
             function_cache.save_cache()
         
         # Clean up
+        checkouts.close()
         if not clone_dir and 'target_dir' in locals():
             try:
-                shutil.rmtree(target_dir, ignore_errors=True)
+                shutil.rmtree(os.path.dirname(target_dir), ignore_errors=True)
             except Exception as e:
                 logging.error(f"Error cleaning up: {str(e)}")
 
+    # Callers get plain function dicts, as before the columnar store
+    analysis_result['functions'] = list(analysis_result['functions'])
     return analysis_result
 
 if __name__ == "__main__":
@@ -609,12 +798,50 @@ if __name__ == "__main__":
     parser.add_argument('--enable-llm', action='store_true', help='Enable LLM analysis')
     parser.add_argument('--gemini-api-key', help='Gemini API key (required if LLM enabled)')
     parser.add_argument('--max-workers', type=int, default=4, help='Max parallel workers')
+    parser.add_argument('--executor', choices=['auto', 'thread', 'process'], default=Config.EXECUTOR,
+                        help='Run file parsing on threads or on a process pool')
+    parser.add_argument('--no-mirror-cache', action='store_true', help='Clone directly instead of using the mirror cache')
+    parser.add_argument('--mirror-cache-dir', default=Config.MIRROR_CACHE_DIR, help='Directory for cached bare mirrors')
+    parser.add_argument('--mirror-cache-max-mb', type=int, default=Config.MIRROR_CACHE_MAX_BYTES // 1024 ** 2,
+                        help='Evict least recently used mirrors beyond this size')
+    parser.add_argument('--no-incremental', action='store_true', help='Re-analyze every file instead of the changes since the last run')
+    parser.add_argument('--analysis-store-dir', default=Config.ANALYSIS_STORE_DIR, help='Directory for per-commit analysis results')
+    parser.add_argument('--no-extraction-cache', action='store_true', help='Parse every file even if its content was seen before')
+    parser.add_argument('--extraction-cache-path', default=Config.EXTRACTION_CACHE_PATH, help='SQLite file for cached extraction results')
+    parser.add_argument('--extraction-cache-max-mb', type=int, default=Config.EXTRACTION_CACHE_MAX_MB,
+                        help='Evict least recently used extraction results beyond this size')
+    parser.add_argument('--no-git-discovery', action='store_true', help='Walk the checkout instead of listing tracked files')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default=Config.OUTPUT_FORMAT,
+                        help='Write one JSON document at the end, or NDJSON records while files are analyzed')
+    parser.add_argument('--gzip', action='store_true', default=None, help='Gzip the output (default: when the path ends in .gz)')
+    parser.add_argument('--no-bodies', action='store_true', help='Leave function bodies out; records keep their path and line range')
+    parser.add_argument('--llm-selection', choices=['top_n', 'budget', 'all'], default=Config.LLM_SELECTION,
+                        help='How functions are chosen for LLM analysis')
+    parser.add_argument('--llm-top-n', type=int, default=Config.LLM_TOP_N, help='Functions analyzed with top_n')
+    parser.add_argument('--llm-budget', type=int, default=Config.LLM_CALL_BUDGET,
+                        help='Uncached LLM calls per repository with budget')
 
     args = parser.parse_args()
 
     # Update config based on arguments
     Config.LLM_ENABLED = args.enable_llm
     Config.MAX_WORKERS = args.max_workers
+    Config.EXECUTOR = args.executor
+    Config.LLM_SELECTION = args.llm_selection
+    Config.MIRROR_CACHE_ENABLED = not args.no_mirror_cache
+    Config.MIRROR_CACHE_DIR = args.mirror_cache_dir
+    Config.MIRROR_CACHE_MAX_BYTES = args.mirror_cache_max_mb * 1024 ** 2
+    Config.LLM_TOP_N = args.llm_top_n
+    Config.INCREMENTAL_ENABLED = not args.no_incremental
+    Config.ANALYSIS_STORE_DIR = args.analysis_store_dir
+    Config.EXTRACTION_CACHE_ENABLED = not args.no_extraction_cache
+    Config.EXTRACTION_CACHE_PATH = args.extraction_cache_path
+    Config.EXTRACTION_CACHE_MAX_MB = args.extraction_cache_max_mb
+    Config.LLM_CALL_BUDGET = args.llm_budget
+    Config.DISCOVERY_USE_GIT = not args.no_git_discovery
+    Config.OUTPUT_FORMAT = args.format
+    Config.OUTPUT_GZIP = args.gzip
+    Config.OUTPUT_BODIES = not args.no_bodies
 
     if Config.LLM_ENABLED and not args.gemini_api_key:
         logging.error("Gemini API key is required when LLM analysis is enabled")
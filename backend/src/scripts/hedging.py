@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from adaptive_limiter import AdaptiveLimiter
+from pipeline_metrics import PipelineMetrics, percentile
+
+
+class HedgePolicy:
+    """Decides when to send a backup request and caps how many extra requests are made.
+
+    A backup is fired once the primary has been running longer than the chosen
+    percentile of its recent latencies. Hedges are limited to budget_ratio of all
+    primary requests (plus a small burst allowance) so hedging cannot double the load.
+    """
+
+    def __init__(self, latency_percentile: float = 95, budget_ratio: float = 0.1, burst: int = 2,
+                 min_samples: int = 10, default_delay: float = 8.0, window: int = 200):
+        self.latency_percentile = latency_percentile
+        self.budget_ratio = budget_ratio
+        self.burst = burst
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def hedge_delay(self, model_name: str) -> float:
+        samples = self._latencies[model_name]
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return percentile(list(samples), self.latency_percentile)
+
+    def record(self, model_name: str, latency: float):
+        """Add a latency sample; for a request cancelled after losing to its hedge, the time it had run"""
+        self._latencies[model_name].append(latency)
+
+    def estimate_unhedged_latency(self, model_name: str, elapsed: float) -> float:
+        """Estimate how long a cancelled request would have taken, given it ran for elapsed seconds.
+
+        Uses the mean of recent latencies beyond elapsed (slow calls that were not hedged,
+        whose hedge lost, or that lost to a later hedge); falls back to elapsed itself, a lower bound.
+        """
+        slower = [latency for latency in self._latencies[model_name] if latency > elapsed]
+        return sum(slower) / len(slower) if slower else elapsed
+
+    def try_acquire_hedge(self) -> bool:
+        if self.hedges < self.budget_ratio * self.requests + self.burst:
+            self.hedges += 1
+            return True
+        self.budget_denied += 1
+        return False
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0
+        }
+
+
+class _NoCapacity(Exception):
+    """A backup request found no free limiter slot"""
+
+
+async def _timed(call: Callable[[str], Awaitable], model_name: str, limiter: Optional[AdaptiveLimiter],
+                 started: asyncio.Event, wait_for_slot: bool = True):
+    """Take a limiter slot, run one request in it and time it; started is set once the slot is held.
+
+    The slot is taken inside the task, so a task cancelled before it runs holds
+    nothing, and it is held until the call returns or its cancellation completes.
+    """
+    if limiter is not None:
+        if wait_for_slot:
+            await limiter.acquire()
+        elif not limiter.try_acquire():
+            raise _NoCapacity()
+    started.set()
+    start = time.monotonic()
+    if limiter is None:
+        result = await call(model_name)
+    else:
+        async with limiter.slot(acquired=True):
+            result = await call(model_name)
+    return result, time.monotonic() - start
+
+
+async def _slot_held(task: asyncio.Future, started: asyncio.Event) -> bool:
+    """Wait until a request task holds its slot; False if it finished before that"""
+    waiter = asyncio.ensure_future(started.wait())
+    try:
+        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiter.cancel()
+    return started.is_set()
+
+
+async def hedged_call(policy: HedgePolicy, primary: str, backup: str, call: Callable[[str], Awaitable],
+                      metrics: Optional[PipelineMetrics] = None,
+                      limiter: Optional[AdaptiveLimiter] = None) -> Tuple[str, object]:
+    """Run call(primary), hedging with call(backup) if the primary is slow.
+
+    The hedge timer starts once the primary holds a limiter slot, and a backup is
+    only sent if a slot is free immediately, so hedges never queue behind real work.
+    Returns (model_name, result) for whichever finishes first; the loser is cancelled,
+    so call must stop its request when cancelled (a native async client, not a
+    worker thread), otherwise the request would keep running outside the limiter.
+    Raises the last error if every attempted request fails.
+    """
+    metrics = metrics or PipelineMetrics()
+    primary_started = asyncio.Event()
+    primary_task = asyncio.ensure_future(_timed(call, primary, limiter, primary_started))
+    tasks = {primary_task: primary}
+    try:
+        await _slot_held(primary_task, primary_started)
+        policy.requests += 1
+        start = time.monotonic()
+        done, _ = await asyncio.wait(set(tasks), timeout=policy.hedge_delay(primary))
+        if not done and policy.try_acquire_hedge():
+            backup_started = asyncio.Event()
+            backup_task = asyncio.ensure_future(_timed(call, backup, limiter, backup_started, wait_for_slot=False))
+            tasks[backup_task] = backup
+            if await _slot_held(backup_task, backup_started):
+                logging.info(f"{primary} slower than p{policy.latency_percentile:g}, hedging with {backup}")
+                metrics.incr("hedges_fired")
+            else:
+                del tasks[backup_task]
+                if not backup_task.cancelled() and isinstance(backup_task.exception(), _NoCapacity):
+                    policy.hedges -= 1
+                    metrics.incr("hedges_no_capacity")
+        elif not done:
+            metrics.incr("hedges_budget_denied")
+
+        pending = set(tasks)
+        last_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                model_name = tasks[task]
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    continue
+                result, latency = task.result()
+                elapsed = time.monotonic() - start
+                policy.record(model_name, latency)
+                metrics.observe("llm_effective", elapsed)
+                if model_name == primary:
+                    metrics.observe("llm_unhedged_estimate", elapsed)
+                else:
+                    policy.hedge_wins += 1
+                    metrics.incr("hedge_wins")
+                    metrics.observe("llm_unhedged_estimate", policy.estimate_unhedged_latency(primary, elapsed))
+                    if not primary_task.done():
+                        # The primary's true latency is unknown but at least this long; leaving it out
+                        # would pull the percentile, and so the hedge delay, down over time
+                        policy.record(primary, elapsed)
+                return model_name, result
+        raise last_error
+    finally:
+        losers = [task for task in tasks if not task.done()]
+        for task in losers:
+            task.cancel()
+        if losers:
+            # Slots go back to the limiter only once the cancelled requests have actually stopped
+            await asyncio.gather(*losers, return_exceptions=True)
+
+
+def report_tail_latency(metrics: PipelineMetrics, policy: HedgePolicy):
+    """Publish hedging stats and the estimated tail-latency gain over the primary model alone"""
+    for key, value in policy.stats().items():
+        metrics.gauge(f"hedge_{key}", value)
+    effective = metrics.summarize_latency("llm_effective")
+    primary = metrics.summarize_latency("llm_unhedged_estimate")
+    for pct in ("p95", "p99"):
+        if effective.get(pct) is not None and primary.get(pct) is not None:
+            metrics.gauge(f"hedge_{pct}_gain_estimate_seconds", round(primary[pct] - effective[pct], 4))
@@ -0,0 +1,312 @@
+import bisect
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import javalang
+
+from js_lexer import IDENT, PUNCT, Token, match_brackets
+
+JAVA_MODIFIERS = {
+    'public', 'protected', 'private', 'static', 'final', 'abstract', 'synchronized', 'native', 'strictfp',
+    'transient', 'volatile', 'default', 'sealed', 'non-sealed'
+}
+TYPE_KEYWORDS = {'class', 'interface', 'enum', 'record'}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*(?:[^*]|\*(?!/))*(?:\*/)?)
+  | (?P<text_block>\"\"\"(?:[^"\\]|\\[\s\S]|"(?!""))*(?:\"\"\")?)
+  | (?P<string>"(?:[^"\\\n]|\\[\s\S])*"?)
+  | (?P<char>'(?:[^'\\\n]|\\[\s\S])*'?)
+  | (?P<non_sealed>non-sealed\b)
+  | (?P<ident>[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*)
+  | (?P<number>\d[\w.]*|\.\d\w*)
+  | (?P<punct>::|->|\.\.\.|[^\s\w])
+""", re.VERBOSE)
+_SKIPPED = {'ws', 'line_comment', 'block_comment'}
+_DEADLINE_CHECK_EVERY = 4096  # Tokens between time budget checks
+
+
+class JavaParseTimeout(Exception):
+    """The per-file time budget ran out while parsing with javalang"""
+
+
+def tokenize_java(source: str) -> List[Token]:
+    """Single pass over Java source; comments are dropped and literals kept as opaque tokens"""
+    tokens: List[Token] = []
+    pos, length = 0, len(source)
+    while pos < length:
+        match = _TOKEN_RE.match(source, pos)
+        kind = match.lastgroup
+        if kind not in _SKIPPED:
+            token_kind = IDENT if kind in ('ident', 'non_sealed') else PUNCT if kind == 'punct' else kind
+            tokens.append((token_kind, match.group(kind), pos, match.end()))
+        pos = match.end()
+    return tokens
+
+
+def _skip_angles(tokens: List[Token], i: int, end: int) -> int:
+    """Index after a <...> list starting at i"""
+    depth = 0
+    while i < end:
+        text = tokens[i][1]
+        if text == '<':
+            depth += 1
+        elif text == '>':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif text in ('{', ';', '('):
+            return i
+        i += 1
+    return i
+
+
+def _skip_annotation(tokens: List[Token], matches: List[int], i: int) -> int:
+    """Index after an annotation such as @Foo, @a.b.Bar or @Baz(x = 1) starting at '@'"""
+    i += 2
+    while i + 1 < len(tokens) and tokens[i][1] == '.' and tokens[i + 1][0] == IDENT:
+        i += 2
+    if i < len(tokens) and tokens[i][1] == '(' and matches[i] > i:
+        i = matches[i] + 1
+    return i
+
+
+def _type_text(tokens: List[Token]) -> str:
+    return "".join(text + (" " if text == ',' else "") for _, text, _, _ in tokens)
+
+
+def split_parameters(tokens: List[Token], matches: List[int], open_paren: int) -> Tuple[List[str], List[str]]:
+    """Parameter names and type strings of the parameter list opened at open_paren"""
+    names, types = [], []
+    close = matches[open_paren]
+    current: List[Token] = []
+    angle = 0
+    i = open_paren + 1
+    while i <= close:
+        kind, text, _, _ = tokens[i]
+        if i == close or (text == ',' and angle == 0):
+            if current:
+                param = [t for t in current if t[1] != 'final']
+                if param and param[-1][0] == IDENT:
+                    names.append(param[-1][1])
+                    types.append(_type_text(param[:-1]))
+            current = []
+        elif text == '@' and i + 1 < close and tokens[i + 1][0] == IDENT:
+            i = _skip_annotation(tokens, matches, i)
+            continue
+        else:
+            angle += (text == '<') - (text == '>')
+            current.append(tokens[i])
+        i += 1
+    return names, types
+
+
+def build_member(tokens: List[Token], matches: List[int], start: int, name_index: int, owner: str,
+                 owner_kind: str) -> Optional[Dict]:
+    """Method or constructor declared from token start, whose name is at name_index"""
+    i, modifiers = start, []
+    while i < name_index:
+        kind, text = tokens[i][0], tokens[i][1]
+        if text == '@':
+            i = _skip_annotation(tokens, matches, i)
+        elif kind == IDENT and text in JAVA_MODIFIERS:
+            modifiers.append(text)
+            i += 1
+        else:
+            break
+    if i < name_index and tokens[i][1] == '<':
+        i = _skip_angles(tokens, i, name_index)
+    return_type = _type_text(tokens[i:name_index])
+
+    open_paren = name_index + 1
+    if matches[open_paren] < open_paren:
+        return None
+    j = matches[open_paren] + 1
+    while j < len(tokens) and tokens[j][1] not in ('{', ';'):
+        if tokens[j][1] in ('(', '[') and matches[j] > j:
+            j = matches[j]
+        elif tokens[j][1] in ('}', ')', '='):
+            return None
+        j += 1
+    if j >= len(tokens):
+        return None
+    has_body = tokens[j][1] == '{'
+    last = matches[j] if has_body else j
+    if last < 0:
+        return None
+
+    name = tokens[name_index][1]
+    names, types = split_parameters(tokens, matches, open_paren)
+    member = {
+        'name': owner if not return_type and name == owner.split('.')[-1] else name,
+        'type': 'constructor' if not return_type else 'method',
+        'class': owner,
+        'class_kind': owner_kind,
+        'parameters': names,
+        'parameter_types': types,
+        'modifiers': sorted(modifiers),
+        'abstract': not has_body,
+        'start': tokens[start][2],
+        'end': tokens[last][3],
+        'next': last + 1
+    }
+    if return_type:
+        member['return_type'] = return_type
+    return member
+
+
+def _statement_start(tokens: List[Token], i: int, floor: int) -> int:
+    """First token of the member declaration containing token i"""
+    while i > floor and tokens[i - 1][1] not in ('{', '}', ';'):
+        i -= 1
+    return i
+
+
+def _type_body(tokens: List[Token], matches: List[int], i: int, end: int) -> int:
+    """Index of the '{' opening a type body, skipping record components and type arguments"""
+    while i < end and tokens[i][1] != '{':
+        if tokens[i][1] == '(' and matches[i] > i:
+            i = matches[i]
+        i += 1
+    return i
+
+
+def find_java_members(source: str) -> List[Dict]:
+    """Methods and constructors of classes, interfaces, enums and records from one token pass"""
+    tokens = tokenize_java(source)
+    matches = match_brackets(tokens)
+    members: List[Dict] = []
+
+    def parse_body(i: int, end: int, owner: str, owner_kind: str):
+        if owner_kind == 'enum':
+            # Constants come first, up to the first top-level ';'
+            while i < end and tokens[i][1] != ';':
+                i = matches[i] + 1 if tokens[i][1] in ('(', '{') and matches[i] > i else i + 1
+            i += 1
+
+        while i < end:
+            start = i
+            text = tokens[i][1]
+            if text == ';':
+                i += 1
+                continue
+            while i + 1 < end and tokens[i][1] == '@' and tokens[i + 1][1] != 'interface':
+                i = _skip_annotation(tokens, matches, i)
+            while i < end and tokens[i][0] == IDENT and tokens[i][1] in JAVA_MODIFIERS:
+                i += 1
+            if i >= end:
+                break
+            kind, text = tokens[i][0], tokens[i][1]
+
+            is_annotation_type = text == '@' and i + 2 < end and tokens[i + 1][1] == 'interface'
+            if is_annotation_type or (kind == IDENT and text in TYPE_KEYWORDS and i + 1 < end
+                                      and tokens[i + 1][0] == IDENT):
+                name_index = i + 2 if is_annotation_type else i + 1
+                name = tokens[name_index][1]
+                brace = _type_body(tokens, matches, name_index + 1, end)
+                if brace >= end or matches[brace] < brace:
+                    break
+                nested = f"{owner}.{name}" if owner else name
+                parse_body(brace + 1, matches[brace], nested, 'annotation' if is_annotation_type else text)
+                i = matches[brace] + 1
+                continue
+
+            if text == '{':
+                # Initializer block
+                i = matches[i] + 1 if matches[i] > i else end
+                continue
+
+            if owner_kind == 'record' and text == owner.split('.')[-1] and i + 1 < end and tokens[i + 1][1] == '{':
+                # Compact canonical constructor
+                last = matches[i + 1]
+                members.append({
+                    'name': owner, 'type': 'constructor', 'class': owner, 'class_kind': owner_kind,
+                    'parameters': [], 'parameter_types': [], 'modifiers': [], 'abstract': False,
+                    'start': tokens[start][2], 'end': tokens[last][3]
+                })
+                i = last + 1
+                continue
+
+            j = i
+            while j < end and tokens[j][1] not in ('(', '=', ';', '{'):
+                j += 1
+            if j < end and tokens[j][1] == '(' and tokens[j - 1][0] == IDENT and owner_kind != 'annotation':
+                member = build_member(tokens, matches, start, j - 1, owner, owner_kind)
+                if member is not None:
+                    i = member.pop('next')
+                    members.append(member)
+                    continue
+            # Field or anything unrecognised: skip to the end of the statement
+            while j < end and tokens[j][1] != ';':
+                j = matches[j] + 1 if tokens[j][1] in ('(', '[', '{') and matches[j] > j else j + 1
+            i = j + 1
+
+    parse_body(0, len(tokens), "", "file")
+    return members
+
+
+class _DeadlineTokens(javalang.util.LookAheadListIterator):
+    def __init__(self, tokens, deadline: float):
+        super().__init__(tokens)
+        self.deadline = deadline
+
+    def __next__(self):
+        if self.marker % _DEADLINE_CHECK_EVERY == 0 and time.monotonic() > self.deadline:
+            raise JavaParseTimeout()
+        return super().__next__()
+
+
+def javalang_members(source_text: str, line_starts: List[int], deadline: float) -> List[Dict]:
+    """Members declared in javalang's AST, with spans taken from javalang's own token stream.
+
+    Raises javalang errors for unparsable files and JavaParseTimeout past the deadline.
+    """
+    java_tokens = []
+    for count, token in enumerate(javalang.tokenizer.tokenize(source_text)):
+        if count % _DEADLINE_CHECK_EVERY == 0 and time.monotonic() > deadline:
+            raise JavaParseTimeout()
+        java_tokens.append(token)
+
+    parser = javalang.parser.Parser(java_tokens)
+    parser.tokens = _DeadlineTokens(java_tokens, deadline)
+    parser.tokens.set_default(javalang.tokenizer.EndOfInput(None))
+    tree = parser.parse_compilation_unit()
+
+    tokens: List[Token] = []
+    for token in java_tokens:
+        offset = line_starts[token.position.line - 1] + token.position.column - 1
+        kind = PUNCT if isinstance(token, (javalang.tokenizer.Separator, javalang.tokenizer.Operator)) else IDENT
+        if token.value == '@':
+            kind = PUNCT
+        tokens.append((kind, token.value, offset, offset + len(token.value)))
+    starts = [token[2] for token in tokens]
+    matches = match_brackets(tokens)
+    members: List[Dict] = []
+
+    def visit(type_node, owner: str):
+        kind = {'EnumDeclaration': 'enum', 'InterfaceDeclaration': 'interface',
+                'AnnotationDeclaration': 'annotation'}.get(type(type_node).__name__, 'class')
+        body = type_node.body.declarations if kind == 'enum' else type_node.body
+        for node in body or []:
+            if isinstance(node, javalang.tree.TypeDeclaration):
+                visit(node, f"{owner}.{node.name}")
+            elif isinstance(node, (javalang.tree.MethodDeclaration, javalang.tree.ConstructorDeclaration)) \
+                    and node.position:
+                position = line_starts[node.position.line - 1] + node.position.column - 1
+                index = bisect.bisect_left(starts, position)
+                name_index = next((k for k in range(index, min(index + 256, len(tokens) - 1))
+                                   if tokens[k][1] == node.name and tokens[k + 1][1] == '('), None)
+                if name_index is None:
+                    continue
+                start = _statement_start(tokens, index, 0)
+                member = build_member(tokens, matches, start, name_index, owner, kind)
+                if member is not None:
+                    member.pop('next')
+                    members.append(member)
+
+    for type_node in tree.types:
+        visit(type_node, type_node.name)
+    return members
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from adaptive_limiter import AdaptiveLimiter
+from extraction_cache import ExtractionCache
+from gemini_ast import INITIAL_CONCURRENCY, MAX_CONCURRENCY, PARSE_WORKERS, analyze_source_code
+
+MAX_JOBS = 4  # Analyses running at once; later jobs wait for a free slot
+
+
+class AnalysisJobRunner:
+    """Runs many gemini_ast analyses concurrently in one process within shared budgets.
+
+    All jobs share one parse process pool (the CPU budget), one adaptive limiter
+    (the LLM budget, so concurrent jobs never exceed llm_concurrency Gemini calls
+    between them) and one extraction cache. Everything else belongs to one job:
+    uploads are read in memory instead of a shared extraction directory, results
+    and metrics are collected per job, and a job only writes its own output file.
+    Two jobs writing the same output path at once are refused.
+    """
+
+    def __init__(self, max_jobs: int = MAX_JOBS, parse_workers: int = PARSE_WORKERS,
+                 llm_concurrency: int = MAX_CONCURRENCY, extraction_cache: Optional[ExtractionCache] = None,
+                 generate=None):
+        self.max_jobs = max_jobs
+        self.limiter = AdaptiveLimiter(initial_limit=min(INITIAL_CONCURRENCY, llm_concurrency),
+                                       max_limit=llm_concurrency)
+        self.parse_executor = ProcessPoolExecutor(max_workers=parse_workers)
+        self._own_cache = extraction_cache is None
+        self.extraction_cache = ExtractionCache() if self._own_cache else extraction_cache
+        self.generate = generate
+        self.completed = 0
+        self.failed = 0
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._active_outputs = set()
+
+    async def run(self, input_path: str, output_path: str) -> bool:
+        """Analyse one upload once a job slot is free; True if its output was written"""
+        output_key = os.path.abspath(output_path)
+        if output_key in self._active_outputs:
+            raise ValueError(f"Another job is already writing {output_path}")
+        self._active_outputs.add(output_key)
+        try:
+            async with self._slots:
+                logging.info(f"Starting analysis of {Path(input_path).name}")
+                success = await analyze_source_code(input_path, output_path, limiter=self.limiter,
+                                                    parse_executor=self.parse_executor,
+                                                    extraction_cache=self.extraction_cache,
+                                                    generate=self.generate)
+        finally:
+            self._active_outputs.discard(output_key)
+        if success:
+            self.completed += 1
+        else:
+            self.failed += 1
+        return success
+
+    async def run_all(self, jobs: Sequence[Tuple[str, str]]) -> List[bool]:
+        """Run (input, output) jobs concurrently and return their outcomes in order"""
+        outcomes = await asyncio.gather(*(self.run(input_path, output_path) for input_path, output_path in jobs),
+                                        return_exceptions=True)
+        for (input_path, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                logging.error(f"Job for {input_path} failed: {outcome}")
+        return [outcome is True for outcome in outcomes]
+
+    async def close(self):
+        await self.limiter.shutdown()
+        self.parse_executor.shutdown(wait=True, cancel_futures=True)
+        if self._own_cache:
+            self.extraction_cache.evict()
+            self.extraction_cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def run_jobs(jobs: Sequence[Tuple[str, str]], max_jobs: int, parse_workers: int,
+                   llm_concurrency: int) -> List[bool]:
+    async with AnalysisJobRunner(max_jobs, parse_workers, llm_concurrency) as runner:
+        outcomes = await runner.run_all(jobs)
+        logging.info(f"{runner.completed} analyses completed, {runner.failed} failed, "
+                     f"limiter {runner.limiter.stats()}")
+        return outcomes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several Gemini source analyses within shared budgets")
+    parser.add_argument("--job", nargs=2, action="append", required=True, metavar=("INPUT", "OUTPUT"),
+                        help="Source file or ZIP archive and its output JSON path; repeat for more jobs")
+    parser.add_argument("--max-jobs", type=int, default=MAX_JOBS, help="Analyses running at once")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS, help="Parse processes shared by all jobs")
+    parser.add_argument("--llm-concurrency", type=int, default=MAX_CONCURRENCY,
+                        help="Gemini calls in flight across all jobs")
+
+    args = parser.parse_args()
+
+    try:
+        outcomes = asyncio.run(run_jobs(args.job, args.max_jobs, args.parse_workers, args.llm_concurrency))
+        exit(0 if all(outcomes) else 1)
+    except Exception as e:
+        logging.error(f"Fatal error: {e}")
+        exit(1)
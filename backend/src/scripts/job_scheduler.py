@@ -0,0 +1,583 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from repo_cache import _FileLock
+from results_store import DEFAULT_DB_PATH, ResultsStore, file_sha256
+from single_flight import content_digest
+
+DEFAULT_JOBS_DIR = os.path.join(os.path.expanduser("~"), ".cache", "specode", "jobs")
+QUEUE_FILE = "queue.sqlite3"
+LOCK_FILE = "scheduler.lock"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_KINDS = ('repository', 'upload')
+REPOSITORY_SCRIPT = 'github_analysis.py'  # Repository jobs run as subprocesses; uploads share an in-process runner
+PRIORITIES = {'interactive': 0, 'batch': 10}  # Lower runs first, oldest first within a class
+WORKERS = 2  # Analyses one scheduler runs at once
+POLL_SECONDS = 0.5  # Idle workers check the queue, and running jobs check for cancellation, this often
+PROGRESS_INTERVAL = 1.0  # Minimum seconds between progress file rewrites for a running job
+CANCEL_GRACE_SECONDS = 10  # Between terminating a cancelled job and killing it
+RESULT_REUSE_SECONDS = 24 * 3600  # A finished job still answers identical submissions for this long
+LOCATION_OPTIONS = {'clone-dir'}  # Options that only say where files go, so they are not part of the dedup key
+ERROR_TAIL_LINES = 20  # Last stderr lines kept as the error of a failed job
+LS_REMOTE_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    input TEXT NOT NULL,
+    output TEXT NOT NULL,
+    options TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    commit_sha TEXT,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    submitters INTEGER NOT NULL DEFAULT 1,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    queued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    returncode INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (state, priority, queued_at);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, state);
+CREATE TABLE IF NOT EXISTS job_submitters (
+    job_id TEXT NOT NULL,
+    submitter TEXT NOT NULL,
+    PRIMARY KEY (job_id, submitter)
+);
+"""
+_LOG_PREFIX = re.compile(r"^\S+ \S+ - [A-Z]+ - ")
+
+
+def remote_head(url: str) -> Optional[str]:
+    """Commit of the remote HEAD, or None if the remote cannot be reached"""
+    try:
+        output = subprocess.run(['git', 'ls-remote', url, 'HEAD'], check=True, capture_output=True, text=True,
+                                timeout=LS_REMOTE_TIMEOUT).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.info(f"Could not resolve the HEAD of {url}: {getattr(e, 'stderr', e)}")
+        return None
+    return output.split()[0] if output.strip() else None
+
+
+def dedup_key(kind: str, identity: str, options: Dict) -> str:
+    """Jobs with equal keys produce the same analysis and are coalesced"""
+    relevant = {key: value for key, value in options.items() if key not in LOCATION_OPTIONS}
+    return content_digest(kind, identity, json.dumps(relevant, sort_keys=True))
+
+
+class JobQueue:
+    """Persistent SQLite queue of analysis jobs with one progress file per job.
+
+    A job is a repository URL (github_analysis) or an uploaded file (gemini_ast,
+    which takes no options).
+    Submitting a job identical to a queued, running or recently finished one
+    (same URL at the same remote commit, or same upload content, with the same
+    options) returns that job instead of adding work; its submitter count goes up
+    and cancelling only stops it once every submitter has cancelled. Submitters
+    that pass an ID (the Node backend passes the user's) count once however often
+    they submit, and can only withdraw while they are counted. Uploads are
+    linked or copied into the queue directory at submission, so the job analyses
+    exactly the content its key was computed from.
+
+    The progress file progress/<id>.json is rewritten on every change and is
+    what other processes, such as the Node backend, poll.
+    """
+
+    def __init__(self, root: str = DEFAULT_JOBS_DIR):
+        self.root = root
+        self.progress_dir = os.path.join(root, "progress")
+        self.inputs_dir = os.path.join(root, "inputs")
+        os.makedirs(self.progress_dir, exist_ok=True)
+        os.makedirs(self.inputs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, QUEUE_FILE), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction, exclusive across threads and processes"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _stage_upload(self, job_id: str, source: str) -> str:
+        target_dir = os.path.join(self.inputs_dir, job_id)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, os.path.basename(source))
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+        return target
+
+    def submit(self, kind: str, source: str, output: str, options: Optional[Dict] = None,
+               priority: str = 'batch', submitter: Optional[str] = None) -> Dict:
+        """Queue a job, or join an identical one; returns its status with 'coalesced' set accordingly"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        if kind == 'upload' and options:
+            raise ValueError("Upload jobs take no options")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}")
+        options = {key.replace('_', '-'): value for key, value in (options or {}).items()}
+        commit = None
+        if kind == 'repository':
+            source = source.rstrip('/')
+            commit = remote_head(source)
+            identity = f"{source.removesuffix('.git')}@{commit or ''}"
+        else:
+            source = os.path.abspath(source)
+            identity = file_sha256(source)
+        key = dedup_key(kind, identity, options)
+        job_id = uuid.uuid4().hex
+        staged = self._stage_upload(job_id, source) if kind == 'upload' else None
+
+        with self._transaction() as conn:
+            existing = conn.execute("SELECT id FROM jobs WHERE dedup_key = ? AND state IN ('queued', 'running') "
+                                    "ORDER BY queued_at LIMIT 1", (key,)).fetchone()
+            # Without a resolved commit the remote may have moved on since a finished run
+            if existing is None and (commit or kind == 'upload'):
+                for row in conn.execute("SELECT id, output FROM jobs WHERE dedup_key = ? AND state = 'done' "
+                                        "AND finished_at > ? ORDER BY finished_at DESC",
+                                        (key, time.time() - RESULT_REUSE_SECONDS)):
+                    if os.path.exists(row['output']):
+                        existing = row
+                        break
+            if existing is not None:
+                joined = 1
+                if submitter is not None:
+                    joined = conn.execute("INSERT OR IGNORE INTO job_submitters VALUES (?, ?)",
+                                          (existing['id'], submitter)).rowcount
+                conn.execute("UPDATE jobs SET submitters = submitters + ?, priority = MIN(priority, ?) WHERE id = ?",
+                             (joined, PRIORITIES[priority], existing['id']))
+            else:
+                conn.execute("INSERT INTO jobs (id, kind, source, input, output, options, dedup_key, commit_sha, "
+                             "priority, state, queued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?)",
+                             (job_id, kind, source, staged or source, os.path.abspath(output), json.dumps(options),
+                              key, commit, PRIORITIES[priority], time.time()))
+                if submitter is not None:
+                    conn.execute("INSERT INTO job_submitters VALUES (?, ?)", (job_id, submitter))
+
+        if existing is not None:
+            if staged:
+                shutil.rmtree(os.path.dirname(staged), ignore_errors=True)
+            job_id = existing['id']
+            logging.info(f"Coalesced {kind} job for {source} into {job_id}")
+        self.write_progress(job_id)
+        return dict(self.status(job_id), coalesced=existing is not None)
+
+    def claim(self) -> Optional[Dict]:
+        """Mark the next queued job as running and return it"""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE state = 'queued' ORDER BY priority, queued_at "
+                               "LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET state = 'running', started_at = ? WHERE id = ?", (time.time(), row['id']))
+        self.write_progress(row['id'])
+        return self.status(row['id'])
+
+    def finish(self, job_id: str, state: str, returncode: Optional[int] = None, error: Optional[str] = None):
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET state = ?, finished_at = ?, returncode = ?, error = ? WHERE id = ?",
+                         (state, time.time(), returncode, error, job_id))
+        shutil.rmtree(os.path.join(self.inputs_dir, job_id), ignore_errors=True)
+        self.write_progress(job_id)
+
+    def cancel(self, job_id: str, submitter: Optional[str] = None) -> Optional[Dict]:
+        """Withdraw one submitter; the job is cancelled once none is left.
+
+        With a submitter ID only that submitter is withdrawn, and only if it is
+        still counted. The returned status has 'withdrawn' set accordingly.
+        """
+        withdrawn = cancelled = False
+        with self._transaction() as conn:
+            row = conn.execute("SELECT state, submitters FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row['state'] in ('queued', 'running'):
+                withdrawn = submitter is None or conn.execute(
+                    "DELETE FROM job_submitters WHERE job_id = ? AND submitter = ?", (job_id, submitter)
+                ).rowcount > 0
+            if withdrawn:
+                submitters = max(row['submitters'] - 1, 0)
+                conn.execute("UPDATE jobs SET submitters = ? WHERE id = ?", (submitters, job_id))
+                if submitters == 0 and row['state'] == 'queued':
+                    conn.execute("UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE id = ?",
+                                 (time.time(), job_id))
+                    cancelled = True
+                elif submitters == 0:
+                    # The worker running it notices within POLL_SECONDS
+                    conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        if cancelled:
+            shutil.rmtree(os.path.join(self.inputs_dir, job_id), ignore_errors=True)
+        self.write_progress(job_id)
+        return dict(self.status(job_id), withdrawn=withdrawn)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def requeue_interrupted(self) -> int:
+        """Put jobs left running by a scheduler that died back in the queue"""
+        with self._transaction() as conn:
+            ids = [row['id'] for row in conn.execute("SELECT id FROM jobs WHERE state = 'running'")]
+            conn.execute("UPDATE jobs SET state = 'queued', started_at = NULL WHERE state = 'running'")
+        for job_id in ids:
+            self.write_progress(job_id)
+        return len(ids)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            status = dict(row)
+            status['options'] = json.loads(status['options'])
+            status['priority'] = next((name for name, value in PRIORITIES.items() if value == row['priority']),
+                                      row['priority'])
+            if row['state'] == 'queued':
+                status['queue_position'] = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND (priority < ? OR "
+                    "(priority = ? AND queued_at < ?))", (row['priority'], row['priority'], row['queued_at'])
+                ).fetchone()[0]
+        return status
+
+    def jobs(self, states: Optional[List[str]] = None, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            if states:
+                rows = self._conn.execute(f"SELECT id FROM jobs WHERE state IN ({','.join('?' * len(states))}) "
+                                          "ORDER BY queued_at DESC LIMIT ?", (*states, limit)).fetchall()
+            else:
+                rows = self._conn.execute("SELECT id FROM jobs ORDER BY queued_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self.status(row['id']) for row in rows]
+
+    def progress_path(self, job_id: str) -> str:
+        return os.path.join(self.progress_dir, f"{job_id}.json")
+
+    def write_progress(self, job_id: str, **progress):
+        """Rewrite the progress file of a job atomically from its queue state plus progress fields"""
+        status = self.status(job_id)
+        if status is None:
+            return
+        status.update(progress, updated_at=time.time())
+        path = self.progress_path(job_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(status, f)
+        os.replace(tmp, path)
+
+    def close(self):
+        self._conn.close()
+
+
+class JobScheduler:
+    """Worker pool that runs queued jobs.
+
+    One scheduler runs per queue directory (a file lock makes later ones exit).
+    Jobs left running by a scheduler that died are requeued on start.
+
+    Upload jobs run on one AnalysisJobRunner owned by the scheduler, so all of
+    them share its parse process pool (parse_workers) and its Gemini budget
+    (llm_concurrency calls in flight in total), however many workers run them.
+    Cancelling one cancels its task. Repository jobs run as github_analysis
+    subprocesses; their stderr log feeds the progress file, and a cancelled one
+    is terminated, then killed after CANCEL_GRACE_SECONDS.
+
+    The output of each successful job is imported into the ResultsStore at
+    results_db before the job is marked done; an import failure is logged and
+    does not fail the job. results_db None skips the import.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = WORKERS, parse_workers: Optional[int] = None,
+                 llm_concurrency: Optional[int] = None, results_db: Optional[str] = None):
+        self.queue = queue
+        self.workers = workers
+        self.parse_workers = parse_workers
+        self.llm_concurrency = llm_concurrency
+        self.results = ResultsStore(results_db) if results_db else None
+        self.processed = 0
+        self._stop = threading.Event()
+        self._count_lock = threading.Lock()
+        self._runner_lock = threading.Lock()
+        self._runner = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def command(job: Dict) -> List[str]:
+        script = os.path.join(SCRIPTS_DIR, REPOSITORY_SCRIPT)
+        command = [sys.executable, script, '--url', job['input'], '--output', job['output']]
+        for key, value in job['options'].items():
+            if value is True:
+                command.append(f"--{key}")
+            elif value not in (False, None):
+                command.extend((f"--{key}", str(value)))
+        return command
+
+    def run(self, until_idle: bool = False) -> int:
+        """Process jobs until stopped, or until the queue is empty with until_idle; returns jobs run"""
+        lock = _FileLock(os.path.join(self.queue.root, LOCK_FILE))
+        if not lock.acquire(blocking=False):
+            logging.info(f"A scheduler is already running for {self.queue.root}")
+            return 0
+        try:
+            requeued = self.queue.requeue_interrupted()
+            if requeued:
+                logging.info(f"Requeued {requeued} interrupted jobs")
+            threads = [threading.Thread(target=self._worker, args=(until_idle,), daemon=True)
+                       for _ in range(self.workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._close_runner()
+            if self.results is not None:
+                self.results.close()
+            lock.release()
+        return self.processed
+
+    def stop(self):
+        self._stop.set()
+
+    def _worker(self, until_idle: bool):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                if until_idle:
+                    return
+                self._stop.wait(POLL_SECONDS)
+                continue
+            try:
+                self._execute(job)
+            except Exception as e:
+                logging.error(f"Job {job['id']} could not run: {e}")
+                self.queue.finish(job['id'], 'failed', error=str(e))
+            with self._count_lock:
+                self.processed += 1
+
+    def _upload_runner(self):
+        """The AnalysisJobRunner shared by every upload job, started with its event loop thread on first use"""
+        with self._runner_lock:
+            if self._runner is None:
+                # Imported here: it loads the Gemini client, which submit and status calls never need
+                from job_runner import AnalysisJobRunner
+                budgets = {key: value for key, value in (('parse_workers', self.parse_workers),
+                                                         ('llm_concurrency', self.llm_concurrency))
+                           if value is not None}
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, daemon=True)
+                thread.start()
+
+                async def create():
+                    return AnalysisJobRunner(max_jobs=self.workers, **budgets)
+
+                self._runner = asyncio.run_coroutine_threadsafe(create(), loop).result()
+                self._loop, self._loop_thread = loop, thread
+        return self._runner
+
+    def _close_runner(self):
+        if self._runner is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._runner = None
+
+    def _import_results(self, job: Dict):
+        if self.results is None:
+            return
+        try:
+            self.results.import_file(job['output'], commit=job.get('commit_sha'))
+        except Exception as e:
+            logging.error(f"Could not import the output of job {job['id']} into the results store: {e}")
+
+    def _execute(self, job: Dict):
+        if job['kind'] == 'upload':
+            self._execute_upload(job)
+        else:
+            self._execute_process(job)
+
+    def _execute_upload(self, job: Dict):
+        logging.info(f"Running upload job {job['id']} for {job['source']}")
+        runner = self._upload_runner()
+        future = asyncio.run_coroutine_threadsafe(runner.run(job['input'], job['output']), self._loop)
+        message = f"Analysing {os.path.basename(job['source'])}"
+        cancelled, success, error = False, False, None
+        last_write = 0.0
+        while True:
+            try:
+                success = future.result(timeout=POLL_SECONDS)
+                break
+            except concurrent.futures.TimeoutError:
+                pass
+            except concurrent.futures.CancelledError:
+                break
+            except Exception as e:
+                error = str(e)
+                break
+            if self.queue.cancel_requested(job['id']):
+                cancelled = True
+                future.cancel()
+                continue
+            now = time.time()
+            if now - last_write >= PROGRESS_INTERVAL:
+                last_write = now
+                self.queue.write_progress(job['id'], message=message, elapsed=round(now - job['started_at'], 1))
+
+        if cancelled:
+            state, returncode = 'cancelled', None
+        elif success:
+            state, returncode = 'done', 0
+            self._import_results(job)
+        else:
+            state, returncode = 'failed', 1
+            error = error or "Analysis failed, see the scheduler log"
+        self.queue.finish(job['id'], state, returncode, error)
+        logging.info(f"Job {job['id']} {state} in {time.time() - job['started_at']:.1f}s")
+
+    def _execute_process(self, job: Dict):
+        logging.info(f"Running {job['kind']} job {job['id']} for {job['source']}")
+        process = subprocess.Popen(self.command(job), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   text=True, encoding='utf-8', errors='replace')
+        tail = deque(maxlen=ERROR_TAIL_LINES)
+        last_write = [0.0]
+
+        def read_log():
+            for line in process.stderr:
+                line = line.rstrip()
+                if not line:
+                    continue
+                tail.append(line)
+                now = time.time()
+                # Only log records are progress; warnings and tracebacks are kept for the error tail
+                if _LOG_PREFIX.match(line) and now - last_write[0] >= PROGRESS_INTERVAL:
+                    last_write[0] = now
+                    self.queue.write_progress(job['id'], message=_LOG_PREFIX.sub('', line),
+                                              elapsed=round(now - job['started_at'], 1))
+
+        reader = threading.Thread(target=read_log, daemon=True)
+        reader.start()
+        cancelled = False
+        while process.poll() is None:
+            if self.queue.cancel_requested(job['id']):
+                cancelled = True
+                process.terminate()
+                try:
+                    process.wait(CANCEL_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                break
+            time.sleep(POLL_SECONDS)
+        reader.join()
+
+        if cancelled:
+            state, error = 'cancelled', None
+        elif process.returncode == 0:
+            state, error = 'done', None
+            self._import_results(job)
+        else:
+            state, error = 'failed', "\n".join(tail) or f"Exited with code {process.returncode}"
+        self.queue.finish(job['id'], state, process.returncode, error)
+        logging.info(f"Job {job['id']} {state} in {time.time() - job['started_at']:.1f}s")
+
+
+def _parse_option(text: str):
+    key, sep, value = text.partition('=')
+    return key.lstrip('-'), value if sep else True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()]
+    )
+
+    parser = argparse.ArgumentParser(description="Persistent queue and scheduler for analysis jobs")
+    parser.add_argument('--jobs-dir', default=DEFAULT_JOBS_DIR, help='Directory of the queue and progress files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    submit = subparsers.add_parser('submit', help='Queue a job, or join an identical one')
+    submit.add_argument('--kind', choices=JOB_KINDS, required=True)
+    submit.add_argument('--source', required=True, help='Repository URL or uploaded file')
+    submit.add_argument('--output', required=True, help='Output path of the analysis')
+    submit.add_argument('--priority', choices=sorted(PRIORITIES), default='batch')
+    submit.add_argument('--option', action='append', default=[], metavar='KEY[=VALUE]',
+                        help='Option passed to github_analysis, e.g. enable-llm or max-workers=8')
+    submit.add_argument('--submitter', help='ID of the submitter, counted once per job')
+
+    status = subparsers.add_parser('status', help='Current state of a job')
+    status.add_argument('job_id')
+
+    cancel = subparsers.add_parser('cancel', help='Withdraw from a job, cancelling it when nobody else waits')
+    cancel.add_argument('job_id')
+    cancel.add_argument('--submitter', help='Withdraw only this submitter')
+
+    listing = subparsers.add_parser('list', help='Recent jobs')
+    listing.add_argument('--state', action='append', choices=['queued', 'running', 'done', 'failed', 'cancelled'])
+    listing.add_argument('--limit', type=int, default=50)
+
+    serve = subparsers.add_parser('serve', help='Run queued jobs')
+    serve.add_argument('--workers', type=int, default=WORKERS)
+    serve.add_argument('--until-idle', action='store_true', help='Exit once the queue is empty')
+    serve.add_argument('--parse-workers', type=int, help='Parse processes shared by all upload jobs')
+    serve.add_argument('--llm-concurrency', type=int, help='Gemini calls in flight across all upload jobs')
+    serve.add_argument('--results-db', default=DEFAULT_DB_PATH,
+                       help="Results store finished outputs are imported into ('' to skip)")
+
+    args = parser.parse_args()
+    queue = JobQueue(args.jobs_dir)
+    try:
+        if args.command == 'submit':
+            result = queue.submit(args.kind, args.source, args.output, dict(map(_parse_option, args.option)),
+                                  args.priority, args.submitter)
+        elif args.command == 'status':
+            result = queue.status(args.job_id)
+        elif args.command == 'cancel':
+            result = queue.cancel(args.job_id, args.submitter)
+        elif args.command == 'list':
+            result = queue.jobs(args.state, args.limit)
+        else:
+            scheduler = JobScheduler(queue, args.workers, args.parse_workers, args.llm_concurrency,
+                                     args.results_db)
+            result = {'processed': scheduler.run(args.until_idle)}
+        print(json.dumps(result, indent=2))
+        exit(0 if result is not None else 1)
+    except Exception as e:
+        logging.error(f"Fatal error: {e}")
+        exit(1)
+    finally:
+        queue.close()
@@ -0,0 +1,309 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Token kinds
+IDENT, NUMBER, STRING, TEMPLATE, REGEX, PUNCT = "ident", "number", "string", "template", "regex", "punct"
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>[\s\ufeff]+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*(?:[^*]|\*(?!/))*(?:\*/)?)
+  | (?P<ident>[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*)
+  | (?P<number>\d[\w.]*|\.\d\w*)
+  | (?P<string>'(?:[^'\\\n]|\\[\s\S])*'?|"(?:[^"\\\n]|\\[\s\S])*"?)
+  | (?P<punct>=>|\.\.\.|\?\.|[^\s\w])
+""", re.VERBOSE)
+# A template chunk ends at the closing backtick or at the start of a ${ substitution
+_TEMPLATE_CHUNK_RE = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*(?:`|\$\{)?")
+_REGEX_RE = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\]?)+/[A-Za-z]*")
+
+# After these keywords a slash starts a regex literal rather than a division
+_REGEX_AFTER_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else',
+    'yield', 'await'
+}
+_NOT_METHOD_NAMES = {
+    'if', 'for', 'while', 'switch', 'catch', 'with', 'function', 'return', 'typeof', 'new', 'await', 'yield',
+    'super', 'import', 'else', 'do', 'try', 'finally', 'throw', 'delete', 'void', 'in', 'of', 'instanceof'
+}
+_MODIFIERS = {'static', 'async', 'get', 'set', 'public', 'private', 'protected', 'readonly', 'override',
+              'abstract', 'export', 'default', 'declare'}
+_DECLARATION_KEYWORDS = {'const', 'let', 'var'}
+_STATEMENT_KEYWORDS = {'const', 'let', 'var', 'function', 'class', 'export', 'import', 'return', 'if', 'for',
+                       'while', 'switch', 'try', 'async', 'throw'}
+_BRACKETS = {'(': ')', '[': ']', '{': '}'}
+
+Token = Tuple[str, str, int, int]  # (kind, text, start offset, end offset)
+
+
+def tokenize_js(source: str) -> List[Token]:
+    """Single pass over JS/TS source yielding significant tokens.
+
+    Comments and whitespace are dropped; strings, template literals (including
+    nested ${...} substitutions) and regex literals are kept as opaque tokens so
+    their contents never look like code.
+    """
+    tokens: List[Token] = []
+    # One entry per open '{' or '${'; True marks a template substitution
+    braces: List[bool] = []
+    pos, length = 0, len(source)
+
+    def scan_template(start: int) -> int:
+        """Scan from just after a backtick or a substitution's '}'; returns the new position"""
+        match = _TEMPLATE_CHUNK_RE.match(source, start)
+        end = match.end()
+        tokens.append((TEMPLATE, source[start - 1:end], start - 1, end))
+        if source.startswith("${", end - 2) and not source.startswith("`", end - 1):
+            braces.append(True)
+        return end
+
+    while pos < length:
+        match = _TOKEN_RE.match(source, pos)
+        kind = match.lastgroup
+        text = match.group(kind)
+        end = match.end()
+
+        if kind in ('ws', 'line_comment', 'block_comment'):
+            pos = end
+            continue
+
+        if kind == 'punct':
+            if text == '`':
+                pos = scan_template(end)
+                continue
+            if text == '/' and _regex_allowed(tokens):
+                regex = _REGEX_RE.match(source, pos)
+                if regex:
+                    tokens.append((REGEX, regex.group(), pos, regex.end()))
+                    pos = regex.end()
+                    continue
+            if text == '{':
+                braces.append(False)
+            elif text == '}' and braces:
+                if braces.pop():
+                    # End of a ${...} substitution: back inside the template literal
+                    pos = scan_template(end)
+                    continue
+
+        tokens.append((kind, text, pos, end))
+        pos = end
+    return tokens
+
+
+def _regex_allowed(tokens: List[Token]) -> bool:
+    if not tokens:
+        return True
+    kind, text = tokens[-1][0], tokens[-1][1]
+    if kind == IDENT:
+        return text in _REGEX_AFTER_KEYWORDS
+    if kind in (NUMBER, STRING, TEMPLATE, REGEX):
+        return False
+    return text not in (')', ']', '}')
+
+
+def match_brackets(tokens: List[Token]) -> List[int]:
+    """Index of the matching bracket for every bracket token (-1 when unmatched or not a bracket)"""
+    matches = [-1] * len(tokens)
+    stack: List[int] = []
+    for i, (kind, text, _, _) in enumerate(tokens):
+        if kind != PUNCT:
+            continue
+        if text in _BRACKETS:
+            stack.append(i)
+        elif text in (')', ']', '}'):
+            # Pop past unbalanced openers so one stray bracket does not break the rest
+            while stack and _BRACKETS[tokens[stack[-1]][1]] != text:
+                stack.pop()
+            if stack:
+                opener = stack.pop()
+                matches[opener], matches[i] = i, opener
+    return matches
+
+
+def _skip_type_parameters(tokens: List[Token], i: int) -> int:
+    """Index after a TypeScript <...> list starting at i, or i if there is none"""
+    if i >= len(tokens) or tokens[i][1] != '<':
+        return i
+    depth = 0
+    for j in range(i, min(len(tokens), i + 200)):
+        text = tokens[j][1]
+        if text == '<':
+            depth += 1
+        elif text == '>':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        elif text in ('{', ';', '=>'):
+            break
+    return i
+
+
+def _body_after_params(tokens: List[Token], matches: List[int], close_paren: int) -> Optional[int]:
+    """Index of the body '{' after a parameter list, skipping a TypeScript return type"""
+    j = close_paren + 1
+    if j < len(tokens) and tokens[j][1] == '{':
+        return j
+    if j >= len(tokens) or tokens[j][1] != ':':
+        return None
+    # Return type annotation: the body is the first '{' that cannot start an object type
+    j += 1
+    while j < len(tokens):
+        text = tokens[j][1]
+        if text in (';', '=>', '=', '}', ')'):
+            return None
+        if text in ('(', '['):
+            j = matches[j] + 1 if matches[j] > j else j + 1
+            continue
+        if text == '{':
+            if tokens[j - 1][1] in (':', '|', '&', '<', ',', '=>', '?'):
+                j = matches[j] + 1 if matches[j] > j else j + 1
+                continue
+            return j
+        j += 1
+    return None
+
+
+def _extend_back(tokens: List[Token], i: int, words: set) -> int:
+    while i > 0 and tokens[i - 1][0] == IDENT and tokens[i - 1][1] in words:
+        i -= 1
+    return i
+
+
+def _arrow_name(tokens: List[Token], params_start: int) -> Optional[Tuple[str, int]]:
+    """Name and first token index of `name = (...) =>`, `const name = async x =>` or `name: (...) =>`"""
+    i = params_start - 1
+    if i >= 0 and tokens[i][1] == 'async':
+        i -= 1
+    if i < 1 or tokens[i][1] not in ('=', ':') or tokens[i - 1][0] != IDENT:
+        return None
+    name_index = i - 1
+    start = _extend_back(tokens, name_index, _DECLARATION_KEYWORDS | {'export'})
+    return tokens[name_index][1], start
+
+
+def _expression_end(source: str, tokens: List[Token], matches: List[int], i: int) -> int:
+    """Index of the last token of an arrow function's expression body starting at i"""
+    last = i
+    while i < len(tokens):
+        kind, text, start, _ = tokens[i]
+        if kind == PUNCT:
+            if text in (';', ',', ')', ']', '}'):
+                break
+            if text in _BRACKETS and matches[i] > i:
+                i = matches[i]
+        elif i > last and kind == IDENT and text in _STATEMENT_KEYWORDS \
+                and '\n' in source[tokens[i - 1][3]:start]:
+            # A new statement without a separating semicolon
+            break
+        last = i
+        i += 1
+    return last
+
+
+def _arrow_params(tokens: List[Token], matches: List[int], arrow: int) -> Optional[Tuple[str, int]]:
+    """Name and first token index of the arrow function whose '=>' is at index arrow"""
+    before = arrow - 1
+    if tokens[before][1] == ')':
+        return _arrow_name(tokens, matches[before]) if matches[before] >= 0 else None
+    if tokens[before][0] == IDENT:
+        named = _arrow_name(tokens, before)
+        if named is not None:
+            return named
+    # TypeScript return type: (a: number): Promise<T> => ...
+    for k in range(before, max(arrow - 50, 1), -1):
+        text = tokens[k][1]
+        if text in ('=', ';', '{', '}', '=>'):
+            break
+        if text == ':' and tokens[k - 1][1] == ')' and matches[k - 1] >= 0:
+            return _arrow_name(tokens, matches[k - 1])
+    return None
+
+
+def find_js_functions(source: str) -> List[Dict]:
+    """Functions, arrow functions, methods and constructors in JS/TS source, in linear time.
+
+    Returns dicts with name, kind and the [start, end) character span of each
+    definition, in source order. Anonymous callbacks are skipped.
+    """
+    tokens = tokenize_js(source)
+    matches = match_brackets(tokens)
+    functions = []
+    # (class name, index of the class body's closing brace)
+    classes: List[Tuple[str, int]] = []
+    # Name tokens of function declarations, so they are not reported again as methods
+    claimed = set()
+
+    for i, (kind, text, start, _) in enumerate(tokens):
+        while classes and i > classes[-1][1]:
+            classes.pop()
+
+        if kind == IDENT and text == 'class':
+            name = tokens[i + 1][1] if i + 1 < len(tokens) and tokens[i + 1][0] == IDENT else None
+            for j in range(i + 1, min(len(tokens), i + 100)):
+                if tokens[j][1] == '{':
+                    if name and name != 'extends' and matches[j] > j:
+                        classes.append((name, matches[j]))
+                    break
+            continue
+
+        if kind == IDENT and text == 'function':
+            j = i + 1
+            if j < len(tokens) and tokens[j][1] == '*':
+                j += 1
+            name = None
+            if j < len(tokens) and tokens[j][0] == IDENT:
+                name, j = tokens[j][1], j + 1
+                claimed.add(j - 1)
+            j = _skip_type_parameters(tokens, j)
+            if j >= len(tokens) or tokens[j][1] != '(' or matches[j] < j:
+                continue
+            body = _body_after_params(tokens, matches, matches[j])
+            if body is None or matches[body] < body:
+                continue
+            first = _extend_back(tokens, i, {'async', 'export', 'default'})
+            if name is None:
+                assigned = _arrow_name(tokens, first)
+                if assigned is None:
+                    continue
+                name, first = assigned
+            functions.append(_span(name, 'function', tokens, first, matches[body]))
+            continue
+
+        if kind == PUNCT and text == '=>' and i > 0:
+            named = _arrow_params(tokens, matches, i)
+            if named is None or i + 1 >= len(tokens):
+                continue
+            name, first = named
+            if tokens[i + 1][1] == '{' and matches[i + 1] > i:
+                last = matches[i + 1]
+            else:
+                last = _expression_end(source, tokens, matches, i + 1)
+            functions.append(_span(name, 'arrow', tokens, first, last))
+            continue
+
+        # Methods and constructors: name(...) { in a class body or object literal
+        if kind != IDENT or text in _NOT_METHOD_NAMES or i in claimed or i + 1 >= len(tokens):
+            continue
+        j = _skip_type_parameters(tokens, i + 1)
+        if j >= len(tokens) or tokens[j][1] != '(' or matches[j] < j:
+            continue
+        previous = tokens[i - 1] if i > 0 else None
+        if previous is not None and previous[1] not in ('{', '}', ';', ',', '*', '#') \
+                and not (previous[0] == IDENT and previous[1] in _MODIFIERS) \
+                and '\n' not in source[previous[3]:start]:
+            continue
+        body = _body_after_params(tokens, matches, matches[j])
+        if body is None or matches[body] < body:
+            continue
+        first = _extend_back(tokens, i, _MODIFIERS)
+        if text == 'constructor' and classes:
+            functions.append(_span(classes[-1][0], 'constructor', tokens, first, matches[body]))
+        else:
+            functions.append(_span(text, 'method', tokens, first, matches[body]))
+
+    functions.sort(key=lambda f: f['start'])
+    return functions
+
+
+def _span(name: str, kind: str, tokens: List[Token], first: int, last: int) -> Dict:
+    return {'name': name, 'kind': kind, 'start': tokens[first][2], 'end': tokens[last][3]}
@@ -0,0 +1,114 @@
+import gzip
+import json
+import os
+import time
+from typing import Dict, IO, Iterable, List, Optional
+
+FORMAT_NAME = "specode-analysis"
+FORMAT_VERSION = 1  # Bump when the line layout changes
+FLUSH_EVERY = 64  # Records between flushes, so readers see progress without a flush per line
+
+
+def open_output(path: str, compress: Optional[bool] = None) -> IO[str]:
+    """Text file for writing results; gzip-compressed when compress is set or path ends in .gz"""
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    return open(path, 'w', encoding='utf-8')
+
+
+def output_record(func: Dict, include_bodies: bool = True, repo_root: Optional[str] = None) -> Dict:
+    """Function record as written to the output, optionally without its body.
+
+    Without bodies, the repository-relative 'path' and the line range are the
+    reference to the source at the analysed commit.
+    """
+    record = func if include_bodies else {key: value for key, value in func.items() if key != 'body'}
+    if repo_root and func.get('filepath'):
+        record = dict(record, path=os.path.relpath(func['filepath'], repo_root).replace("\\", "/"))
+    return record
+
+
+def write_json(result: Dict, path: str, compress: Optional[bool] = None, functions: Optional[Iterable[Dict]] = None):
+    """Same text as json.dump(result, indent=2), but 'functions' is written one record at a time.
+
+    functions, when given, replaces result['functions'], so records can be
+    produced lazily instead of being built into a list first.
+    """
+    head = json.dumps(dict(result, functions=[]), indent=2)
+    marker = '\n  "functions": []'
+    before, after = head.split(marker, 1)
+    with open_output(path, compress) as f:
+        f.write(before)
+        f.write('\n  "functions": [')
+        count = 0
+        for func in result['functions'] if functions is None else functions:
+            f.write(",\n    " if count else "\n    ")
+            f.write(json.dumps(func, indent=2).replace("\n", "\n    "))
+            count += 1
+        f.write("\n  ]" if count else "]")
+        f.write(after)
+
+
+class NdjsonWriter:
+    """Analysis results written as newline-delimited JSON while they are produced.
+
+    The first line is a header and the last a footer, each tagged by its 'record'
+    field like the function and requirement lines in between. A reader that has
+    not seen the footer knows the analysis is still running or was interrupted.
+    Gzip output is sync-flushed, so the compressed stream decodes as it grows.
+    """
+
+    def __init__(self, path: str, compress: Optional[bool] = None, include_bodies: bool = True,
+                 repo_root: Optional[str] = None):
+        self.path = path
+        self.include_bodies = include_bodies
+        self.repo_root = repo_root
+        self.counts: Dict[str, int] = {'function': 0, 'requirement': 0}
+        self.finished = False
+        self._file = open_output(path, compress)
+        self._unflushed = 0
+
+    def _write(self, record_type: str, fields: Dict):
+        self._file.write(json.dumps({'record': record_type, **fields}, separators=(',', ':')))
+        self._file.write("\n")
+        self._unflushed += 1
+        if self._unflushed >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._unflushed = 0
+
+    def header(self, **fields):
+        self._write('header', {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'bodies': self.include_bodies,
+                               'started_at': time.time(), **fields})
+        self.flush()
+
+    def functions(self, functions: List[Dict]):
+        for func in functions:
+            self._write('function', output_record(func, self.include_bodies, self.repo_root))
+        self.counts['function'] += len(functions)
+
+    def requirements(self, requirements: List[Dict]):
+        for requirement in requirements:
+            self._write('requirement', requirement)
+        self.counts['requirement'] += len(requirements)
+
+    def footer(self, **fields):
+        self._write('footer', {'functions_written': self.counts['function'],
+                               'requirements_written': self.counts['requirement'],
+                               'finished_at': time.time(), **fields})
+        self.flush()
+        self.finished = True
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
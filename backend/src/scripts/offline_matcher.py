@@ -0,0 +1,432 @@
+import re
+import zlib
+import logging
+from typing import Iterator, List, Dict, Tuple, Optional
+
+import numpy as np
+
+# Offline matcher defaults
+EMBEDDING_DIM = 2 ** 16  # Width of the hashed feature space; vectors are sparse, so width only limits collisions
+MATCH_THRESHOLD = 0.3  # Cosine similarity needed to count a requirement as implemented
+TOP_K = 3  # Locations reported per requirement
+SKETCH_DIM = 256  # Width of the dense sketches that pick the candidates scored exactly
+SKETCH_CANDIDATES = 64  # Keys per query taken from the sketches and scored exactly
+ROW_BLOCK = 1024  # Requirements per sketch similarity block
+COL_BLOCK = 16384  # Functions per sketch similarity block
+SPARSE_ROW_BLOCK = 256  # Requirements per exact similarity block
+SPARSE_COL_BLOCK = 8192  # Functions per exact similarity block
+PRODUCT_BLOCK = 1 << 22  # Feature products accumulated per pass over an exact similarity block
+PAIR_BLOCK = 64  # Queries densified at once to score their candidates
+EMBED_CHUNK = 8192  # Documents hashed per pass
+MODEL_NAME = "offline-hashed-ngram"
+
+_TOKEN_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'by', 'be', 'is',
+    'are', 'as', 'at', 'it', 'its', 'this', 'that', 'from', 'into', 'their', 'his', 'her',
+    'shall', 'must', 'should', 'will', 'can', 'may', 'able', 'system', 'user', 'users',
+    'application', 'function', 'functions', 'performs', 'operations', 'related', 'include',
+    'self', 'get', 'set', 'new', 'return', 'returns', 'value', 'data'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text and identifiers (camelCase, snake_case) into lowercase word tokens"""
+    return [t.lower() for t in _TOKEN_RE.findall(text or "") if t.lower() not in _STOPWORDS]
+
+
+def _stable_hash(feature: str) -> int:
+    return zlib.crc32(feature.encode('utf-8'))
+
+
+class SparseRows:
+    """Rows of a sparse matrix in CSR form: row i holds indices[indptr[i]:indptr[i + 1]] and their data"""
+
+    # Layout of one stored entry, see row_bytes
+    ENTRY = np.dtype([('index', '<i4'), ('value', '<f4')])
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, dim: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.dim = dim
+
+    @classmethod
+    def empty(cls, dim: int, rows: int = 0) -> 'SparseRows':
+        return cls(np.zeros(rows + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), dim)
+
+    @classmethod
+    def concat(cls, parts: List['SparseRows'], dim: int) -> 'SparseRows':
+        if not parts:
+            return cls.empty(dim)
+        offsets = np.cumsum([0] + [part.indptr[-1] for part in parts[:-1]])
+        indptr = np.concatenate([[0]] + [part.indptr[1:] + offset for part, offset in zip(parts, offsets)])
+        return cls(indptr.astype(np.int64), np.concatenate([part.indices for part in parts]),
+                   np.concatenate([part.data for part in parts]), dim)
+
+    @classmethod
+    def from_bytes(cls, blobs: List[bytes], dim: int) -> 'SparseRows':
+        """Stack rows stored with row_bytes"""
+        indptr = np.zeros(len(blobs) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(blob) // cls.ENTRY.itemsize for blob in blobs])
+        entries = np.frombuffer(b''.join(blobs), dtype=cls.ENTRY)
+        return cls(indptr, entries['index'].astype(np.int32), entries['value'].astype(np.float32), dim)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def row_bytes(self, i: int) -> bytes:
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        entries = np.empty(hi - lo, dtype=self.ENTRY)
+        entries['index'], entries['value'] = self.indices[lo:hi], self.data[lo:hi]
+        return entries.tobytes()
+
+    def row_ids(self) -> np.ndarray:
+        """Row of every stored entry"""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+
+    def slice(self, start: int, stop: int) -> 'SparseRows':
+        stop = min(stop, len(self))
+        lo, hi = self.indptr[start], self.indptr[stop]
+        return SparseRows(self.indptr[start:stop + 1] - lo, self.indices[lo:hi], self.data[lo:hi], self.dim)
+
+    def scaled(self, weights: np.ndarray) -> 'SparseRows':
+        """Each column multiplied by its weight"""
+        return SparseRows(self.indptr, self.indices, (self.data * weights[self.indices]).astype(np.float32), self.dim)
+
+    def sketch(self, width: int = SKETCH_DIM) -> np.ndarray:
+        """Dense (rows, width) sketch with columns folded modulo width and L2-normalised rows"""
+        out = np.zeros((len(self), width), dtype=np.float32)
+        for start in range(0, len(self), EMBED_CHUNK):
+            part = self.slice(start, start + EMBED_CHUNK)
+            counts = np.bincount(part.row_ids() * width + part.indices % width, weights=part.data,
+                                 minlength=len(part) * width)
+            out[start:start + len(part)] = counts.reshape(len(part), width)
+        return _normalize(out)
+
+    def normalized(self) -> 'SparseRows':
+        """Rows scaled to unit L2 norm; empty rows stay empty"""
+        rows = self.row_ids()
+        norms = np.sqrt(np.bincount(rows, weights=np.square(self.data, dtype=np.float64), minlength=len(self)))
+        norms[norms == 0] = 1.0
+        return SparseRows(self.indptr, self.indices, (self.data / norms[rows]).astype(np.float32), self.dim)
+
+
+class HashedNgramEmbedder:
+    """Embeds text as signed, hashed word/bigram/char-trigram counts"""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, char_ngram: int = 3, char_weight: float = 0.3,
+                 bigram_weight: float = 0.5):
+        self.dim = dim
+        self.char_ngram = char_ngram
+        self.char_weight = char_weight
+        self.bigram_weight = bigram_weight
+        self._vocab: Dict[str, int] = {}
+        self._hashes: List[int] = []
+        self._cols: List[List[int]] = []
+        self._vals: List[List[float]] = []
+
+    def _token_id(self, token: str) -> int:
+        """Intern a token and precompute its hashed unigram and char n-gram features"""
+        tid = self._vocab.get(token)
+        if tid is not None:
+            return tid
+        tid = len(self._hashes)
+        self._vocab[token] = tid
+        h = _stable_hash("w:" + token)
+        cols = [h % self.dim]
+        vals = [1.0 if (h >> 31) & 1 else -1.0]
+        padded = f"<{token}>"
+        n = self.char_ngram
+        for i in range(max(len(padded) - n + 1, 0)):
+            ch = _stable_hash("c:" + padded[i:i + n])
+            cols.append(ch % self.dim)
+            vals.append(self.char_weight if (ch >> 31) & 1 else -self.char_weight)
+        self._hashes.append(h)
+        self._cols.append(cols)
+        self._vals.append(vals)
+        return tid
+
+    def _feature_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Pad per-token features into dense (vocab, width) arrays for vectorised lookup"""
+        width = max((len(c) for c in self._cols), default=1)
+        cols = np.zeros((len(self._cols), width), dtype=np.int64)
+        vals = np.zeros((len(self._vals), width), dtype=np.float32)
+        for i, (c, v) in enumerate(zip(self._cols, self._vals)):
+            cols[i, :len(c)] = c
+            vals[i, :len(v)] = v
+        return cols, vals
+
+    def transform(self, texts: List[str]) -> SparseRows:
+        """Return raw (unweighted, unnormalised) feature counts for each text"""
+        docs = [[self._token_id(t) for t in tokenize(text)] for text in texts]
+        cols, vals = self._feature_table()
+        hashes = np.asarray(self._hashes, dtype=np.int64)
+        parts = []
+
+        for start in range(0, len(docs), EMBED_CHUNK):
+            chunk = docs[start:start + EMBED_CHUNK]
+            lengths = np.fromiter((len(d) for d in chunk), dtype=np.int64, count=len(chunk))
+            if not lengths.sum():
+                parts.append(SparseRows.empty(self.dim, len(chunk)))
+                continue
+            tok = np.fromiter((t for d in chunk for t in d), dtype=np.int64, count=int(lengths.sum()))
+            rows = np.repeat(np.arange(len(chunk), dtype=np.int64), lengths)
+
+            # Unigrams and char n-grams via the per-token feature table
+            flat_idx = (rows[:, None] * self.dim + cols[tok]).ravel()
+            weights = vals[tok].ravel()
+
+            # Word bigrams: combine hashes of adjacent tokens within the same document
+            same_doc = rows[1:] == rows[:-1]
+            if same_doc.any():
+                bh = (hashes[tok[:-1]][same_doc] * 1000003 + hashes[tok[1:]][same_doc]) & 0xFFFFFFFF
+                b_rows = rows[1:][same_doc]
+                b_sign = np.where((bh >> 31) & 1, self.bigram_weight, -self.bigram_weight)
+                flat_idx = np.concatenate([flat_idx, b_rows * self.dim + bh % self.dim])
+                weights = np.concatenate([weights, b_sign.astype(np.float32)])
+
+            # Sum repeated (document, feature) pairs; unique keys come out sorted by document, then feature
+            keys, inverse = np.unique(flat_idx, return_inverse=True)
+            counts = np.bincount(inverse, weights=weights)
+            nonzero = counts != 0
+            keys = keys[nonzero]
+            indptr = np.zeros(len(chunk) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(keys // self.dim, minlength=len(chunk)))
+            parts.append(SparseRows(indptr, (keys % self.dim).astype(np.int32),
+                                    counts[nonzero].astype(np.float32), self.dim))
+        return SparseRows.concat(parts, self.dim)
+
+    @staticmethod
+    def idf(*corpora: SparseRows) -> np.ndarray:
+        """Smoothed IDF weights from the raw feature counts of one or more corpora"""
+        n_docs = sum(len(counts) for counts in corpora)
+        df = sum(np.bincount(counts.indices, minlength=counts.dim) for counts in corpora)
+        return (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+    def embed(self, texts: List[str], idf: np.ndarray) -> SparseRows:
+        """Embed texts with given IDF weights and L2-normalised rows"""
+        return self.transform(texts).scaled(idf).normalized()
+
+    def embed_pair(self, left: List[str], right: List[str]) -> Tuple[SparseRows, SparseRows]:
+        """Embed two corpora with a shared IDF weighting and L2-normalised rows"""
+        a = self.transform(left)
+        b = self.transform(right)
+        idf = self.idf(a, b)
+        return a.scaled(idf).normalized(), b.scaled(idf).normalized()
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, indices: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the k best (score, index) pairs per row, unordered"""
+    if scores.shape[1] <= k:
+        return scores, indices
+    part = np.argpartition(scores, -k, axis=1)[:, -k:]
+    return np.take_along_axis(scores, part, axis=1), np.take_along_axis(indices, part, axis=1)
+
+
+def _dense_top_k(queries: np.ndarray, keys: np.ndarray, k: int, row_block: int = ROW_BLOCK,
+                 col_block: int = COL_BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """Blocked dot products of dense rows returning (scores, indices) of the top-k keys per query, best first"""
+    n = len(queries)
+    best_scores = np.full((n, k), -np.inf, dtype=np.float32)
+    best_idx = np.zeros((n, k), dtype=np.int64)
+    if k == 0:
+        return best_scores, best_idx
+
+    for r0 in range(0, n, row_block):
+        q = queries[r0:r0 + row_block]
+        scores, idx = best_scores[r0:r0 + row_block].copy(), best_idx[r0:r0 + row_block].copy()
+        for c0 in range(0, len(keys), col_block):
+            block = q @ keys[c0:c0 + col_block].T
+            # Only rows whose block maximum beats their current k-th best can change
+            rows = np.nonzero(block.max(axis=1) > scores.min(axis=1))[0]
+            if not len(rows):
+                continue
+            block = block[rows]
+            block_idx = np.broadcast_to(np.arange(c0, c0 + block.shape[1]), block.shape)
+            cand_scores, cand_idx = _top_k(block, block_idx, k)
+            merged_scores, merged_idx = _top_k(np.concatenate([scores[rows], cand_scores], axis=1),
+                                               np.concatenate([idx[rows], cand_idx], axis=1), k)
+            scores[rows], idx[rows] = merged_scores, merged_idx
+        order = np.argsort(-scores, axis=1)
+        best_scores[r0:r0 + row_block] = np.take_along_axis(scores, order, axis=1)
+        best_idx[r0:r0 + row_block] = np.take_along_axis(idx, order, axis=1)
+    return best_scores, best_idx
+
+
+def _postings(keys: SparseRows) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Entries of keys grouped by feature: (start of each feature's run, key row, value)"""
+    order = np.argsort(keys.indices, kind='stable')
+    starts = np.zeros(keys.dim + 1, dtype=np.int64)
+    starts[1:] = np.cumsum(np.bincount(keys.indices, minlength=keys.dim))
+    return starts, keys.row_ids()[order], keys.data[order]
+
+
+def similarity_blocks(queries: SparseRows, keys: SparseRows, row_block: int = SPARSE_ROW_BLOCK,
+                      col_block: int = SPARSE_COL_BLOCK) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Yield (row offset, column offset, dense dot-product block) tiles covering queries x keys.
+
+    Only features shared by a query and a key are multiplied, through an
+    inverted list of each block of keys.
+    """
+    for c0 in range(0, len(keys), col_block):
+        block_keys = keys.slice(c0, c0 + col_block)
+        n_keys = len(block_keys)
+        starts, key_rows, key_values = _postings(block_keys)
+        for r0 in range(0, len(queries), row_block):
+            q = queries.slice(r0, r0 + row_block)
+            q_rows = q.row_ids()
+            lengths = starts[q.indices + 1] - starts[q.indices]
+            ends = np.cumsum(lengths)
+            scores = np.zeros(len(q) * n_keys)
+            # Query entries are taken in runs of about PRODUCT_BLOCK products to bound memory
+            cuts = np.searchsorted(ends, np.arange(PRODUCT_BLOCK, ends[-1] if len(ends) else 0, PRODUCT_BLOCK))
+            bounds = np.unique(np.concatenate([[0], cuts, [len(lengths)]]))
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                n = lengths[a:b]
+                count = int(n.sum())
+                if not count:
+                    continue
+                pos = np.repeat(starts[q.indices[a:b]] - (np.cumsum(n) - n), n) + np.arange(count)
+                scores += np.bincount(np.repeat(q_rows[a:b], n) * n_keys + key_rows[pos],
+                                      weights=np.repeat(q.data[a:b], n) * key_values[pos],
+                                      minlength=len(q) * n_keys)
+            yield r0, c0, scores.reshape(len(q), n_keys).astype(np.float32)
+
+
+def similarities(queries: SparseRows, keys: SparseRows) -> np.ndarray:
+    """Dense (queries, keys) cosine similarities of normalised rows"""
+    out = np.zeros((len(queries), len(keys)), dtype=np.float32)
+    for r0, c0, block in similarity_blocks(queries, keys):
+        out[r0:r0 + block.shape[0], c0:c0 + block.shape[1]] = block
+    return out
+
+
+def pair_similarities(queries: SparseRows, keys: SparseRows, candidates: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each query with the keys in its row of candidates"""
+    scores = np.zeros(candidates.shape, dtype=np.float32)
+    for r0 in range(0, len(queries), PAIR_BLOCK):
+        q = queries.slice(r0, r0 + PAIR_BLOCK)
+        dense = np.zeros((len(q), q.dim), dtype=np.float32)
+        dense[q.row_ids(), q.indices] = q.data
+        flat = candidates[r0:r0 + len(q)].ravel()
+        lengths = keys.indptr[flat + 1] - keys.indptr[flat]
+        total = int(lengths.sum())
+        pos = np.repeat(keys.indptr[flat] - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+        pairs = np.repeat(np.arange(len(flat)), lengths)
+        products = dense[pairs // candidates.shape[1], keys.indices[pos]] * keys.data[pos]
+        scores[r0:r0 + len(q)] = np.bincount(pairs, weights=products, minlength=len(flat)).reshape(len(q), -1)
+    return scores
+
+
+def top_k_similarities(queries: SparseRows, keys: SparseRows, k: int = TOP_K) -> Tuple[np.ndarray, np.ndarray]:
+    """Cosine similarity returning (scores, indices) of the top-k keys per query, best first.
+
+    The SKETCH_CANDIDATES best keys of each query by the similarity of their
+    dense sketches are scored exactly, and the top k of those are kept.
+    """
+    k = min(k, len(keys))
+    if k == 0:
+        return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+    _, candidates = _dense_top_k(queries.sketch(), keys.sketch(), min(max(k, SKETCH_CANDIDATES), len(keys)))
+    scores = pair_similarities(queries, keys, candidates)
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+def _analysis_excerpt(analysis: str, name: str, width: int = 400) -> str:
+    pos = analysis.find(name)
+    return analysis[pos:pos + width] if pos >= 0 else ""
+
+
+def describe_functions(source_code: Dict) -> List[Dict]:
+    """Flatten github_analysis or gemini_ast output into (location, description) records"""
+    described = []
+    for func in source_code.get('functions', []) or []:
+        text_parts = [func.get('name', ''), func.get('file', '')]
+        for key in ('underlying_meaning', 'llm_summary', 'docstring', 'summary'):
+            if func.get(key):
+                text_parts.append(str(func[key]))
+        text_parts.extend(func.get('params') or func.get('parameters') or [])
+        described.append({
+            'location': f"{func.get('file', '')}:{func.get('name', '')}",
+            'text': " ".join(text_parts)
+        })
+
+    for result in source_code.get('results', []) or []:
+        if not isinstance(result, dict) or 'functions' not in result:
+            continue
+        analysis = result.get('analysis') or ""
+        for name in result['functions']:
+            described.append({
+                'location': f"{result.get('filename', '')}:{name}",
+                'text': f"{name} {result.get('filename', '')} {_analysis_excerpt(analysis, name)}"
+            })
+    return described
+
+
+def _priority(requirement: str) -> str:
+    text = requirement.lower()
+    if re.search(r'\b(shall|must)\b', text):
+        return "high"
+    if re.search(r'\bshould\b', text):
+        return "medium"
+    return "low"
+
+
+def coverage_report(requirements: List[str], ranked: List[List[Tuple[float, str]]],
+                    threshold: float = MATCH_THRESHOLD) -> Dict:
+    """compare_requirements output from the best (score, location) pairs of each requirement, best first"""
+    matches, missing = [], []
+    for requirement, best in zip(requirements, ranked):
+        locations = [location for score, location in best if score >= threshold]
+        matches.append({
+            "requirement": requirement,
+            "implemented": bool(locations),
+            "locations": locations
+        })
+        if not locations:
+            closest = ""
+            if best and np.isfinite(best[0][0]):
+                closest = f" Closest existing function: {best[0][1]} (similarity {best[0][0]:.2f})."
+            missing.append({
+                "requirement": requirement,
+                "suggestion": f"Add a function that implements this requirement.{closest}",
+                "priority": _priority(requirement)
+            })
+
+    total = len(requirements)
+    implemented = total - len(missing)
+    return {
+        "stats": {
+            "total_requirements": total,
+            "implemented_requirements": implemented,
+            "missing_requirements": len(missing),
+            "coverage_percentage": round(implemented / total * 100, 2) if total else 0.0
+        },
+        "matches": matches,
+        "missing_requirements": missing,
+        "suggestions": [],
+        "model_used": MODEL_NAME
+    }
+
+
+def match_requirements(requirements: List[str], source_code: Dict, threshold: float = MATCH_THRESHOLD,
+                       top_k: int = TOP_K, dim: int = EMBEDDING_DIM,
+                       functions: Optional[List[Dict]] = None) -> Dict:
+    """Match requirements to functions without an LLM, in the compare_requirements output schema"""
+    functions = functions if functions is not None else describe_functions(source_code)
+    logging.info(f"Offline matching {len(requirements)} requirements against {len(functions)} functions")
+
+    embedder = HashedNgramEmbedder(dim=dim)
+    req_vectors, func_vectors = embedder.embed_pair(requirements, [f['text'] for f in functions])
+    scores, indices = top_k_similarities(req_vectors, func_vectors, k=top_k)
+    ranked = [[(float(score), functions[j]['location']) for score, j in zip(scores[i], indices[i])]
+              for i in range(len(requirements))]
+    return coverage_report(requirements, ranked, threshold)
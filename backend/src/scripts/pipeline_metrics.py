@@ -0,0 +1,61 @@
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of samples (pct in 0-100)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class PipelineMetrics:
+    """Thread-safe counters, gauges and latency samples for a single analysis run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.gauges: Dict[str, float] = {}
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self.latencies[name].append(seconds)
+
+    def summarize_latency(self, name: str) -> Dict:
+        with self._lock:
+            samples = list(self.latencies.get(name, []))
+        if not samples:
+            return {"count": 0}
+        return {
+            "count": len(samples),
+            "mean": round(sum(samples) / len(samples), 4),
+            "p50": round(percentile(samples, 50), 4),
+            "p95": round(percentile(samples, 95), 4),
+            "p99": round(percentile(samples, 99), 4),
+            "max": round(max(samples), 4)
+        }
+
+    def snapshot(self) -> Dict:
+        """Return a JSON-serialisable view of all metrics"""
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            names = list(self.latencies)
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "latency_seconds": {name: self.summarize_latency(name) for name in names}
+        }
@@ -0,0 +1,112 @@
+import json
+import logging
+import math
+import re
+from typing import Any, Iterable, Optional
+
+from pipeline_metrics import PipelineMetrics
+
+DEFAULT_TOKEN_BUDGET = 30000  # Estimated tokens allowed for one embedded payload
+STRING_LIMITS = (2000, 500, 200, 80)  # Successive caps applied to long string values
+LOW_VALUE_KEYS = (
+    'body', 'start_time', 'processing_time', 'parameter_types', 'modifiers',
+    'filepath', 'line_count', 'start_line', 'end_line', 'functional_requirements'
+)
+
+_WORD_RE = re.compile(r"\w+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_TRAILING_SPACES_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate: words cost ~1.3 tokens, punctuation one each"""
+    if not text:
+        return 0
+    # Long identifiers split into several sub-word tokens
+    words = sum(1 + (m.end() - m.start()) // 8 for m in _WORD_RE.finditer(text))
+    punct = len(_PUNCT_RE.findall(text))
+    return int(math.ceil(words * 1.3 + punct))
+
+
+def squeeze_whitespace(text: str) -> str:
+    """Drop trailing spaces and collapse runs of blank lines; indentation is kept, as it carries meaning in code"""
+    return _BLANK_LINES_RE.sub("\n\n", _TRAILING_SPACES_RE.sub("", text)).strip("\n")
+
+
+def compact_json(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def fit_text(text: str, budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Squeeze whitespace and, if still over budget, keep the head and tail of the text"""
+    text = squeeze_whitespace(text or "")
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    keep = int(len(text) * budget / tokens * 0.95)
+    head = text[:keep * 3 // 4]
+    tail = text[len(text) - keep // 4:]
+    return f"{head}\n[... {tokens - budget} tokens trimmed ...]\n{tail}"
+
+
+def _shrink(obj: Any, max_string: Optional[int], drop_keys: Iterable[str], list_ratio: float) -> Any:
+    if isinstance(obj, dict):
+        return {k: _shrink(v, max_string, drop_keys, list_ratio) for k, v in obj.items() if k not in drop_keys}
+    if isinstance(obj, list):
+        keep = len(obj) if list_ratio >= 1 else max(1, int(len(obj) * list_ratio))
+        items = [_shrink(v, max_string, drop_keys, list_ratio) for v in obj[:keep]]
+        if keep < len(obj):
+            items.append(f"... {len(obj) - keep} more items omitted")
+        return items
+    if isinstance(obj, str):
+        text = squeeze_whitespace(obj)
+        if max_string is not None and len(text) > max_string:
+            return text[:max_string] + "..."
+        return text
+    return obj
+
+
+def fit_json(obj: Any, budget: int = DEFAULT_TOKEN_BUDGET, low_value_keys: Iterable[str] = LOW_VALUE_KEYS) -> str:
+    """Serialise obj compactly, trimming low-value content until it fits the token budget.
+
+    Steps, stopping as soon as the payload fits: compact separators and squeezed
+    whitespace, progressively shorter string values, dropping low-value keys
+    (bodies, timings, locations), then sampling long lists.
+    """
+    text = compact_json(_shrink(obj, None, (), 1.0))
+    if estimate_tokens(text) <= budget:
+        return text
+
+    for limit in STRING_LIMITS:
+        text = compact_json(_shrink(obj, limit, (), 1.0))
+        if estimate_tokens(text) <= budget:
+            return text
+
+    drop = tuple(low_value_keys)
+    text = compact_json(_shrink(obj, STRING_LIMITS[-1], drop, 1.0))
+    tokens = estimate_tokens(text)
+    ratio = 1.0
+    while tokens > budget and ratio > 0.001:
+        ratio *= max(min(budget / tokens, 0.9), 0.1)
+        text = compact_json(_shrink(obj, STRING_LIMITS[-1], drop, ratio))
+        tokens = estimate_tokens(text)
+    if tokens > budget:
+        # Cutting the text would break the JSON, so the caller gets it over budget
+        logging.warning(f"JSON payload still {tokens} tokens after trimming, over the budget of {budget}")
+    return text
+
+
+def log_usage(call_name: str, prompt: str, response: Optional[str] = None, usage: Any = None,
+              metrics: Optional[PipelineMetrics] = None):
+    """Log prompt/response token counts, preferring the API's usage metadata when available"""
+    prompt_tokens = getattr(usage, 'prompt_token_count', None) or estimate_tokens(prompt)
+    response_tokens = getattr(usage, 'candidates_token_count', None)
+    if response_tokens is None:
+        response_tokens = estimate_tokens(response) if response else 0
+    source = "reported" if usage is not None else "estimated"
+    logging.info(f"Token usage [{call_name}] ({source}): prompt={prompt_tokens}, response={response_tokens}")
+    if metrics is not None:
+        metrics.incr("prompt_tokens", prompt_tokens)
+        metrics.incr("response_tokens", response_tokens)
+    return prompt_tokens, response_tokens
@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from git import Repo
+from git.exc import GitCommandError
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "specode", "mirrors")
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+HEAD_REF = "refs/specode/head"  # Where the latest fetched remote HEAD is kept in each mirror
+LAST_USED_FILE = "specode-last-used"
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file, shared across processes (fcntl or msvcrt)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        self._handle = open(self.path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), mode, 1)
+            else:
+                import fcntl
+                flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                fcntl.flock(self._handle.fileno(), flags)
+            return True
+        except OSError:
+            self._handle.close()
+            self._handle = None
+            return False
+
+    def release(self):
+        if self._handle is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._handle.close()
+            self._handle = None
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class MirrorCache:
+    """Local cache of bare repository mirrors keyed by URL.
+
+    The first analysis of a URL makes a shallow (depth-1, optionally blob-filtered)
+    bare clone; later analyses only fetch the remote HEAD into it. Working trees are
+    checked out from the mirror with `git worktree`. A per-URL lock (thread and
+    file based) serialises updates, and least recently used mirrors without live
+    worktrees are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES, depth: Optional[int] = 1,
+                 clone_filter: Optional[str] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.depth = depth
+        self.clone_filter = clone_filter
+        os.makedirs(root, exist_ok=True)
+
+    def mirror_path(self, url: str) -> str:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", url.rstrip('/').split('/')[-1].removesuffix('.git'))[:40]
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.root, f"{digest}-{name}.git")
+
+    @contextmanager
+    def _locked(self, mirror: str) -> Iterator[None]:
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(mirror, threading.Lock())
+        with thread_lock:
+            file_lock = _FileLock(mirror + ".lock")
+            file_lock.acquire()
+            try:
+                yield
+            finally:
+                file_lock.release()
+
+    def _git_options(self) -> Dict:
+        options = {}
+        if self.depth:
+            options['depth'] = self.depth
+        if self.clone_filter:
+            options['filter'] = self.clone_filter
+        return options
+
+    def _update(self, url: str, mirror: str) -> Repo:
+        """Clone the mirror on first use, otherwise fetch the remote HEAD into it"""
+        if os.path.isdir(mirror):
+            try:
+                repo = Repo(mirror)
+                start = time.time()
+                repo.git.fetch('origin', f"+HEAD:{HEAD_REF}", no_tags=True, **self._git_options())
+                logging.info(f"Fetched {url} into mirror in {time.time() - start:.2f}s")
+                return repo
+            except Exception as e:
+                logging.warning(f"Mirror for {url} is unusable ({e}), recloning")
+                shutil.rmtree(mirror, ignore_errors=True)
+
+        start = time.time()
+        repo = Repo.clone_from(url, mirror, bare=True, no_tags=True, **self._git_options())
+        repo.git.update_ref(HEAD_REF, 'HEAD')
+        logging.info(f"Cloned {url} into mirror in {time.time() - start:.2f}s")
+        return repo
+
+    @contextmanager
+    def worktree(self, url: str, target_dir: str, keep: bool = False) -> Iterator[str]:
+        """Check out the latest remote HEAD of url into target_dir; yields the commit SHA.
+
+        target_dir must not exist. Unless keep is set, the worktree is removed on exit.
+        """
+        mirror = self.mirror_path(url)
+        with self._locked(mirror):
+            repo = self._update(url, mirror)
+            commit = repo.git.rev_parse(HEAD_REF)
+            repo.git.worktree('prune')
+            repo.git.worktree('add', '--detach', target_dir, commit)
+            with open(os.path.join(mirror, LAST_USED_FILE), 'w') as f:
+                f.write(str(time.time()))
+
+        try:
+            yield commit
+        finally:
+            if not keep:
+                with self._locked(mirror):
+                    try:
+                        repo.git.worktree('remove', '--force', target_dir)
+                    except GitCommandError as e:
+                        logging.warning(f"Could not remove worktree {target_dir}: {e}")
+                        shutil.rmtree(target_dir, ignore_errors=True)
+                        repo.git.worktree('prune')
+            self.evict()
+
+    def _mirrors(self) -> List[str]:
+        return [os.path.join(self.root, name) for name in os.listdir(self.root) if name.endswith('.git')]
+
+    @staticmethod
+    def _last_used(mirror: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(mirror, LAST_USED_FILE))
+        except OSError:
+            return 0.0
+
+    def evict(self) -> List[str]:
+        """Remove least recently used idle mirrors until the cache fits in max_bytes"""
+        sizes = {mirror: _dir_size(mirror) for mirror in self._mirrors()}
+        total = sum(sizes.values())
+        evicted = []
+        for mirror in sorted(sizes, key=self._last_used):
+            if total <= self.max_bytes:
+                break
+            lock = _FileLock(mirror + ".lock")
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                repo = Repo(mirror)
+                repo.git.worktree('prune')
+                # The first entry is the bare mirror itself; anything more is a live checkout
+                if len(repo.git.worktree('list', '--porcelain').split('\n\n')) > 1:
+                    continue
+                shutil.rmtree(mirror, ignore_errors=True)
+                total -= sizes[mirror]
+                evicted.append(mirror)
+                logging.info(f"Evicted mirror {os.path.basename(mirror)} ({sizes[mirror]} bytes)")
+            except Exception as e:
+                logging.warning(f"Could not evict {mirror}: {e}")
+            finally:
+                lock.release()
+        return evicted
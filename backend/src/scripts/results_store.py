@@ -0,0 +1,570 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "specode", "results.sqlite3")
+SUMMARY_KEYS = ('underlying_meaning', 'llm_summary', 'docstring', 'summary')  # First one present is the summary
+RECORD_COLUMNS = {'name', 'kind', 'language', 'start_line', 'end_line', 'complexity', 'file', 'filepath', 'path',
+                  'body'}  # Keys stored in their own column (or, for bodies, left in the analysis output)
+INSERT_BATCH = 5000  # Function rows per executemany
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    repo TEXT,
+    commit_sha TEXT,
+    source_path TEXT NOT NULL,
+    content_sha TEXT NOT NULL UNIQUE,
+    code_run_id INTEGER REFERENCES runs (id),
+    requirements_run_id INTEGER REFERENCES runs (id),
+    created_at REAL,
+    imported_at REAL NOT NULL,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    language TEXT,
+    analysis TEXT,
+    UNIQUE (run_id, path)
+);
+CREATE TABLE IF NOT EXISTS functions (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    file_id INTEGER REFERENCES files (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT,
+    language TEXT,
+    start_line INTEGER,
+    end_line INTEGER,
+    complexity REAL,
+    summary TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS requirements (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    req_key TEXT,
+    text TEXT NOT NULL,
+    priority TEXT,
+    function_id INTEGER REFERENCES functions (id) ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    requirement_id INTEGER NOT NULL REFERENCES requirements (id) ON DELETE CASCADE,
+    implemented INTEGER NOT NULL,
+    location TEXT,
+    file_name TEXT,
+    function_name TEXT,
+    function_id INTEGER REFERENCES functions (id) ON DELETE SET NULL,
+    suggestion TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_repo_commit ON runs (repo, commit_sha, kind);
+CREATE INDEX IF NOT EXISTS files_name ON files (run_id, name);
+CREATE INDEX IF NOT EXISTS functions_run_name ON functions (run_id, name);
+CREATE INDEX IF NOT EXISTS functions_name ON functions (name);
+CREATE INDEX IF NOT EXISTS functions_language ON functions (language, run_id);
+CREATE INDEX IF NOT EXISTS functions_file ON functions (file_id);
+CREATE INDEX IF NOT EXISTS requirements_key ON requirements (req_key);
+CREATE INDEX IF NOT EXISTS requirements_text ON requirements (text);
+CREATE INDEX IF NOT EXISTS requirements_run ON requirements (run_id);
+CREATE INDEX IF NOT EXISTS matches_requirement ON matches (requirement_id, run_id);
+CREATE INDEX IF NOT EXISTS matches_run ON matches (run_id, implemented);
+CREATE INDEX IF NOT EXISTS matches_function ON matches (function_id);
+"""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _open_text(path: str):
+    return gzip.open(path, 'rt', encoding='utf-8') if path.endswith('.gz') else open(path, 'r', encoding='utf-8')
+
+
+def _ndjson_records(path: str) -> Iterator[Dict]:
+    with _open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _is_ndjson(path: str) -> bool:
+    with _open_text(path) as f:
+        first = f.readline()
+    try:
+        return json.loads(first).get('record') == 'header'
+    except (ValueError, AttributeError):
+        return False
+
+
+def _split_location(location: str) -> Tuple[str, str]:
+    """'file:function' as written by compare_requirements and offline_matcher"""
+    file_name, _, function_name = location.rpartition(':')
+    return file_name, function_name
+
+
+class ResultsStore:
+    """Indexed SQLite store of analysis, requirement and comparison results.
+
+    Each imported output file becomes a run: a code analysis (github_analysis
+    JSON or NDJSON, gemini_ast JSON) with its files, functions and generated
+    requirements; an extracted requirements CSV; or a comparison
+    (compare_requirements output) whose matches point at the requirement rows of
+    a requirements run and at the function rows of a code run when those are
+    given. Re-importing a file with the same content returns the existing run.
+    Function bodies are not copied; they stay in the analysis output.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, tuple(params))]
+
+    @staticmethod
+    def _existing_run(conn: sqlite3.Connection, content_sha: str) -> Optional[int]:
+        row = conn.execute("SELECT id FROM runs WHERE content_sha = ?", (content_sha,)).fetchone()
+        return row['id'] if row else None
+
+    @staticmethod
+    def _insert_run(conn: sqlite3.Connection, kind: str, path: str, content_sha: str, repo: Optional[str] = None,
+                    commit: Optional[str] = None, created_at: Optional[float] = None, summary: Optional[Dict] = None,
+                    code_run: Optional[int] = None, requirements_run: Optional[int] = None) -> int:
+        return conn.execute(
+            "INSERT INTO runs (kind, repo, commit_sha, source_path, content_sha, code_run_id, requirements_run_id, "
+            "created_at, imported_at, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind, repo.rstrip('/') if repo else None, commit, os.path.abspath(path), content_sha, code_run,
+             requirements_run, created_at, time.time(), json.dumps(summary) if summary is not None else None)
+        ).lastrowid
+
+    # Importers
+
+    def import_file(self, path: str, **kwargs) -> int:
+        """Import any supported output file, picking the importer from its name and content"""
+        if path.lower().endswith('.csv'):
+            return self.import_requirements(path, **kwargs)
+        if _is_ndjson(path):
+            return self.import_analysis(path, **kwargs)
+        with _open_text(path) as f:
+            document = json.load(f)
+        if 'matches' in document:
+            return self.import_comparison(path, document=document, **kwargs)
+        return self.import_analysis(path, document=document, **kwargs)
+
+    def import_analysis(self, path: str, repo: Optional[str] = None, commit: Optional[str] = None,
+                        document: Optional[Dict] = None) -> int:
+        """Import a github_analysis (JSON or NDJSON) or gemini_ast output as a code analysis run.
+
+        document is the already parsed content of a JSON path, saving a second parse.
+        """
+        content_sha = file_sha256(path)
+        with self._transaction() as conn:
+            run_id = self._existing_run(conn, content_sha)
+            if run_id is not None:
+                return run_id
+            if _is_ndjson(path):
+                records = _ndjson_records(path)
+                header = next(records)
+                run_id = self._insert_run(conn, 'code_analysis', path, content_sha, repo or header.get('repo_url'),
+                                          commit or header.get('commit'), header.get('started_at'))
+                self._insert_functions(conn, run_id, (record for record in records
+                                                      if record.get('record') == 'function'))
+                # Requirements follow all functions in the stream, so the file is read a second time
+                footer = {}
+                requirements = []
+                for record in _ndjson_records(path):
+                    if record.get('record') == 'requirement':
+                        requirements.append(record)
+                    elif record.get('record') == 'footer':
+                        footer = {key: value for key, value in record.items() if key != 'record'}
+                self._insert_generated_requirements(conn, run_id, requirements)
+                conn.execute("UPDATE runs SET summary = ? WHERE id = ?", (json.dumps(footer), run_id))
+            else:
+                result = document
+                if result is None:
+                    with _open_text(path) as f:
+                        result = json.load(f)
+                summary = {key: value for key, value in result.items()
+                           if key not in ('functions', 'functional_requirements', 'results')}
+                if 'results' in result:
+                    # gemini_ast: one result per file with the function names and the model's analysis
+                    run_id = self._insert_run(conn, 'code_analysis', path, content_sha,
+                                              repo or result.get('source'), commit,
+                                              _timestamp(result.get('timestamp')), summary)
+                    self._insert_file_results(conn, run_id, result['results'])
+                else:
+                    run_id = self._insert_run(conn, 'code_analysis', path, content_sha,
+                                              repo or result.get('repo_url'), commit or result.get('commit'),
+                                              result.get('start_time'), summary)
+                    self._insert_functions(conn, run_id, result.get('functions') or [])
+                    self._insert_generated_requirements(conn, run_id, result.get('functional_requirements') or [])
+        logging.info(f"Imported {path} as run {run_id}")
+        return run_id
+
+    @staticmethod
+    def _file_id(conn: sqlite3.Connection, file_ids: Dict[str, int], run_id: int, path: str,
+                 language: Optional[str] = None, analysis: Optional[str] = None) -> int:
+        file_id = file_ids.get(path)
+        if file_id is None:
+            file_id = file_ids[path] = conn.execute(
+                "INSERT INTO files (run_id, path, name, language, analysis) VALUES (?, ?, ?, ?, ?)",
+                (run_id, path, os.path.basename(path), language, analysis)
+            ).lastrowid
+        return file_id
+
+    def _insert_functions(self, conn: sqlite3.Connection, run_id: int, functions: Iterable[Dict]):
+        file_ids: Dict[str, int] = {}
+        rows = []
+        for func in functions:
+            path = func.get('path') or func.get('filepath') or func.get('file') or ''
+            summary = next((str(func[key]) for key in SUMMARY_KEYS if func.get(key)), None)
+            extra = {key: value for key, value in func.items() if key not in RECORD_COLUMNS and key != 'record'}
+            rows.append((run_id, self._file_id(conn, file_ids, run_id, path, func.get('language')),
+                         func.get('name', ''), func.get('kind'), func.get('language'), func.get('start_line'),
+                         func.get('end_line'), func.get('complexity'), summary,
+                         json.dumps(extra) if extra else None))
+            if len(rows) >= INSERT_BATCH:
+                self._flush_functions(conn, rows)
+        self._flush_functions(conn, rows)
+
+    @staticmethod
+    def _flush_functions(conn: sqlite3.Connection, rows: List[tuple]):
+        conn.executemany("INSERT INTO functions (run_id, file_id, name, kind, language, start_line, end_line, "
+                         "complexity, summary, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        rows.clear()
+
+    def _insert_file_results(self, conn: sqlite3.Connection, run_id: int, results: List[Dict]):
+        file_ids: Dict[str, int] = {}
+        rows = []
+        for result in results:
+            if not isinstance(result, dict) or 'functions' not in result:
+                continue
+            file_id = self._file_id(conn, file_ids, run_id, result.get('filename', ''),
+                                    analysis=result.get('analysis'))
+            rows.extend((run_id, file_id, str(name), None, None, None, None, None, None, None)
+                        for name in result['functions'])
+        self._flush_functions(conn, rows)
+
+    @staticmethod
+    def _insert_generated_requirements(conn: sqlite3.Connection, run_id: int, requirements: Iterable[Dict]):
+        """github_analysis functional_requirements, linked to the function each one describes"""
+        rows = []
+        for requirement in requirements:
+            function = conn.execute(
+                "SELECT functions.id FROM functions JOIN files ON files.id = functions.file_id "
+                "WHERE functions.run_id = ? AND functions.name = ? AND files.name = ? LIMIT 1",
+                (run_id, requirement.get('function'), requirement.get('file'))
+            ).fetchone()
+            rows.append((run_id, None, requirement['requirement'], None, function['id'] if function else None))
+        conn.executemany("INSERT INTO requirements (run_id, req_key, text, priority, function_id) "
+                         "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def import_requirements(self, path: str, repo: Optional[str] = None, commit: Optional[str] = None) -> int:
+        """Import an extracted requirements CSV (Requirement ID, Requirement Text)"""
+        content_sha = file_sha256(path)
+        with self._transaction() as conn:
+            run_id = self._existing_run(conn, content_sha)
+            if run_id is not None:
+                return run_id
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.DictReader(f)
+                if not reader.fieldnames or 'Requirement Text' not in reader.fieldnames:
+                    raise ValueError(f"{path} has no 'Requirement Text' column")
+                rows = [(row.get('Requirement ID') or None, row['Requirement Text'].strip())
+                        for row in reader if (row.get('Requirement Text') or '').strip()]
+            run_id = self._insert_run(conn, 'requirements', path, content_sha, repo, commit,
+                                      os.path.getmtime(path), {'requirements': len(rows)})
+            conn.executemany("INSERT INTO requirements (run_id, req_key, text) VALUES (?, ?, ?)",
+                             [(run_id, key, text) for key, text in rows])
+        logging.info(f"Imported {len(rows)} requirements from {path} as run {run_id}")
+        return run_id
+
+    def import_comparison(self, path: str, code_run: Optional[int] = None, requirements_run: Optional[int] = None,
+                          repo: Optional[str] = None, commit: Optional[str] = None,
+                          document: Optional[Dict] = None) -> int:
+        """Import compare_requirements output; matches resolve against the given code and requirements runs.
+
+        document is the already parsed content of path, saving a second parse.
+        """
+        content_sha = file_sha256(path)
+        with self._transaction() as conn:
+            run_id = self._existing_run(conn, content_sha)
+            if run_id is not None:
+                return run_id
+            analysis = document
+            if analysis is None:
+                with _open_text(path) as f:
+                    analysis = json.load(f)
+            if code_run is not None and (repo is None or commit is None):
+                code = conn.execute("SELECT repo, commit_sha FROM runs WHERE id = ?", (code_run,)).fetchone()
+                if code is not None:
+                    repo, commit = repo or code['repo'], commit or code['commit_sha']
+            summary = dict(analysis.get('stats') or {}, model_used=analysis.get('model_used'))
+            run_id = self._insert_run(conn, 'comparison', path, content_sha, repo, commit,
+                                      os.path.getmtime(path), summary, code_run, requirements_run)
+
+            requirement_ids: Dict[str, int] = {}
+            if requirements_run is not None:
+                for row in conn.execute("SELECT id, text FROM requirements WHERE run_id = ?", (requirements_run,)):
+                    requirement_ids.setdefault(row['text'], row['id'])
+            functions: Dict[Tuple[str, str], int] = {}
+            if code_run is not None:
+                for row in conn.execute("SELECT functions.id, functions.name, files.name AS file_name FROM functions "
+                                        "JOIN files ON files.id = functions.file_id WHERE functions.run_id = ?",
+                                        (code_run,)):
+                    functions.setdefault((row['file_name'], row['name']), row['id'])
+
+            suggestions = {missing.get('requirement'): missing
+                           for missing in analysis.get('missing_requirements') or []}
+            rows = []
+            for match in analysis.get('matches') or []:
+                text = (match.get('requirement') or '').strip()
+                if not text:
+                    continue
+                missing = suggestions.get(match.get('requirement'), {})
+                requirement_id = requirement_ids.get(text)
+                if requirement_id is None:
+                    requirement_id = requirement_ids[text] = conn.execute(
+                        "INSERT INTO requirements (run_id, text, priority) VALUES (?, ?, ?)",
+                        (run_id, text, missing.get('priority'))
+                    ).lastrowid
+                implemented = 1 if match.get('implemented') else 0
+                locations = match.get('locations') or [None]
+                for location in locations:
+                    file_name, function_name = _split_location(location) if location else (None, None)
+                    rows.append((run_id, requirement_id, implemented, location, file_name, function_name,
+                                 functions.get((file_name, function_name)), missing.get('suggestion')))
+            conn.executemany("INSERT INTO matches (run_id, requirement_id, implemented, location, file_name, "
+                             "function_name, function_id, suggestion) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        logging.info(f"Imported {len(rows)} matches from {path} as run {run_id}")
+        return run_id
+
+    # Queries
+
+    def runs(self, repo: Optional[str] = None, commit: Optional[str] = None, kind: Optional[str] = None,
+             limit: int = 50) -> List[Dict]:
+        conditions, params = [], []
+        for column, value in (('repo', repo.rstrip('/') if repo else None), ('commit_sha', commit), ('kind', kind)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        runs = self._query(f"SELECT * FROM runs {where} ORDER BY id DESC LIMIT ?", (*params, limit))
+        for run in runs:
+            run['summary'] = json.loads(run['summary']) if run['summary'] else None
+        return runs
+
+    def _latest_run(self, kind: str, repo: Optional[str], commit: Optional[str]) -> Optional[int]:
+        runs = self.runs(repo, commit, kind, limit=1)
+        return runs[0]['id'] if runs else None
+
+    def find_functions(self, name: Optional[str] = None, language: Optional[str] = None, file: Optional[str] = None,
+                       repo: Optional[str] = None, commit: Optional[str] = None, run: Optional[int] = None,
+                       limit: int = 100) -> List[Dict]:
+        """Functions by exact name, language and/or file name; in the latest code run of repo/commit if given"""
+        if run is None and (repo or commit):
+            run = self._latest_run('code_analysis', repo, commit)
+            if run is None:
+                return []
+        conditions, params = [], []
+        for column, value in (('functions.run_id', run), ('functions.name', name),
+                              ('functions.language', language), ('files.name', file)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(
+            "SELECT functions.id, functions.run_id, functions.name, functions.kind, functions.language, "
+            "files.path, functions.start_line, functions.end_line, functions.complexity, functions.summary "
+            f"FROM functions JOIN files ON files.id = functions.file_id {where} ORDER BY functions.id LIMIT ?",
+            (*params, limit)
+        )
+
+    def functions_for_requirement(self, requirement: str, run: Optional[int] = None,
+                                  repo: Optional[str] = None) -> List[Dict]:
+        """Functions matched to a requirement (by ID or exact text).
+
+        They come from the given run, else the latest comparison run of repo, else
+        the latest comparison run that has the requirement.
+        """
+        if run is None and repo:
+            run = self._latest_run('comparison', repo, None)
+            if run is None:
+                return []
+        if run is None:
+            latest = self._query(
+                "SELECT MAX(matches.run_id) AS run_id FROM matches JOIN requirements "
+                "ON requirements.id = matches.requirement_id WHERE requirements.req_key = ? OR requirements.text = ?",
+                (requirement, requirement)
+            )
+            run = latest[0]['run_id'] if latest else None
+            if run is None:
+                return []
+        return self._query(
+            "SELECT requirements.req_key, requirements.text AS requirement, matches.location, matches.function_id, "
+            "COALESCE(functions.name, matches.function_name) AS name, COALESCE(files.path, matches.file_name) AS path, "
+            "functions.start_line, functions.end_line, functions.language, matches.run_id "
+            "FROM requirements JOIN matches ON matches.requirement_id = requirements.id "
+            "LEFT JOIN functions ON functions.id = matches.function_id "
+            "LEFT JOIN files ON files.id = functions.file_id "
+            "WHERE (requirements.req_key = ? OR requirements.text = ?) AND matches.run_id = ? "
+            "AND matches.location IS NOT NULL ORDER BY matches.id",
+            (requirement, requirement, run)
+        )
+
+    def coverage(self, repo: Optional[str] = None, commit: Optional[str] = None,
+                 run: Optional[int] = None) -> Optional[Dict]:
+        """Requirement coverage of a comparison run, by default the latest one for repo/commit"""
+        if run is None:
+            run = self._latest_run('comparison', repo, commit)
+            if run is None:
+                return None
+        row = self._query(
+            "SELECT COUNT(DISTINCT requirement_id) AS total, "
+            "COUNT(DISTINCT CASE WHEN implemented THEN requirement_id END) AS implemented, "
+            "COUNT(DISTINCT function_id) AS functions_matched FROM matches WHERE run_id = ?", (run,)
+        )[0]
+        total, implemented = row['total'], row['implemented']
+        return {
+            'run_id': run,
+            'total_requirements': total,
+            'implemented_requirements': implemented,
+            'missing_requirements': total - implemented,
+            'coverage_percentage': round(implemented / total * 100, 2) if total else 0.0,
+            'functions_matched': row['functions_matched']
+        }
+
+    def delete_run(self, run: int):
+        with self._transaction() as conn:
+            conn.execute("UPDATE runs SET code_run_id = NULL WHERE code_run_id = ?", (run,))
+            conn.execute("UPDATE runs SET requirements_run_id = NULL WHERE requirements_run_id = ?", (run,))
+            conn.execute("DELETE FROM runs WHERE id = ?", (run,))
+
+    def close(self):
+        self._conn.close()
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an ISO timestamp as written by gemini_ast"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()]
+    )
+
+    parser = argparse.ArgumentParser(description="Indexed store of analysis, requirement and comparison results")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    importing = subparsers.add_parser('import', help='Import an analysis JSON/NDJSON, requirements CSV or comparison')
+    importing.add_argument('path')
+    importing.add_argument('--repo')
+    importing.add_argument('--commit')
+    importing.add_argument('--code-run', type=int, help='Code analysis run the comparison was made against')
+    importing.add_argument('--requirements-run', type=int, help='Requirements run the comparison was made from')
+    importing.add_argument('--code-file', help='Code analysis the comparison was made against, imported first')
+    importing.add_argument('--requirements-file', help='Requirements CSV the comparison was made from, imported first')
+
+    runs = subparsers.add_parser('runs', help='Imported runs, newest first')
+    runs.add_argument('--repo')
+    runs.add_argument('--commit')
+    runs.add_argument('--kind', choices=['code_analysis', 'requirements', 'comparison'])
+
+    functions = subparsers.add_parser('functions', help='Find functions by name, language or file')
+    functions.add_argument('--name')
+    functions.add_argument('--language')
+    functions.add_argument('--file')
+    functions.add_argument('--repo')
+    functions.add_argument('--commit')
+    functions.add_argument('--run', type=int)
+    functions.add_argument('--limit', type=int, default=100)
+
+    implementing = subparsers.add_parser('implementing', help='Functions that implement a requirement')
+    implementing.add_argument('requirement', help='Requirement ID or exact text')
+    implementing.add_argument('--run', type=int)
+    implementing.add_argument('--repo')
+
+    coverage = subparsers.add_parser('coverage', help='Requirement coverage for a repository commit')
+    coverage.add_argument('--repo')
+    coverage.add_argument('--commit')
+    coverage.add_argument('--run', type=int)
+
+    args = parser.parse_args()
+    store = ResultsStore(args.db)
+    try:
+        if args.command == 'import':
+            code_run, requirements_run = args.code_run, args.requirements_run
+            if args.code_file:
+                code_run = store.import_analysis(args.code_file, repo=args.repo, commit=args.commit)
+            if args.requirements_file:
+                requirements_run = store.import_requirements(args.requirements_file, repo=args.repo,
+                                                             commit=args.commit)
+            if code_run is not None or requirements_run is not None:
+                run_id = store.import_comparison(args.path, code_run, requirements_run, args.repo, args.commit)
+            else:
+                run_id = store.import_file(args.path, repo=args.repo, commit=args.commit)
+            result = {'run_id': run_id}
+        elif args.command == 'runs':
+            result = store.runs(args.repo, args.commit, args.kind)
+        elif args.command == 'functions':
+            result = store.find_functions(args.name, args.language, args.file, args.repo, args.commit, args.run,
+                                          args.limit)
+        elif args.command == 'implementing':
+            result = store.functions_for_requirement(args.requirement, args.run, args.repo)
+        else:
+            result = store.coverage(args.repo, args.commit, args.run)
+        print(json.dumps(result, indent=2))
+        exit(0 if result is not None else 1)
+    except Exception as e:
+        logging.error(f"Fatal error: {e}")
+        exit(1)
+    finally:
+        store.close()
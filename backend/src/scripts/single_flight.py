@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def content_digest(*parts: str) -> str:
+    """Stable digest of request content, used as the coalescing key"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8', errors='replace'))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical calls from worker threads within one run.
+
+    The first caller for a key runs the function; concurrent callers wait for its
+    result instead of repeating the work, and later callers reuse the stored
+    result. Failures are shared with the waiting callers but not remembered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executed = 0
+        self.saved = 0
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.saved += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._calls.pop(key, None)
+            raise
+        finally:
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "saved": self.saved}
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight for coroutines on one event loop.
+
+    keep, when given, decides whether a result is remembered for later callers;
+    results it rejects are treated like failures and only shared with the callers
+    already waiting. A cancelled caller does not cancel a call others still wait
+    for, but the call is cancelled once its last waiter is.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.executed = 0
+        self.saved = 0
+
+    async def _wait(self, future: asyncio.Future) -> Any:
+        if future.done():
+            return future.result()
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            # Shield so one cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self._waiters[future] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+
+    async def do(self, key: str, fn: Callable[..., Awaitable], *args,
+                 keep: Optional[Callable[[Any], bool]] = None, **kwargs) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            self.saved += 1
+            return await self._wait(future)
+
+        self.executed += 1
+        future = self._calls[key] = asyncio.ensure_future(fn(*args, **kwargs))
+
+        def forget_failure(done: asyncio.Future):
+            failed = done.cancelled() or done.exception() is not None
+            if (failed or (keep is not None and not keep(done.result()))) and self._calls.get(key) is done:
+                del self._calls[key]
+
+        future.add_done_callback(forget_failure)
+        return await self._wait(future)
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "saved": self.saved}
@@ -0,0 +1,113 @@
+import bisect
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+_NEWLINE_RE = re.compile("\n")
+CACHE_MAX_BYTES = 32 * 1024 * 1024  # Size on disk of the files load_source keeps decoded
+
+
+class SourceFile:
+    """A decoded source file with a newline offset index.
+
+    The file is read and decoded once; offset-to-line lookups are a bisect over
+    the precomputed line starts, and bodies are sliced straight out of the
+    shared text instead of re-reading or re-splitting the file per function.
+    """
+
+    __slots__ = ('path', 'text', '_line_starts')
+
+    def __init__(self, text: str, path: str = ""):
+        self.path = path
+        self.text = text
+        self._line_starts: Optional[List[int]] = None
+
+    @classmethod
+    def read(cls, path: str) -> 'SourceFile':
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls(f.read(), path)
+
+    @property
+    def line_starts(self) -> List[int]:
+        if self._line_starts is None:
+            self._line_starts = [0] + [m.end() for m in _NEWLINE_RE.finditer(self.text)]
+        return self._line_starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """1-based line containing the character at offset"""
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def end_line_of(self, end: int, start: int = 0) -> int:
+        """1-based line of the last character of the half-open span [start, end)"""
+        return self.line_of(max(end - 1, start))
+
+    def offset_of(self, line: int) -> int:
+        """Offset of the first character of a 1-based line (len(text) past the end)"""
+        if line < 1:
+            return 0
+        if line > len(self.line_starts):
+            return len(self.text)
+        return self.line_starts[line - 1]
+
+    def slice(self, start: int, end: int) -> str:
+        return self.text[start:end]
+
+    def lines(self, start_line: int, end_line: int) -> str:
+        """Text of lines start_line..end_line inclusive, with their line endings"""
+        return self.text[self.offset_of(start_line):self.offset_of(end_line + 1)]
+
+
+class _SourceCache:
+    """Least recently used SourceFiles, one per path, bounded by the total size of their files"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Tuple[Tuple[int, int], SourceFile]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> SourceFile:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                return entry[1]
+        source = SourceFile.read(path)
+        if stat.st_size > self.max_bytes:
+            return source
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= previous[0][1]
+            self._entries[path] = (signature, source)
+            self._bytes += stat.st_size
+            while self._bytes > self.max_bytes:
+                (evicted_signature, _) = self._entries.popitem(last=False)[1]
+                self._bytes -= evicted_signature[1]
+        return source
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache = _SourceCache(CACHE_MAX_BYTES)
+
+
+def load_source(path: str) -> SourceFile:
+    """SourceFile for path, shared between callers until the file changes on disk"""
+    return _cache.get(path)
+
+
+def clear_cache():
+    """Drop every SourceFile kept by load_source"""
+    _cache.clear()
@@ -0,0 +1,162 @@
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from prompt_budget import estimate_tokens
+
+CHUNK_TOKEN_BUDGET = 6000  # Estimated tokens of SRS text per validation chunk
+MAX_PARALLEL_CHUNKS = 4
+CHUNK_RETRIES = 3
+REQUIREMENT_COLUMN = "Requirement Text"
+
+# Numbered headings such as "3.2 User Management" or "4. Functional Requirements"
+_HEADING_RE = re.compile(r"^\s*(\d+(?:\.\d+)*)\.?\s+[A-Z][^\n]{0,80}$", re.MULTILINE)
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*$", re.MULTILINE)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+def _split_oversized(section: str, budget: int) -> List[str]:
+    """Split a section that exceeds the budget on paragraph, then line, boundaries"""
+    parts, current = [], []
+    pieces = section.split("\n\n") if "\n\n" in section else section.split("\n")
+    for piece in pieces:
+        candidate = "\n".join(current + [piece])
+        if current and estimate_tokens(candidate) > budget:
+            parts.append("\n".join(current))
+            current = [piece]
+        else:
+            current.append(piece)
+    if current:
+        parts.append("\n".join(current))
+    return parts
+
+
+def split_into_sections(text: str, budget: int = CHUNK_TOKEN_BUDGET) -> List[str]:
+    """Split SRS text at numbered headings, packing small sections together up to the budget"""
+    starts = [m.start() for m in _HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = [text[a:b] for a, b in zip(starts, starts[1:] + [len(text)]) if text[a:b].strip()]
+
+    chunks, current = [], ""
+    for section in sections:
+        if estimate_tokens(section) > budget:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_oversized(section, budget))
+        elif current and estimate_tokens(current) + estimate_tokens(section) > budget:
+            chunks.append(current)
+            current = section
+        else:
+            current += section
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def assign_requirements(chunks: List[str], requirements: pd.DataFrame) -> List[pd.DataFrame]:
+    """Pair each extracted requirement with the chunk it was extracted from"""
+    normalized_chunks = [_normalize(chunk) for chunk in chunks]
+    chunk_words = [set(chunk.split()) for chunk in normalized_chunks]
+    owners = []
+    for text in requirements[REQUIREMENT_COLUMN].astype(str):
+        needle = _normalize(text)
+        owner = next((i for i, chunk in enumerate(normalized_chunks) if needle in chunk), None)
+        if owner is None:
+            # Text extraction may reflow lines; fall back to the best word overlap
+            words = set(needle.split())
+            owner = max(range(len(chunks)), key=lambda i: len(words & chunk_words[i]))
+        owners.append(owner)
+    owners = pd.Series(owners, index=requirements.index)
+    return [requirements[owners == i] for i in range(len(chunks))]
+
+
+def parse_csv_fragment(text: str) -> pd.DataFrame:
+    """Parse a CSV reply from the model, tolerating Markdown code fences"""
+    return pd.read_csv(StringIO(_FENCE_RE.sub("", text).strip()))
+
+
+def _align_fallback(rows: pd.DataFrame, columns: List[str], fallback_values: Dict[str, str]) -> pd.DataFrame:
+    """Locally extracted rows in the columns of the model's fragments, so the merge has no NaN gaps"""
+    aligned = pd.DataFrame(index=rows.index)
+    for column in columns:
+        if column in rows.columns:
+            aligned[column] = rows[column]
+        else:
+            aligned[column] = fallback_values.get(column, "")
+    return aligned
+
+
+def merge_csv_fragments(fragments: List[pd.DataFrame], fallbacks: Optional[List[pd.DataFrame]] = None,
+                        fallback_values: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Concatenate per-chunk results and drop duplicate requirements.
+
+    fallbacks are locally extracted rows kept for chunks the model failed on;
+    they are mapped to the columns of the model's fragments, filling columns
+    they lack from fallback_values.
+    """
+    frames = [f for f in fragments if f is not None and not f.empty]
+    fallbacks = [f for f in fallbacks or [] if f is not None and not f.empty]
+    if frames and fallbacks:
+        columns = list(frames[0].columns)
+        frames += [_align_fallback(f, columns, fallback_values or {}) for f in fallbacks]
+    else:
+        frames += fallbacks
+    if not frames:
+        return pd.DataFrame(columns=[REQUIREMENT_COLUMN])
+    merged = pd.concat(frames, ignore_index=True)
+    key_column = REQUIREMENT_COLUMN if REQUIREMENT_COLUMN in merged.columns else merged.columns[0]
+    keys = merged[key_column].astype(str).map(_normalize)
+    return merged[~keys.duplicated() & (keys != "") & (keys != "nan")].reset_index(drop=True)
+
+
+def _validate_with_retries(index: int, total: int, chunk: str, reqs: pd.DataFrame,
+                           validate: Callable[[str, str], str]) -> Tuple[pd.DataFrame, bool]:
+    """(rows, validated): the model's fragment, or the extracted rows if every attempt failed"""
+    for attempt in range(CHUNK_RETRIES):
+        try:
+            fragment = parse_csv_fragment(validate(chunk, reqs.to_csv(index=False)))
+            logging.info(f"Validated SRS chunk {index + 1}/{total}: {len(fragment)} requirements")
+            return fragment, True
+        except Exception as e:
+            logging.warning(f"SRS chunk {index + 1}/{total} failed (attempt {attempt + 1}): {e}")
+            if attempt + 1 < CHUNK_RETRIES:
+                time.sleep(2 ** attempt)
+    # Keep what we extracted locally rather than losing the chunk
+    logging.error(f"SRS chunk {index + 1}/{total} failed after {CHUNK_RETRIES} attempts, keeping extracted rows")
+    return reqs, False
+
+
+def validate_in_chunks(srs_text: str, requirements: pd.DataFrame, validate: Callable[[str, str], str],
+                       budget: int = CHUNK_TOKEN_BUDGET, max_workers: int = MAX_PARALLEL_CHUNKS,
+                       fallback_values: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Validate an SRS section by section in parallel and merge the returned CSV fragments.
+
+    validate(chunk_text, chunk_requirements_csv) must return the model's CSV reply.
+    Each chunk is retried on its own, so one failure never redoes the whole document.
+    The extracted rows of failed chunks take the model's columns, with values
+    from fallback_values for the columns they lack.
+    """
+    chunks = split_into_sections(srs_text, budget)
+    if not chunks:
+        logging.warning("SRS text is empty, nothing to validate")
+        return requirements
+    per_chunk = assign_requirements(chunks, requirements)
+    logging.info(f"Validating SRS in {len(chunks)} chunks with up to {max_workers} in parallel")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = list(executor.map(
+            lambda args: _validate_with_retries(args[0], len(chunks), args[1], args[2], validate),
+            [(i, chunk, reqs) for i, (chunk, reqs) in enumerate(zip(chunks, per_chunk))]
+        ))
+    return merge_csv_fragments([rows for rows, validated in outcomes if validated],
+                               [rows for rows, validated in outcomes if not validated], fallback_values)
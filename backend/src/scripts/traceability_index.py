@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from offline_matcher import (EMBEDDING_DIM, MATCH_THRESHOLD, TOP_K, HashedNgramEmbedder, SparseRows,
+                             coverage_report, describe_functions, similarities, top_k_similarities)
+from single_flight import content_digest
+
+INDEX_VERSION = 2  # Bump when the stored layout or the matcher's features change
+CANDIDATES = TOP_K + 5  # Best functions kept per requirement, so removed functions rarely force a rescan
+IDF_REBUILD_FRACTION = 0.25  # Rebuild with fresh IDF weights once this share of documents changed since the build
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS requirements (
+    fp TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    fp TEXT PRIMARY KEY,
+    location TEXT NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    req_fp TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    func_fp TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (req_fp, rank)
+);
+CREATE INDEX IF NOT EXISTS candidates_function ON candidates (func_fp);
+"""
+
+
+def requirement_fingerprint(text: str) -> str:
+    return content_digest("requirement", text)
+
+
+def function_fingerprint(location: str, text: str) -> str:
+    return content_digest("function", location, text)
+
+
+class TraceabilityIndex:
+    """Persistent requirement-to-function index that the offline matcher updates incrementally.
+
+    Requirements and functions are keyed by fingerprints of their text (and, for
+    functions, their location), so an edited requirement or function is a
+    removal plus an addition. Each requirement keeps its best CANDIDATES
+    functions with their scores. An update embeds only the added documents and
+    then does three things:
+    - it scores added functions against the stored requirement vectors and
+      merges them into the candidate lists they beat;
+    - it scores added requirements against all function vectors;
+    - it rescans a requirement only when removals leave it with fewer than
+      top_k known-best candidates.
+
+    IDF weights are frozen when the index is built, so stored vectors and scores
+    stay comparable. Once IDF_REBUILD_FRACTION of the documents have changed, or
+    the matcher settings differ, the index is rebuilt from scratch. A fresh build
+    gives the same report as match_requirements.
+    """
+
+    def __init__(self, path: str, threshold: float = MATCH_THRESHOLD, top_k: int = TOP_K,
+                 dim: int = EMBEDDING_DIM, candidates: int = CANDIDATES):
+        self.path = path
+        self.threshold = threshold
+        self.top_k = top_k
+        self.dim = dim
+        self.candidates = max(candidates, top_k)
+        self.embedder = HashedNgramEmbedder(dim=dim)
+        self.last_update: Dict = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _meta(self) -> Dict:
+        return {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM meta")}
+
+    def _set_meta(self, **values):
+        self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                               [(key, json.dumps(value)) for key, value in values.items()])
+
+    def _settings(self) -> Dict:
+        return {'version': INDEX_VERSION, 'dim': self.dim, 'candidates': self.candidates}
+
+    def _vectors(self, table: str, fps: Optional[List[str]] = None) -> Tuple[List[str], SparseRows]:
+        """Fingerprints and stacked vectors of a table, all rows or the given ones"""
+        if fps is None:
+            rows = self._conn.execute(f"SELECT fp, vector FROM {table}").fetchall()
+        else:
+            rows = []
+            for start in range(0, len(fps), 500):
+                chunk = fps[start:start + 500]
+                rows.extend(self._conn.execute(f"SELECT fp, vector FROM {table} WHERE fp IN "
+                                               f"({','.join('?' * len(chunk))})", chunk))
+        return [fp for fp, _ in rows], SparseRows.from_bytes([vector for _, vector in rows], self.dim)
+
+    def _write_candidates(self, req_fps: Iterable[str], lists: Dict[str, List[Tuple[str, float]]]):
+        req_fps = list(req_fps)
+        self._conn.executemany("DELETE FROM candidates WHERE req_fp = ?", [(fp,) for fp in req_fps])
+        self._conn.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?)",
+                               [(fp, rank, func_fp, score) for fp in req_fps
+                                for rank, (func_fp, score) in enumerate(lists[fp])])
+
+    def _scan(self, req_fps: List[str], req_vectors: SparseRows, func_fps: List[str],
+              func_vectors: SparseRows) -> Dict[str, List[Tuple[str, float]]]:
+        """Best candidates of requirements against every given function"""
+        scores, indices = top_k_similarities(req_vectors, func_vectors, k=self.candidates)
+        return {fp: [(func_fps[j], float(score)) for score, j in zip(scores[i], indices[i])]
+                for i, fp in enumerate(req_fps)}
+
+    def _rebuild(self, requirements: Dict[str, str], functions: Dict[str, Dict]):
+        req_fps, func_fps = list(requirements), list(functions)
+        req_counts = self.embedder.transform([requirements[fp] for fp in req_fps])
+        func_counts = self.embedder.transform([functions[fp]['text'] for fp in func_fps])
+        idf = self.embedder.idf(req_counts, func_counts)
+        req_vectors = req_counts.scaled(idf).normalized()
+        func_vectors = func_counts.scaled(idf).normalized()
+
+        for table in ('requirements', 'functions', 'candidates', 'meta'):
+            self._conn.execute(f"DELETE FROM {table}")
+        self._conn.executemany("INSERT INTO requirements VALUES (?, ?, ?)",
+                               [(fp, requirements[fp], req_vectors.row_bytes(i))
+                                for i, fp in enumerate(req_fps)])
+        self._conn.executemany("INSERT INTO functions VALUES (?, ?, ?)",
+                               [(fp, functions[fp]['location'], func_vectors.row_bytes(i))
+                                for i, fp in enumerate(func_fps)])
+        self._write_candidates(req_fps, self._scan(req_fps, req_vectors, func_fps, func_vectors))
+        self._set_meta(idf=idf.tolist(), built_documents=len(req_fps) + len(func_fps), changed_documents=0,
+                       **self._settings())
+
+    def update(self, requirements: List[str], source_code: Optional[Dict] = None,
+               functions: Optional[List[Dict]] = None) -> Dict:
+        """Bring the index up to date and return the report in the compare_requirements output schema.
+
+        What the update re-evaluated is kept in last_update.
+        """
+        start = time.time()
+        functions = functions if functions is not None else describe_functions(source_code or {})
+        current_functions: Dict[str, Dict] = {}
+        for func in functions:
+            current_functions.setdefault(function_fingerprint(func['location'], func['text']), func)
+        current_requirements = {requirement_fingerprint(text): text for text in requirements}
+
+        with self._conn:
+            meta = self._meta()
+            stored_reqs = {fp for fp, in self._conn.execute("SELECT fp FROM requirements")}
+            stored_funcs = {fp for fp, in self._conn.execute("SELECT fp FROM functions")}
+            added_reqs = [fp for fp in current_requirements if fp not in stored_reqs]
+            removed_reqs = stored_reqs - current_requirements.keys()
+            added_funcs = [fp for fp in current_functions if fp not in stored_funcs]
+            removed_funcs = stored_funcs - current_functions.keys()
+            changed = len(added_reqs) + len(removed_reqs) + len(added_funcs) + len(removed_funcs)
+
+            stale = any(meta.get(key) != value for key, value in self._settings().items())
+            drift = meta.get('changed_documents', 0) + changed
+            if stale or drift > IDF_REBUILD_FRACTION * max(meta.get('built_documents', 0), 1):
+                self._rebuild(current_requirements, current_functions)
+                mode, rescanned = 'rebuild', len(current_requirements)
+            else:
+                mode = 'incremental'
+                rescanned = self._apply(meta, current_requirements, current_functions, added_reqs, removed_reqs,
+                                        added_funcs, removed_funcs)
+                self._set_meta(changed_documents=drift)
+
+            ranked = self._ranked(list(current_requirements))
+        report = coverage_report(requirements, [ranked[requirement_fingerprint(text)][:self.top_k]
+                                                for text in requirements], self.threshold)
+        self.last_update = {
+            'mode': mode,
+            'requirements_added': len(added_reqs),
+            'requirements_removed': len(removed_reqs),
+            'functions_added': len(added_funcs),
+            'functions_removed': len(removed_funcs),
+            'requirements_rescanned': rescanned,
+            'seconds': round(time.time() - start, 4)
+        }
+        logging.info(f"Traceability index {mode} update: {self.last_update}")
+        return report
+
+    def _apply(self, meta: Dict, requirements: Dict[str, str], functions: Dict[str, Dict], added_reqs: List[str],
+               removed_reqs: Set[str], added_funcs: List[str], removed_funcs: Set[str]) -> int:
+        """Incremental update; returns the number of requirements scanned against every function"""
+        idf = np.asarray(meta['idf'], dtype=np.float32)
+
+        # Removed documents; requirements that lose candidates may need a rescan
+        self._conn.executemany("DELETE FROM requirements WHERE fp = ?", [(fp,) for fp in removed_reqs])
+        self._conn.executemany("DELETE FROM candidates WHERE req_fp = ?", [(fp,) for fp in removed_reqs])
+        affected = set()
+        for fp in removed_funcs:
+            affected.update(req_fp for req_fp, in self._conn.execute(
+                "SELECT req_fp FROM candidates WHERE func_fp = ?", (fp,)))
+        self._conn.executemany("DELETE FROM functions WHERE fp = ?", [(fp,) for fp in removed_funcs])
+        self._conn.executemany("DELETE FROM candidates WHERE func_fp = ?", [(fp,) for fp in removed_funcs])
+
+        # Added documents, embedded with the frozen IDF weights
+        if added_reqs:
+            vectors = self.embedder.embed([requirements[fp] for fp in added_reqs], idf)
+            self._conn.executemany("INSERT INTO requirements VALUES (?, ?, ?)",
+                                   [(fp, requirements[fp], vectors.row_bytes(i)) for i, fp in enumerate(added_reqs)])
+        if added_funcs:
+            vectors = self.embedder.embed([functions[fp]['text'] for fp in added_funcs], idf)
+            self._conn.executemany("INSERT INTO functions VALUES (?, ?, ?)",
+                                   [(fp, functions[fp]['location'], vectors.row_bytes(i))
+                                    for i, fp in enumerate(added_funcs)])
+
+        # Existing requirements: merge added functions that beat their lists, rescan the ones left too short
+        new_reqs = set(added_reqs)
+        existing = [fp for fp in requirements if fp not in new_reqs]
+        lists = self._candidate_lists(existing) if (added_funcs or affected) else {}
+        n_before = len(functions) - len(added_funcs)
+        rescan = {fp for fp in affected if fp in lists and len(lists[fp]) < min(self.top_k, n_before)}
+        touched = set(affected) & set(lists)
+        if added_funcs and existing:
+            req_fps, req_vectors = self._vectors('requirements', existing)
+            func_fps, func_vectors = self._vectors('functions', added_funcs)
+            scores = similarities(req_vectors, func_vectors)
+            for i, fp in enumerate(req_fps):
+                if fp in rescan:
+                    continue
+                current = lists[fp]
+                # A short list is only known to be the overall best when it already holds every function
+                complete = len(current) >= n_before
+                floor = current[-1][1] if current and not complete else -np.inf
+                better = [(func_fps[j], float(scores[i, j])) for j in np.nonzero(scores[i] > floor)[0]]
+                if better:
+                    lists[fp] = sorted(current + better, key=lambda item: -item[1])[:self.candidates]
+                    touched.add(fp)
+
+        full_scan = list(added_reqs) + sorted(rescan)
+        if full_scan:
+            func_fps, func_vectors = self._vectors('functions')
+            req_fps, req_vectors = self._vectors('requirements', full_scan)
+            lists.update(self._scan(req_fps, req_vectors, func_fps, func_vectors))
+            touched.update(req_fps)
+        if touched:
+            self._write_candidates(touched, lists)
+        return len(full_scan)
+
+    def _candidate_lists(self, req_fps: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        lists: Dict[str, List[Tuple[str, float]]] = {fp: [] for fp in req_fps}
+        for start in range(0, len(req_fps), 500):
+            chunk = req_fps[start:start + 500]
+            for req_fp, func_fp, score in self._conn.execute(
+                    f"SELECT req_fp, func_fp, score FROM candidates WHERE req_fp IN ({','.join('?' * len(chunk))}) "
+                    "ORDER BY req_fp, rank", chunk):
+                lists[req_fp].append((func_fp, score))
+        return lists
+
+    def _ranked(self, req_fps: List[str]) -> Dict[str, List[Tuple[float, str]]]:
+        """(score, location) candidates of each requirement, best first"""
+        lists = self._candidate_lists(req_fps)
+        func_fps = list({func_fp for candidates in lists.values() for func_fp, _ in candidates})
+        locations = {}
+        for start in range(0, len(func_fps), 500):
+            chunk = func_fps[start:start + 500]
+            locations.update(self._conn.execute(
+                f"SELECT fp, location FROM functions WHERE fp IN ({','.join('?' * len(chunk))})", chunk))
+        return {fp: [(score, locations[func_fp]) for func_fp, score in candidates] for fp, candidates in lists.items()}
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,142 @@
+import logging
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from file_discovery import FileDiscovery, SNIFF_BYTES
+
+MAX_ENTRIES = 50000  # Central directory entries accepted in one archive
+MAX_MEMBER_BYTES = 8 * 1024 ** 2  # Uncompressed size of one source file; larger ones are skipped
+MAX_TOTAL_BYTES = 512 * 1024 ** 2  # Uncompressed bytes read from one upload
+MAX_COMPRESSION_RATIO = 100  # Uncompressed/compressed size above which a member is treated as a bomb
+RATIO_MIN_BYTES = 1024 ** 2  # The ratio is only enforced past this size, small text compresses well
+MAX_IGNORE_FILE_BYTES = 1024 ** 2  # .gitignore and project ignore files read during selection
+READ_CHUNK = 64 * 1024
+
+
+class UploadLimitError(Exception):
+    """An upload exceeded the entry count, size or compression ratio limits"""
+
+
+def read_limited(stream: IO[bytes], limit: int) -> Tuple[bytes, bool]:
+    """Up to limit bytes of stream, and whether it had more"""
+    chunks, size = [], 0
+    while size <= limit:
+        chunk = stream.read(min(READ_CHUNK, limit + 1 - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    data = b''.join(chunks)
+    return data[:limit], size > limit
+
+
+def read_single_file(path: Path, max_bytes: int = MAX_MEMBER_BYTES) -> Tuple[str, bytes]:
+    """(name, content) of an uploaded source file, read once into memory"""
+    with open(path, 'rb') as f:
+        data, truncated = read_limited(f, max_bytes)
+    if truncated:
+        raise UploadLimitError(f"{path.name} is larger than {max_bytes} bytes")
+    return path.name, data
+
+
+class ZipSources:
+    """Relevant source files of a ZIP archive, decompressed in memory one at a time.
+
+    Members are selected from the central directory with FileDiscovery (excluded
+    folders, ignore files, binary, minified and generated files), reading only
+    the head of each candidate. Iterating yields (member name, content) pairs and
+    decompresses a member only when it is reached, so nothing is written to disk
+    and at most one member is held per consumer.
+
+    The central directory is checked before anything is decompressed: too many
+    entries rejects the archive, and members declaring more than max_member_bytes
+    are skipped. Declared sizes are not trusted while reading: a member that
+    inflates past its declared size, past max_compression_ratio, or past the
+    total byte budget raises UploadLimitError.
+    """
+
+    def __init__(self, zip_path: Path, extensions: Iterable[str], excluded_dirs: Iterable[str] = (),
+                 skip_generated: bool = True, max_entries: int = MAX_ENTRIES,
+                 max_member_bytes: int = MAX_MEMBER_BYTES, max_total_bytes: int = MAX_TOTAL_BYTES,
+                 max_compression_ratio: int = MAX_COMPRESSION_RATIO):
+        self.name = Path(zip_path).name
+        self.max_member_bytes = max_member_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_compression_ratio = max_compression_ratio
+        self.bytes_read = 0
+        self._zip = zipfile.ZipFile(zip_path, 'r')
+        try:
+            infos = self._zip.infolist()
+            if len(infos) > max_entries:
+                raise UploadLimitError(f"{self.name} has {len(infos)} entries, the limit is {max_entries}")
+            self._members: Dict[str, zipfile.ZipInfo] = {info.filename: info for info in infos if not info.is_dir()}
+
+            candidates = []
+            too_large = 0
+            for name, info in self._members.items():
+                if info.file_size > max_member_bytes:
+                    too_large += 1
+                else:
+                    candidates.append(name)
+            discovery = FileDiscovery(self.name, extensions, excluded_dirs, use_git=False,
+                                      skip_generated=skip_generated, read_text=self._read_text)
+            self.names: List[str] = discovery.select(candidates, head_reader=self._read_head)
+            self.skipped = dict(discovery.stats['skipped'], too_large=too_large)
+        except Exception:
+            self._zip.close()
+            raise
+        logging.info(f"Selected {len(self.names)} of {len(self._members)} ZIP members, skipped {self.skipped}")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _read_text(self, name: str) -> Optional[str]:
+        info = self._members.get(name)
+        if info is None or info.file_size > MAX_IGNORE_FILE_BYTES:
+            return None
+        return self.read(name, MAX_IGNORE_FILE_BYTES).decode('utf-8', errors='replace')
+
+    def _read_head(self, name: str) -> bytes:
+        try:
+            with self._zip.open(self._members[name]) as member:
+                return member.read(SNIFF_BYTES)
+        except (RuntimeError, zipfile.BadZipFile, NotImplementedError) as e:
+            # Encrypted or unsupported compression; the empty head keeps it, read() reports it
+            logging.debug(f"Could not read the head of {name}: {e}")
+            return b''
+
+    def read(self, name: str, max_bytes: Optional[int] = None) -> bytes:
+        """Decompressed content of a member, counted against the total byte budget"""
+        info = self._members[name]
+        limit = min(info.file_size, self.max_member_bytes if max_bytes is None else max_bytes)
+        remaining = self.max_total_bytes - self.bytes_read
+        with self._zip.open(info) as member:
+            data, truncated = read_limited(member, min(limit, remaining))
+        self.bytes_read += len(data)
+        if truncated:
+            if limit > remaining:
+                raise UploadLimitError(f"{self.name} inflates past {self.max_total_bytes} bytes")
+            raise UploadLimitError(f"{name} inflates past its declared size of {info.file_size} bytes")
+        if len(data) > RATIO_MIN_BYTES and len(data) > self.max_compression_ratio * max(info.compress_size, 1):
+            raise UploadLimitError(f"{name} has a compression ratio above {self.max_compression_ratio}")
+        return data
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        for name in self.names:
+            try:
+                data = self.read(name)
+            except (RuntimeError, zipfile.BadZipFile, NotImplementedError) as e:
+                logging.warning(f"Skipping unreadable ZIP member {name}: {e}")
+                continue
+            yield name, data
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -7,6 +7,7 @@ const csv = require("csv-parser");
 
 const Repo = require("./models/repo"); // ✅ Import Repo model
 const codeRoutes = require("./routes/codeRoutes");
+const jobRoutes = require("./routes/jobRoutes");
 
 const app = express();
 const PORT = process.env.PORT || 5000;
@@ -32,6 +33,7 @@ app.use("/api/users", require("./routes/userRoutes"));
 app.use("/api/repos", require("./routes/repoRoutes"));
 app.use("/api/files", require("./routes/fileRoutes"));
 app.use("/api", codeRoutes);
+app.use("/api", jobRoutes);
 // ✅ Fetch Extracted Requirements for a Repository
 app.get("/api/repos/:repoId/extracted", async (req, res) => {
   const { repoId } = req.params;
@@ -0,0 +1,77 @@
+const fs = require("fs");
+const os = require("os");
+const path = require("path");
+const { execFile, spawn } = require("child_process");
+const { RESULTS_DB } = require("./resultsStore");
+
+const SCHEDULER_SCRIPT = path.resolve(__dirname, "../scripts/job_scheduler.py");
+const JOBS_DIR = process.env.SPECODE_JOBS_DIR || path.join(os.homedir(), ".cache", "specode", "jobs");
+const JOB_ID_PATTERN = /^[0-9a-f]{32}$/;
+
+/** Run a job_scheduler.py command and resolve with the JSON it prints. */
+function runScheduler(args) {
+  return new Promise((resolve, reject) => {
+    execFile("python", [SCHEDULER_SCRIPT, "--jobs-dir", JOBS_DIR, ...args], { windowsHide: true },
+      (err, stdout, stderr) => {
+        if (err) return reject(new Error(stderr || err.message));
+        try {
+          resolve(JSON.parse(stdout));
+        } catch (e) {
+          reject(new Error(`Invalid scheduler output: ${e.message}`));
+        }
+      });
+  });
+}
+
+/** Start a detached scheduler; it exits at once if one is already running for JOBS_DIR. */
+function startScheduler() {
+  const scheduler = spawn("python", [SCHEDULER_SCRIPT, "--jobs-dir", JOBS_DIR, "serve", "--results-db", RESULTS_DB], {
+    detached: true,
+    stdio: "ignore",
+    windowsHide: true,
+  });
+  scheduler.on("error", (err) => console.error("❌ Failed to start the job scheduler:", err));
+  scheduler.unref();
+}
+
+/**
+ * Queue an analysis, or join an identical queued, running or recently finished one.
+ *
+ * kind is "repository" (source is a repository URL) or "upload" (source is an
+ * uploaded file). Resolves with the job status; `coalesced` is true when an
+ * existing job was joined, in which case its `output` is where the result goes.
+ * A submitter (the user's ID) is counted once per job and may later withdraw.
+ */
+async function submitAnalysisJob({ kind, source, output, priority = "interactive", options = {}, submitter }) {
+  const args = ["submit", "--kind", kind, "--source", source, "--output", output, "--priority", priority];
+  if (submitter) args.push("--submitter", String(submitter));
+  for (const [key, value] of Object.entries(options)) {
+    if (value === true) args.push("--option", key);
+    else if (value !== false && value !== null && value !== undefined) args.push("--option", `${key}=${value}`);
+  }
+  const job = await runScheduler(args);
+  startScheduler();
+  return job;
+}
+
+/** Latest progress of a job as written by the scheduler, or null for an unknown job. */
+async function readJobProgress(jobId) {
+  if (!JOB_ID_PATTERN.test(jobId)) return null;
+  try {
+    return JSON.parse(await fs.promises.readFile(path.join(JOBS_DIR, "progress", `${jobId}.json`), "utf8"));
+  } catch (err) {
+    if (err.code === "ENOENT") return null;
+    throw err;
+  }
+}
+
+/**
+ * Withdraw a submitter from a job; it is cancelled once no other submitter is waiting for it.
+ * `withdrawn` is false in the resolved status when the submitter was not waiting for the job.
+ */
+async function cancelAnalysisJob(jobId, submitter) {
+  if (!JOB_ID_PATTERN.test(jobId)) return null;
+  return runScheduler(["cancel", jobId, "--submitter", String(submitter)]);
+}
+
+module.exports = { submitAnalysisJob, readJobProgress, cancelAnalysisJob, startScheduler };
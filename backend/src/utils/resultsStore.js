@@ -0,0 +1,56 @@
+const os = require("os");
+const path = require("path");
+const { execFile } = require("child_process");
+
+const RESULTS_SCRIPT = path.resolve(__dirname, "../scripts/results_store.py");
+const RESULTS_DB = process.env.SPECODE_RESULTS_DB || path.join(os.homedir(), ".cache", "specode", "results.sqlite3");
+const MAX_OUTPUT = 64 * 1024 * 1024;
+
+/** Run a results_store.py command and resolve with the JSON it prints (null when nothing was found). */
+function runResultsStore(args) {
+  return new Promise((resolve, reject) => {
+    execFile("python", [RESULTS_SCRIPT, "--db", RESULTS_DB, ...args], { windowsHide: true, maxBuffer: MAX_OUTPUT },
+      (err, stdout, stderr) => {
+        if (err && stdout.trim() !== "null") return reject(new Error(stderr || err.message));
+        try {
+          resolve(JSON.parse(stdout));
+        } catch (e) {
+          reject(new Error(`Invalid results store output: ${e.message}`));
+        }
+      });
+  });
+}
+
+function optionArgs(options) {
+  const args = [];
+  for (const [flag, value] of Object.entries(options)) {
+    if (value !== null && value !== undefined && value !== "") args.push(flag, String(value));
+  }
+  return args;
+}
+
+/**
+ * Import a compare_requirements output together with the code analysis and
+ * requirements CSV it was made from, so its matches link to their functions.
+ * Resolves with `{ run_id }` of the comparison run.
+ */
+function importComparison({ comparison, codeAnalysis, requirements, repo, commit }) {
+  return runResultsStore(["import", comparison, ...optionArgs({
+    "--code-file": codeAnalysis,
+    "--requirements-file": requirements,
+    "--repo": repo,
+    "--commit": commit,
+  })]);
+}
+
+/** Requirement coverage of the latest comparison of a repository (or of one run); null when there is none. */
+function getCoverage({ repo, commit, run }) {
+  return runResultsStore(["coverage", ...optionArgs({ "--repo": repo, "--commit": commit, "--run": run })]);
+}
+
+/** Functions that implement a requirement (ID or exact text), from one run or the latest comparison of a repository. */
+function getImplementingFunctions(requirement, { repo, run } = {}) {
+  return runResultsStore(["implementing", requirement, ...optionArgs({ "--repo": repo, "--run": run })]);
+}
+
+module.exports = { RESULTS_DB, importComparison, getCoverage, getImplementingFunctions };
@@ -0,0 +1,74 @@
+from cpp_scanner import find_cpp_functions
+
+
+def _spans(source):
+    return [(func['kind'], func['class'], func['name'], source[func['start']:func['end']])
+            for func in find_cpp_functions(source)]
+
+
+def test_preprocessor_keeps_the_first_branch():
+    source = (
+        "#include <vector>\n"
+        "#define BLOCK { {\n"
+        "#if defined(_WIN32)\n"
+        "int platform() {\n"
+        "#elif defined(__APPLE__)\n"
+        "int platform() { return 2;\n"
+        "#else\n"
+        "int platform() { return 1;\n"
+        "#endif\n"
+        "}\n"
+        "#if 0\n"
+        "void dead() {}\n"
+        "#else\n"
+        "void live() {}\n"
+        "#endif\n"
+    )
+    assert [(kind, name) for kind, _, name, _ in _spans(source)] == [('function', 'platform'), ('function', 'live')]
+
+
+def test_function_try_blocks_and_special_members():
+    source = (
+        "class Widget : public Base<Widget> {\n"
+        "public:\n"
+        "    Widget(int w) try : width_{w}, Base(w) { init(); } catch (const std::exception& e) { fail(); }\n"
+        "    ~Widget() { release(); }\n"
+        "    bool operator==(const Widget& o) const noexcept { return width_ == o.width_; }\n"
+        "    int operator()(int x) { return x; }\n"
+        "    auto size() const -> int { return width_; }\n"
+        "    virtual void draw() = 0;\n"
+        "private:\n"
+        "    int width_;\n"
+        "};\n"
+    )
+    lines = source.splitlines()
+    assert _spans(source) == [
+        ('constructor', 'Widget', 'Widget', lines[2].strip()),
+        ('destructor', 'Widget', '~Widget', lines[3].strip()),
+        ('method', 'Widget', 'operator==', lines[4].strip()),
+        ('method', 'Widget', 'operator()', lines[5].strip()),
+        ('method', 'Widget', 'size', lines[6].strip()),
+    ]
+
+
+def test_templates_literals_and_linkage_blocks():
+    source = (
+        "template <typename T, typename U = std::vector<std::pair<T, T>>>\n"
+        "T sum(const U& items) { T total{}; return total; }\n"
+        "void Widget::paint(const char* s = \"}{\") { auto f = [](int x) { return x; }; }\n"
+        "const char* raw = R\"x(} { )x\";\n"
+        "extern \"C\" { int c_api(void) { return 0; } }\n"
+    )
+    lines = source.splitlines()
+    assert _spans(source) == [
+        ('function', None, 'sum', "\n".join(lines[:2])),
+        ('method', 'Widget', 'paint', lines[2]),
+        ('function', None, 'c_api', "int c_api(void) { return 0; }"),
+    ]
+
+
+def test_truncated_sources_do_not_raise():
+    source = ("#if X\nstruct S { S() try {} catch (...) {} int operator[](int i) const; };\n#endif\n"
+              "int f() { return 0; }")
+    for end in range(len(source) + 1):
+        find_cpp_functions(source[:end])
@@ -0,0 +1,63 @@
+from dart_scanner import find_dart_functions
+
+
+def _names(source):
+    return [(func['kind'], func['class'], func['name']) for func in find_dart_functions(source)]
+
+
+def test_constructors_operators_and_accessors():
+    source = (
+        "class Point {\n"
+        "  final int x, y;\n"
+        "  Point(this.x, this.y) { assert(x >= 0); }\n"
+        "  Point.origin() : x = 0, y = 0 { log('origin'); }\n"
+        "  factory Point.parse(String s) => Point(int.parse(s), 0);\n"
+        "  Point operator +(Point o) => Point(x + o.x, y + o.y);\n"
+        "  bool operator ==(Object o) => o is Point && o.x == x;\n"
+        "  int get sum => x + y;\n"
+        "  set label(String v) { _label = v; }\n"
+        "}\n"
+    )
+    assert _names(source) == [
+        ('constructor', 'Point', 'Point'),
+        ('constructor', 'Point', 'Point.origin'),
+        ('constructor', 'Point', 'Point.parse'),
+        ('method', 'Point', 'operator +'),
+        ('method', 'Point', 'operator =='),
+        ('getter', 'Point', 'sum'),
+        ('setter', 'Point', 'label'),
+    ]
+
+
+def test_spans_cover_interpolated_strings():
+    source = "String greet(String name) => \"Hi ${name.isEmpty ? '}' : '{$name}'}\";\nvoid after() {}\n"
+    greet, after = find_dart_functions(source)
+    assert source[greet['start']:greet['end']] == source.splitlines()[0]
+    assert after['name'] == 'after'
+
+
+def test_type_members_and_nested_comments():
+    source = (
+        "abstract class Shape { double area(); String describe() => 'shape'; }\n"
+        "mixin Printable on Object { void printIt() { print(this); } }\n"
+        "extension NumX on num { num twice() => this * 2; }\n"
+        "enum Color { red, green; String label() => name; }\n"
+        "/* outer /* inner */ void hidden() {} */\n"
+        "int top(int a) { return a; }\n"
+    )
+    assert _names(source) == [
+        ('method', 'Shape', 'describe'),
+        ('method', 'Printable', 'printIt'),
+        ('method', 'NumX', 'twice'),
+        ('method', 'Color', 'label'),
+        ('function', None, 'top'),
+    ]
+
+
+def test_truncated_sources_do_not_raise():
+    assert _names("void f() {}\nabstract class") == [('function', None, 'f')]
+    assert _names("mixin") == []
+    assert _names("class A { int f() => 1") == []
+    source = "class A { A(); int f() => 1; String g() => 'x'; }"
+    for end in range(len(source) + 1):
+        find_dart_functions(source[:end])
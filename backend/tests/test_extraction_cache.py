@@ -0,0 +1,32 @@
+import sqlite3
+
+from extraction_cache import ExtractionCache
+
+
+def _last_used(path, blob):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT last_used FROM extractions WHERE blob = ?", (blob,)).fetchone()[0]
+
+
+def test_hits_are_written_in_batches_and_still_drive_eviction(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ExtractionCache(path)
+    try:
+        cache.put('old', 'python', 1, [{'name': 'a'}])
+        cache.put('new', 'python', 1, [{'name': 'b'}])
+        stored = _last_used(path, 'old')
+
+        assert cache.get('old', 'python', 1) == [{'name': 'a'}]
+        assert _last_used(path, 'old') == stored
+        cache.flush()
+        assert _last_used(path, 'old') > _last_used(path, 'new')
+
+        assert cache.get('new', 'python', 1) is not None
+        cache.get('old', 'python', 1)
+        # Eviction sees the unflushed hits: 'new' is now the least recently used
+        cache.max_bytes = cache.stats()['bytes'] - 1
+        assert cache.evict() == 1
+        assert cache.get('old', 'python', 1) is not None
+        assert cache.get('new', 'python', 1) is None
+    finally:
+        cache.close()
@@ -0,0 +1,17 @@
+import asyncio
+
+from hedging import HedgePolicy, hedged_call
+
+
+def test_losing_primary_is_recorded_as_a_lower_bound():
+    policy = HedgePolicy(min_samples=1, default_delay=0.02, burst=5)
+
+    async def call(model_name):
+        await asyncio.sleep(1.0 if model_name == 'primary' else 0.01)
+        return model_name
+
+    winner, result = asyncio.run(hedged_call(policy, 'primary', 'backup', call))
+    assert (winner, result) == ('backup', 'backup')
+    assert policy.hedge_wins == 1
+    # The cancelled primary ran for the hedge delay plus the backup's latency, and that sample now sets the delay
+    assert policy.hedge_delay('primary') > 0.02
@@ -0,0 +1,67 @@
+from java_scanner import find_java_members
+
+SOURCE = '''package a.b;
+
+public class Repo<K extends Comparable<K>, V> implements Store<Map<K, List<V>>> {
+    private final Map<K, List<Map<String, V>>> data = new HashMap<>();
+    static { init(); }
+    public Repo() { this(16); }
+    @Override
+    public <T extends List<? super V>> Map<K, T> group(Map<K, List<V>> in, final T... rest) throws IOException {
+        String s = "}{";
+        return null;
+    }
+    abstract int[] sizes();
+    class Inner { void run() { Runnable r = () -> { }; } }
+}
+
+enum Color {
+    RED("r") { @Override String code() { return "R"; } }, GREEN("g");
+    Color(String c) { this.c = c; }
+    String code() { return c; }
+}
+
+record Point(int x, int y) {
+    Point { if (x < 0) throw new IllegalArgumentException(); }
+    static Point origin() { return new Point(0, 0); }
+}
+
+interface Shape { default String name() { return """
+    text block } {
+    """; } }
+'''
+
+
+def _members():
+    return {(member['class'], member['name'], len(member['parameters'])): member
+            for member in find_java_members(SOURCE)}
+
+
+def test_nested_generics_and_members():
+    members = _members()
+    group = members[('Repo', 'group', 2)]
+    assert group['return_type'] == 'Map<K, T>'
+    assert group['parameter_types'] == ['Map<K, List<V>>', 'T...']
+    assert SOURCE[group['start']:group['end']].startswith('@Override')
+    assert SOURCE[group['start']:group['end']].endswith('return null;\n    }')
+    assert members[('Repo', 'Repo', 0)]['type'] == 'constructor'
+    assert members[('Repo', 'sizes', 0)]['abstract']
+    assert ('Repo.Inner', 'run', 0) in members
+    assert not any(name == 'data' for _, name, _ in members)
+
+
+def test_records_enums_and_text_blocks():
+    members = _members()
+    assert members[('Point', 'Point', 0)]['type'] == 'constructor'
+    assert ('Point', 'origin', 0) in members
+    assert members[('Color', 'Color', 1)]['parameter_types'] == ['String']
+    # The constant body's method belongs to the constant, not to the enum
+    codes = [member for member in find_java_members(SOURCE) if member['name'] == 'code']
+    assert [SOURCE[member['start']:member['end']] for member in codes] == ["String code() { return c; }"]
+    name = members[('Shape', 'name', 0)]
+    assert SOURCE[name['start']:name['end']].endswith('"""; }')
+
+
+def test_truncated_sources_do_not_raise():
+    for end in range(len(SOURCE) + 1):
+        find_java_members(SOURCE[:end])
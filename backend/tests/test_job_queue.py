@@ -0,0 +1,44 @@
+import os
+
+from job_scheduler import JobQueue
+
+
+def _submit_upload(queue, tmp_path, submitter):
+    upload = tmp_path / f"upload_{submitter}.zip"
+    upload.write_bytes(b"same content")
+    return queue.submit('upload', str(upload), str(tmp_path / f"{submitter}.json"), submitter=submitter)
+
+
+def test_cancel_keeps_inputs_while_others_wait(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs"))
+    try:
+        job = _submit_upload(queue, tmp_path, 'alice')
+        joined = _submit_upload(queue, tmp_path, 'bob')
+        assert joined['coalesced'] and joined['id'] == job['id'] and joined['submitters'] == 2
+
+        status = queue.cancel(job['id'], 'alice')
+        assert status['withdrawn'] and status['state'] == 'queued' and status['submitters'] == 1
+        assert os.path.exists(job['input'])
+
+        status = queue.cancel(job['id'], 'bob')
+        assert status['state'] == 'cancelled'
+        assert not os.path.exists(os.path.dirname(job['input']))
+    finally:
+        queue.close()
+
+
+def test_submitters_withdraw_only_once(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs"))
+    try:
+        job = _submit_upload(queue, tmp_path, 'alice')
+        # Resubmitting does not add a second vote for the same submitter
+        assert _submit_upload(queue, tmp_path, 'alice')['submitters'] == 1
+        _submit_upload(queue, tmp_path, 'bob')
+
+        assert queue.cancel(job['id'], 'alice')['withdrawn']
+        status = queue.cancel(job['id'], 'alice')
+        assert not status['withdrawn'] and status['state'] == 'queued' and status['submitters'] == 1
+        assert not queue.cancel(job['id'], 'mallory')['withdrawn']
+        assert queue.status(job['id'])['state'] == 'queued'
+    finally:
+        queue.close()
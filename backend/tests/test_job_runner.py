@@ -0,0 +1,84 @@
+import asyncio
+import json
+import zipfile
+
+from extraction_cache import ExtractionCache
+from job_runner import AnalysisJobRunner
+
+
+def _write_upload(path, prefix, count):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for i in range(count):
+            archive.writestr(f"{prefix}/{prefix}_{i}.py", f"def {prefix}_{i}(x):\n    return x + {i}\n")
+
+
+def test_concurrent_jobs_write_separate_outputs(tmp_path):
+    in_flight = 0
+    peak = 0
+
+    async def generate(model_name, prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return f"analysis by {model_name}"
+        finally:
+            in_flight -= 1
+
+    _write_upload(tmp_path / "alpha.zip", "alpha", 6)
+    _write_upload(tmp_path / "beta.zip", "beta", 4)
+    jobs = [(str(tmp_path / "alpha.zip"), str(tmp_path / "alpha.json")),
+            (str(tmp_path / "beta.zip"), str(tmp_path / "beta.json"))]
+
+    async def run():
+        cache = ExtractionCache(str(tmp_path / "extractions.db"))
+        try:
+            async with AnalysisJobRunner(max_jobs=2, parse_workers=2, llm_concurrency=2, extraction_cache=cache,
+                                         generate=generate) as runner:
+                return await runner.run_all(jobs)
+        finally:
+            cache.close()
+
+    assert asyncio.run(run()) == [True, True]
+    assert peak <= 2
+
+    for prefix, count in (("alpha", 6), ("beta", 4)):
+        with open(tmp_path / f"{prefix}.json", encoding='utf-8') as f:
+            output = json.load(f)
+        assert output["source"] == f"{prefix}.zip"
+        assert output["files_analyzed"] == count
+        assert sorted(result["filename"] for result in output["results"]) == \
+            sorted(f"{prefix}_{i}.py" for i in range(count))
+
+
+def test_jobs_writing_the_same_output_are_refused(tmp_path):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def generate(model_name, prompt):
+        started.set()
+        await release.wait()
+        return "analysis"
+
+    _write_upload(tmp_path / "alpha.zip", "alpha", 1)
+    output = str(tmp_path / "out.json")
+
+    async def run():
+        cache = ExtractionCache(str(tmp_path / "extractions.db"))
+        try:
+            async with AnalysisJobRunner(max_jobs=2, parse_workers=1, llm_concurrency=1, extraction_cache=cache,
+                                         generate=generate) as runner:
+                first = asyncio.create_task(runner.run(str(tmp_path / "alpha.zip"), output))
+                await started.wait()
+                try:
+                    await runner.run(str(tmp_path / "alpha.zip"), output)
+                    refused = False
+                except ValueError:
+                    refused = True
+                release.set()
+                return refused, await first
+        finally:
+            cache.close()
+
+    assert asyncio.run(run()) == (True, True)
@@ -0,0 +1,55 @@
+from js_lexer import find_js_functions
+
+
+def _spans(source):
+    return {func['name']: (func['kind'], source[func['start']:func['end']]) for func in find_js_functions(source)}
+
+
+def test_template_literals_with_braces_and_nesting():
+    source = (
+        "function outer(a, b = `t ${a + `inner ${b}`} }`) {\n"
+        "  return `${a}}{`;\n"
+        "}\n"
+        "function after() {}\n"
+    )
+    spans = _spans(source)
+    assert spans['outer'] == ('function', source[:source.index("\nfunction after")])
+    assert spans['after'] == ('function', "function after() {}")
+
+
+def test_regex_literals_and_division():
+    source = (
+        "const re = /\\/*not a comment*\\//g;\n"
+        "function strip(s) { return s.replace(/[}{]/g, '') + \"}\"; }\n"
+        "function half(a) { return a / 2 / 3; }\n"
+    )
+    spans = _spans(source)
+    assert spans['strip'] == ('function', source.splitlines()[1])
+    assert spans['half'] == ('function', source.splitlines()[2])
+
+
+def test_typescript_generics_and_class_members():
+    source = (
+        "export default async function fetchAll<T>(urls: Array<Map<string, T>>): Promise<T[]> { return []; }\n"
+        "const double = async (x: number): Promise<number> => x * 2;\n"
+        "class Box<T extends Record<string, Array<T>>> extends Base {\n"
+        "  static create(): Box<any> { return new Box(); }\n"
+        "  get size() { return 1; }\n"
+        "  constructor(private readonly v: T) { super(); }\n"
+        "  handler = (e) => { if (e) { return `}`; } };\n"
+        "}\n"
+    )
+    spans = _spans(source)
+    assert spans['fetchAll'] == ('function', source.splitlines()[0])
+    assert spans['double'] == ('arrow', "const double = async (x: number): Promise<number> => x * 2")
+    assert spans['create'] == ('method', "static create(): Box<any> { return new Box(); }")
+    assert spans['size'] == ('method', "get size() { return 1; }")
+    assert spans['Box'] == ('constructor', "constructor(private readonly v: T) { super(); }")
+    assert spans['handler'] == ('arrow', "handler = (e) => { if (e) { return `}`; } }")
+
+
+def test_object_literal_members_and_truncated_source():
+    source = "const obj = { method() { return 1; }, prop: function named() {} };\nsetTimeout(() => {}, 10);\n"
+    assert sorted(_spans(source)) == ['method', 'named']
+    for end in range(len(source) + 1):
+        find_js_functions(source[:end])
@@ -0,0 +1,56 @@
+import os
+import subprocess
+
+from repo_cache import MirrorCache
+
+
+def _git(cwd, *args):
+    return subprocess.run(['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+                          cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _commit(repo, name, text):
+    with open(os.path.join(repo, name), 'w') as f:
+        f.write(text)
+    _git(repo, 'add', name)
+    _git(repo, 'commit', '-q', '-m', f"Add {name}")
+    return _git(repo, 'rev-parse', 'HEAD')
+
+
+def test_worktree_from_file_mirror(tmp_path):
+    origin = str(tmp_path / "origin")
+    os.makedirs(origin)
+    _git(origin, 'init', '-q')
+    first = _commit(origin, "a.py", "def a():\n    return 1\n")
+    url = f"file://{origin}"
+    cache = MirrorCache(root=str(tmp_path / "mirrors"))
+
+    target = str(tmp_path / "checkout1")
+    with cache.worktree(url, target) as commit:
+        assert commit == first
+        assert os.path.isfile(os.path.join(target, "a.py"))
+    assert not os.path.exists(target)
+    assert os.path.isdir(cache.mirror_path(url))
+
+    # A later run fetches the new remote HEAD into the existing mirror
+    second = _commit(origin, "b.py", "def b():\n    return 2\n")
+    target = str(tmp_path / "checkout2")
+    with cache.worktree(url, target, keep=True) as commit:
+        assert commit == second
+        assert os.path.isfile(os.path.join(target, "b.py"))
+    assert os.path.isdir(target)
+
+
+def test_evict_keeps_mirrors_with_live_worktrees(tmp_path):
+    origin = str(tmp_path / "origin")
+    os.makedirs(origin)
+    _git(origin, 'init', '-q')
+    _commit(origin, "a.py", "def a():\n    return 1\n")
+    url = f"file://{origin}"
+    cache = MirrorCache(root=str(tmp_path / "mirrors"), max_bytes=0)
+
+    target = str(tmp_path / "checkout")
+    with cache.worktree(url, target):
+        assert cache.evict() == []
+    # Leaving the worktree evicts the now idle mirror, as the cache is over max_bytes
+    assert not os.path.exists(cache.mirror_path(url))
@@ -0,0 +1,58 @@
+import json
+
+from job_scheduler import JobQueue, JobScheduler
+from results_store import ResultsStore
+
+
+def _write_outputs(tmp_path):
+    code = tmp_path / "sourcecode.json"
+    code.write_text(json.dumps({
+        'source': 'app.zip', 'timestamp': '2026-01-01T00:00:00',
+        'results': [{'filename': 'auth.py', 'functions': ['login', 'logout'], 'analysis': 'Session handling'}]
+    }))
+    requirements = tmp_path / "requirements.csv"
+    requirements.write_text("Requirement ID,Requirement Text\nFR-1,Users can log in\nFR-2,Users can reset passwords\n")
+    comparison = tmp_path / "comparison.json"
+    comparison.write_text(json.dumps({
+        'stats': {'coverage_percentage': 50.0}, 'model_used': 'offline',
+        'matches': [{'requirement': 'Users can log in', 'implemented': True, 'locations': ['auth.py:login']},
+                    {'requirement': 'Users can reset passwords', 'implemented': False, 'locations': []}],
+        'missing_requirements': [{'requirement': 'Users can reset passwords', 'priority': 'high'}]
+    }))
+    return str(code), str(requirements), str(comparison)
+
+
+def test_comparison_links_to_code_and_requirements(tmp_path):
+    code, requirements, comparison = _write_outputs(tmp_path)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    try:
+        code_run = store.import_file(code)
+        requirements_run = store.import_file(requirements)
+        run = store.import_comparison(comparison, code_run, requirements_run, repo='repo-1')
+
+        coverage = store.coverage(repo='repo-1')
+        assert coverage['run_id'] == run
+        assert (coverage['implemented_requirements'], coverage['total_requirements']) == (1, 2)
+        assert coverage['functions_matched'] == 1
+
+        functions = store.functions_for_requirement('FR-1', repo='repo-1')
+        assert [(f['name'], f['path']) for f in functions] == [('login', 'auth.py')]
+        assert store.functions_for_requirement('FR-1', repo='other') == []
+        assert store.import_file(comparison) == run
+    finally:
+        store.close()
+
+
+def test_scheduler_imports_finished_outputs(tmp_path):
+    code, _, _ = _write_outputs(tmp_path)
+    queue = JobQueue(str(tmp_path / "jobs"))
+    scheduler = JobScheduler(queue, results_db=str(tmp_path / "results.db"))
+    try:
+        scheduler._import_results({'id': 'job-1', 'output': code, 'commit_sha': 'abc123'})
+        # A missing output is logged, not raised, so the job still finishes
+        scheduler._import_results({'id': 'job-2', 'output': str(tmp_path / "missing.json"), 'commit_sha': None})
+        runs = scheduler.results.runs()
+        assert [(r['kind'], r['commit_sha']) for r in runs] == [('code_analysis', 'abc123')]
+    finally:
+        scheduler.results.close()
+        queue.close()
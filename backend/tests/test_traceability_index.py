@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+
+from offline_matcher import similarities
+from traceability_index import TraceabilityIndex
+
+WORDS = ("user login password reset email report export invoice payment order cart search filter admin role "
+         "permission upload file image notify schedule cache session token audit log backup restore").split()
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _check_against_full_scan(index):
+    """Stored top_k lists must match an exact scan over the stored vectors"""
+    req_fps, req_vectors = index._vectors('requirements')
+    func_fps, func_vectors = index._vectors('functions')
+    exact = similarities(req_vectors, func_vectors)
+    expected = index._scan(req_fps, req_vectors, func_fps, func_vectors)
+    stored = index._candidate_lists(req_fps)
+    column = {fp: j for j, fp in enumerate(func_fps)}
+    for i, fp in enumerate(req_fps):
+        for func_fp, score in stored[fp]:
+            assert np.isclose(score, exact[i, column[func_fp]], atol=1e-5)
+        top = [score for _, score in stored[fp][:index.top_k]]
+        assert np.allclose(top, [score for _, score in expected[fp][:index.top_k]], atol=1e-5)
+
+
+def test_incremental_updates_match_a_full_scan(tmp_path):
+    rng = random.Random(7)
+    requirements = [_text(rng, 6) for _ in range(30)]
+    functions = [{'location': f"mod_{i}.py:func_{i}", 'text': _text(rng, 8)} for i in range(200)]
+    index = TraceabilityIndex(str(tmp_path / "index.db"))
+    try:
+        index.update(requirements, functions=functions)
+        assert index.last_update['mode'] == 'rebuild'
+        for step in range(8):
+            for _ in range(3):
+                functions.pop(rng.randrange(len(functions)))
+            functions.extend({'location': f"new_{step}_{i}.py:func", 'text': _text(rng, 8)} for i in range(3))
+            if step % 3 == 0:
+                requirements[rng.randrange(len(requirements))] = _text(rng, 6)
+            index.update(requirements, functions=functions)
+            assert index.last_update['mode'] == 'incremental'
+            _check_against_full_scan(index)
+    finally:
+        index.close()
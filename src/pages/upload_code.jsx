@@ -3,12 +3,17 @@ import uploadIcon from "../assets/images/code.jpg";
 import { useNavigate } from "react-router-dom";
 import Navbar from "../components/Navbar/Navbar";
 
+const API_BASE = "http://localhost:5000/api";
+const POLL_INTERVAL_MS = 2000;
+
 const UploadSourceCode = () => {
   const navigate = useNavigate();
   const [file, setFile] = useState(null);
   const [uploading, setUploading] = useState(false);
   const [error, setError] = useState(null);
   const [successMessage, setSuccessMessage] = useState(""); // ✅ New success state
+  const [progress, setProgress] = useState(""); // Queue position or latest message of the analysis job
+  const [result, setResult] = useState(null);
 
   // Handle file selection
   const handleFileChange = (event) => {
@@ -17,6 +22,31 @@ const UploadSourceCode = () => {
     setError(null); // Reset error
   };
 
+  // Poll the analysis job until it finishes, then fetch its output
+  const waitForJob = async (jobId, headers) => {
+    while (true) {
+      const response = await fetch(`${API_BASE}/jobs/${jobId}`, { headers });
+      const job = await response.json();
+      if (!response.ok) {
+        throw new Error(job.error || "Failed to read the analysis progress.");
+      }
+      if (job.state === "done") {
+        const resultResponse = await fetch(`${API_BASE}/jobs/${jobId}/result`, { headers });
+        if (!resultResponse.ok) {
+          throw new Error("The analysis finished but its result could not be loaded.");
+        }
+        return resultResponse.json();
+      }
+      if (job.state === "failed" || job.state === "cancelled") {
+        throw new Error(job.state === "failed" ? "The analysis failed." : "The analysis was cancelled.");
+      }
+      setProgress(job.state === "queued"
+        ? `Queued for analysis (${job.queue_position} ahead)`
+        : job.message || "Analysing...");
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+  };
+
   // Handle file upload
   const handleUpload = async (event) => {
     event.preventDefault();
@@ -24,33 +54,48 @@ const UploadSourceCode = () => {
       setError("Please select a file first.");
       return;
     }
+    const token = localStorage.getItem("token");
+    if (!token) {
+      setError("Please log in to upload code.");
+      return;
+    }
+    const headers = { Authorization: `Bearer ${token}` };
     console.log("Uploading file to backend:", file);
     setUploading(true);
     setError(null);
     setSuccessMessage(""); // Clear success message before upload
+    setProgress("");
+    setResult(null);
 
     const formData = new FormData();
     formData.append("file", file);
 
     try {
-      const response = await fetch("http://localhost:5000/api/upload/code", {
+      const response = await fetch(`${API_BASE}/upload/code`, {
         method: "POST",
+        headers,
         body: formData,
       });
 
       const data = await response.json();
 
-      if (response.ok) {
-        console.log("Upload successful:", data);
-        setSuccessMessage("✅ File uploaded successfully! Click 'View Results' to see the output.");
-      } else {
+      if (!response.ok) {
         setError(data.error || "Upload failed.");
+        return;
       }
+      // The upload is queued as an analysis job (202 with its id)
+      console.log("Upload queued:", data);
+      setProgress("Queued for analysis");
+      const analysis = await waitForJob(data.jobId, headers);
+      console.log("Analysis complete:", analysis);
+      setResult(analysis);
+      setSuccessMessage("✅ File analysed successfully! Click 'View Results' to see the output.");
     } catch (error) {
-      setError("Error uploading file. Please try again.");
+      setError(error.message || "Error uploading file. Please try again.");
       console.error(error);
     } finally {
       setUploading(false);
+      setProgress("");
     }
   };
 
@@ -81,7 +126,13 @@ const UploadSourceCode = () => {
         )}
 
         {error && <p className="text-red-500 text-sm mt-2">{error}</p>}
+        {progress && <p className="text-gray-600 text-sm mt-2">{progress}</p>}
         {successMessage && <p className="text-green-500 text-sm mt-2">{successMessage}</p>} {/* ✅ Success message here */}
+        {result && (
+          <p className="text-sm text-gray-600 mt-2">
+            {result.files_analyzed} file(s) analysed, {result.results.length} documented.
+          </p>
+        )}
 
         <button
           onClick={handleUpload}
@@ -90,7 +141,7 @@ const UploadSourceCode = () => {
             uploading ? "bg-gray-400" : "bg-green-500 hover:bg-green-600"
           } text-white font-medium rounded-lg`}
         >
-          {uploading ? "Uploading..." : "Upload File"}
+          {uploading ? (progress ? "Analysing..." : "Uploading...") : "Upload File"}
         </button>
 
         <button